@@ -0,0 +1,81 @@
+"""Add materialized view for check-in statistics
+
+Revision ID: checkin_stats_mv_001
+Revises: crisis_idx_001
+Create Date: 2026-01-12
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'checkin_stats_mv_001'
+down_revision = 'crisis_idx_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-user stats as of refresh time; readers treat a row as stale when
+    # the user has checked in since refreshed_at (see CheckinService.get_cached_stats)
+    op.execute("""
+        CREATE MATERIALIZED VIEW checkin_stats_mv AS
+        WITH days AS (
+            SELECT DISTINCT user_id, (created_at AT TIME ZONE 'UTC')::date AS day
+            FROM mood_checkins
+        ),
+        runs AS (
+            SELECT user_id,
+                   day + (row_number() OVER (PARTITION BY user_id ORDER BY day DESC))::int AS run
+            FROM days
+        ),
+        streaks AS (
+            SELECT user_id,
+                   COUNT(*) FILTER (WHERE run = (now() AT TIME ZONE 'UTC')::date + 1) AS streak_length
+            FROM runs
+            GROUP BY user_id
+        )
+        SELECT c.user_id,
+               COUNT(*) AS total_checkins,
+               AVG(c.mood_score) FILTER (WHERE c.created_at >= now() - interval '7 days') AS avg_mood_7d,
+               AVG(c.mood_score) FILTER (WHERE c.created_at >= now() - interval '30 days') AS avg_mood_30d,
+               AVG(c.mood_score) FILTER (
+                   WHERE c.created_at >= now() - interval '14 days'
+                     AND c.created_at < now() - interval '7 days'
+               ) AS avg_mood_prev_7d,
+               s.streak_length,
+               now() AS refreshed_at
+        FROM mood_checkins c
+        JOIN streaks s USING (user_id)
+        GROUP BY c.user_id, s.streak_length
+    """)
+
+    # Unique index is required for REFRESH ... CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ix_checkin_stats_mv_user_id ON checkin_stats_mv (user_id)")
+
+    # Refresh every 5 minutes when pg_cron is available
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.schedule(
+                    'refresh_checkin_stats_mv',
+                    '*/5 * * * *',
+                    'REFRESH MATERIALIZED VIEW CONCURRENTLY checkin_stats_mv'
+                );
+            END IF;
+        END
+        $$
+    """)
+
+
+def downgrade():
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.unschedule('refresh_checkin_stats_mv');
+            END IF;
+        END
+        $$
+    """)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS checkin_stats_mv")
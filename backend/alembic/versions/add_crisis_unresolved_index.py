@@ -0,0 +1,28 @@
+"""Add partial index for open crisis events lookup
+
+Revision ID: crisis_idx_001
+Revises: ml_features_001
+Create Date: 2026-01-05
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'crisis_idx_001'
+down_revision = 'ml_features_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves mark_safe: WHERE user_id = ? AND resolved = false ORDER BY created_at DESC LIMIT 1
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_crisis_events_user_unresolved "
+            "ON crisis_events (user_id, created_at DESC) WHERE resolved = false"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_crisis_events_user_unresolved")
@@ -0,0 +1,42 @@
+"""Add indexes for intervention library filters
+
+Revision ID: intervention_filter_idx_001
+Revises: weekly_insights_001
+Create Date: 2026-02-09
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'intervention_filter_idx_001'
+down_revision = 'weekly_insights_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        # Equality filters first, duration range last
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interventions_filters "
+            "ON interventions (therapeutic_approach, adhd_friendly, asd_friendly, is_premium, duration_seconds) "
+            "WHERE is_active = true"
+        )
+        # Free-tier listing (is_premium = false for non-premium users)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interventions_free_duration "
+            "ON interventions (duration_seconds) WHERE is_active = true AND is_premium = false"
+        )
+        # target_emotions @> ARRAY[...]
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interventions_target_emotions "
+            "ON interventions USING GIN (target_emotions)"
+        )
+        op.execute("ANALYZE interventions")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interventions_target_emotions")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interventions_free_duration")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_interventions_filters")
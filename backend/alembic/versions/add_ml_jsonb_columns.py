@@ -0,0 +1,57 @@
+"""Store ML feature columns as JSONB and index journal themes
+
+Revision ID: ml_jsonb_001
+Revises: intervention_filter_idx_001
+Create Date: 2026-02-10
+
+Databases built with create_all already have JSONB columns; only columns that
+are still json are converted.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'ml_jsonb_001'
+down_revision = 'intervention_filter_idx_001'
+branch_labels = None
+depends_on = None
+
+# table -> JSON columns
+JSON_COLUMNS = {
+    'journal_analyses': ['all_emotions', 'matched_keywords', 'themes'],
+    'seasonal_patterns': ['pattern_data', 'dominant_cycles'],
+    'correlation_analyses': ['correlation_data'],
+    'user_profiles': ['features'],
+    'ab_tests': ['variants'],
+    'ml_model_versions': ['architecture', 'hyperparameters', 'test_metrics'],
+}
+
+
+def _convert(from_type: str, to_type: str) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in JSON_COLUMNS.items():
+        types = {c['name']: c['type'].__class__.__name__.lower() for c in inspector.get_columns(table)}
+        for column in columns:
+            if types.get(column) == from_type:
+                op.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} "
+                    f"TYPE {to_type} USING {column}::{to_type}"
+                )
+
+
+def upgrade():
+    _convert('json', 'jsonb')
+
+    with op.get_context().autocommit_block():
+        # themes @> '[...]' lookups
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_journal_analyses_themes_gin "
+            "ON journal_analyses USING GIN (themes jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_journal_analyses_themes_gin")
+
+    _convert('jsonb', 'json')
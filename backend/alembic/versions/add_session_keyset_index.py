@@ -0,0 +1,28 @@
+"""Add keyset pagination index for intervention session history
+
+Revision ID: session_keyset_idx_001
+Revises: user_time_idx_001
+Create Date: 2026-01-27
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'session_keyset_idx_001'
+down_revision = 'user_time_idx_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_intervention_sessions_user_created_id "
+            "ON intervention_sessions (user_id, created_at DESC, id DESC)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_intervention_sessions_user_created_id")
@@ -0,0 +1,67 @@
+"""Convert append-only ML time series to TimescaleDB hypertables
+
+Revision ID: timescale_001
+Revises: checkin_stats_mv_001
+Create Date: 2026-01-19
+
+Only runs when the timescaledb extension is installed; plain PostgreSQL
+deployments are left untouched. mood_checkins is not converted: its id is
+referenced by foreign keys (intervention_sessions, journal analyses), and a
+hypertable's primary key must include the partitioning column.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'timescale_001'
+down_revision = 'checkin_stats_mv_001'
+branch_labels = None
+depends_on = None
+
+# table -> time column
+HYPERTABLES = {
+    'mood_predictions': 'prediction_date',
+    'journal_analyses': 'analyzed_at',
+}
+
+
+def upgrade():
+    for table, time_column in HYPERTABLES.items():
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') THEN
+                    -- Partitioning column must be NOT NULL and part of the primary key
+                    ALTER TABLE {table} ALTER COLUMN {time_column} SET NOT NULL;
+                    ALTER TABLE {table} DROP CONSTRAINT {table}_pkey;
+                    ALTER TABLE {table} ADD PRIMARY KEY (id, {time_column});
+
+                    PERFORM create_hypertable(
+                        '{table}', '{time_column}',
+                        chunk_time_interval => interval '7 days',
+                        migrate_data => true
+                    );
+
+                    ALTER TABLE {table} SET (
+                        timescaledb.compress,
+                        timescaledb.compress_segmentby = 'user_id',
+                        timescaledb.compress_orderby = '{time_column} DESC'
+                    );
+                    PERFORM add_compression_policy('{table}', interval '30 days');
+                END IF;
+            END
+            $$
+        """)
+
+
+def downgrade():
+    # Hypertables cannot be converted back in place; only drop the policies
+    for table in HYPERTABLES:
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') THEN
+                    PERFORM remove_compression_policy('{table}', if_exists => true);
+                END IF;
+            END
+            $$
+        """)
@@ -0,0 +1,36 @@
+"""Add (user_id, time DESC) indexes for per-user recent-row queries
+
+Revision ID: user_time_idx_001
+Revises: timescale_001
+Create Date: 2026-01-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'user_time_idx_001'
+down_revision = 'timescale_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_mood_checkins_user_created', 'mood_checkins',
+                    ['user_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_journal_analyses_user_analyzed', 'journal_analyses',
+                    ['user_id', sa.text('analyzed_at DESC')], unique=False)
+    op.create_index('ix_mood_predictions_user_date', 'mood_predictions',
+                    ['user_id', sa.text('prediction_date DESC')], unique=False)
+
+    # Crisis scans only touch the small flagged subset
+    op.create_index('ix_journal_analyses_user_crisis', 'journal_analyses',
+                    ['user_id', sa.text('analyzed_at DESC')], unique=False,
+                    postgresql_where=sa.text('crisis_detected = true'))
+
+
+def downgrade():
+    op.drop_index('ix_journal_analyses_user_crisis', table_name='journal_analyses')
+    op.drop_index('ix_mood_predictions_user_date', table_name='mood_predictions')
+    op.drop_index('ix_journal_analyses_user_analyzed', table_name='journal_analyses')
+    op.drop_index('ix_mood_checkins_user_created', table_name='mood_checkins')
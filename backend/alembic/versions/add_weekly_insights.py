@@ -0,0 +1,32 @@
+"""Add weekly_insights snapshot table
+
+Revision ID: weekly_insights_001
+Revises: session_keyset_idx_001
+Create Date: 2026-02-02
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'weekly_insights_001'
+down_revision = 'session_keyset_idx_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled nightly by compute_weekly_insights.py (see InsightsService.compute_all_weekly_insights)
+    op.create_table(
+        'weekly_insights',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('insights', postgresql.JSONB(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('weekly_insights')
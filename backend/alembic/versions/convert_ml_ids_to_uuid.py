@@ -0,0 +1,97 @@
+"""Convert ML table ids to native uuid columns
+
+Revision ID: ml_uuid_ids_001
+Revises: ml_drop_id_idx_001
+Create Date: 2026-02-11
+
+ml_features_001 created the ML tables with INTEGER ids and user_ids, while the
+models (and create_all) use uuid. Databases built with create_all are left
+untouched. Integer rows have no uuid mapping, and integer user_ids cannot
+reference users.id, so tables that still have integer keys are truncated
+before conversion; they hold derived data that the ML jobs rebuild.
+
+journal_analyses.journal_entry_id is replaced by checkin_id, matching the model.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'ml_uuid_ids_001'
+down_revision = 'ml_drop_id_idx_001'
+branch_labels = None
+depends_on = None
+
+# table -> key columns stored as uuid
+UUID_COLUMNS = {
+    'journal_analyses': ['id', 'user_id'],
+    'mood_predictions': ['id', 'user_id'],
+    'seasonal_patterns': ['id', 'user_id'],
+    'correlation_analyses': ['id', 'user_id'],
+    'user_profiles': ['id', 'user_id', 'cluster_id'],
+    'intervention_effectiveness': ['id'],
+    'ab_tests': ['id'],
+    'ab_test_assignments': ['id'],
+    'ab_test_results': ['id', 'assignment_id'],
+    'ml_model_versions': ['id'],
+}
+
+# (table, column) -> referenced table (always its id)
+FOREIGN_KEYS = {
+    ('journal_analyses', 'user_id'): 'users',
+    ('mood_predictions', 'user_id'): 'users',
+    ('seasonal_patterns', 'user_id'): 'users',
+    ('correlation_analyses', 'user_id'): 'users',
+    ('user_profiles', 'user_id'): 'users',
+    ('ab_test_results', 'assignment_id'): 'ab_test_assignments',
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    pending = {}
+    for table, columns in UUID_COLUMNS.items():
+        types = {c['name']: c['type'] for c in inspector.get_columns(table)}
+        integer_columns = [c for c in columns if isinstance(types[c], sa.Integer)]
+        if integer_columns:
+            pending[table] = integer_columns
+
+    if pending:
+        # Foreign keys on converted columns are dropped first and recreated as uuid -> uuid
+        for table, columns in pending.items():
+            for fk in inspector.get_foreign_keys(table):
+                if set(fk['constrained_columns']) & set(columns):
+                    op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+        op.execute(f"TRUNCATE {', '.join(pending)} CASCADE")
+
+        for table, columns in pending.items():
+            for column in columns:
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING NULL")
+                op.execute(f"DROP SEQUENCE IF EXISTS {table}_{column}_seq")
+
+        for (table, column), referred_table in FOREIGN_KEYS.items():
+            if column in pending.get(table, ()):
+                op.create_foreign_key(
+                    f'{table}_{column}_fkey', table, referred_table, [column], ['id']
+                )
+
+    journal_columns = {c['name'] for c in inspector.get_columns('journal_analyses')}
+    if 'journal_entry_id' in journal_columns:
+        op.drop_column('journal_analyses', 'journal_entry_id')
+    if 'checkin_id' not in journal_columns:
+        op.add_column(
+            'journal_analyses',
+            sa.Column('checkin_id', postgresql.UUID(as_uuid=True), nullable=True)
+        )
+        op.create_foreign_key(
+            'journal_analyses_checkin_id_fkey', 'journal_analyses', 'mood_checkins',
+            ['checkin_id'], ['id']
+        )
+
+
+def downgrade():
+    # Integer ids could never reference users.id; the uuid layout is kept
+    pass
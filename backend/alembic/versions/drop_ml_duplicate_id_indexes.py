@@ -0,0 +1,40 @@
+"""Drop ix_*_id indexes that duplicate the ML tables' primary keys
+
+Revision ID: ml_drop_id_idx_001
+Revises: ml_jsonb_001
+Create Date: 2026-02-10
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'ml_drop_id_idx_001'
+down_revision = 'ml_jsonb_001'
+branch_labels = None
+depends_on = None
+
+TABLES = [
+    'journal_analyses',
+    'mood_predictions',
+    'seasonal_patterns',
+    'correlation_analyses',
+    'user_profiles',
+    'intervention_effectiveness',
+    'ab_tests',
+    'ab_test_assignments',
+    'ab_test_results',
+    'ml_model_versions',
+]
+
+
+def upgrade():
+    # The primary key already provides a btree on id
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_id")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_id ON {table} (id)")
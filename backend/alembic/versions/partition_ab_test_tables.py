@@ -0,0 +1,115 @@
+"""Hash-partition A/B test assignments and results by test_id
+
+Revision ID: ab_test_partitions_001
+Revises: ml_uuid_ids_001
+Create Date: 2026-02-11
+
+PostgreSQL cannot partition an existing table in place, so both tables are
+rebuilt and their rows copied over. test_id joins the primary keys (the
+partition key must be part of every unique constraint), and the results ->
+assignments foreign key becomes (assignment_id, test_id).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'ab_test_partitions_001'
+down_revision = 'ml_uuid_ids_001'
+branch_labels = None
+depends_on = None
+
+# Hash partitions for per-test A/B tables
+AB_TEST_PARTITIONS = 16
+
+# Children first: ab_test_results references ab_test_assignments
+TABLES = ['ab_test_results', 'ab_test_assignments']
+
+COLUMNS = {
+    'ab_test_assignments': ['id', 'test_id', 'profile_id', 'variant_id', 'assigned_at'],
+    'ab_test_results': ['id', 'test_id', 'assignment_id', 'metric_value', 'recorded_at'],
+}
+
+
+def _is_partitioned(table):
+    relkind = op.get_bind().execute(
+        sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {'table': table}
+    ).scalar()
+    return relkind == 'p'
+
+
+def _create_hash_partitions(table):
+    for remainder in range(AB_TEST_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {AB_TEST_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def _create_tables(partitioned):
+    key = ['id', 'test_id'] if partitioned else ['id']
+    partition_kwargs = {'postgresql_partition_by': 'HASH (test_id)'} if partitioned else {}
+
+    op.create_table(
+        'ab_test_assignments',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('test_id', sa.String(), nullable=False),
+        sa.Column('profile_id', sa.String(), nullable=False),
+        sa.Column('variant_id', sa.String(), nullable=False),
+        sa.Column('assigned_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['test_id'], ['ab_tests.test_id'], ),
+        sa.ForeignKeyConstraint(['profile_id'], ['user_profiles.profile_id'], ),
+        sa.PrimaryKeyConstraint(*key),
+        **partition_kwargs
+    )
+    op.create_table(
+        'ab_test_results',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('test_id', sa.String(), nullable=False),
+        sa.Column('assignment_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('metric_value', sa.Float(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['test_id'], ['ab_tests.test_id'], ),
+        sa.ForeignKeyConstraint(
+            ['assignment_id', *key[1:]],
+            ['ab_test_assignments.id', *(f'ab_test_assignments.{c}' for c in key[1:])],
+        ),
+        sa.PrimaryKeyConstraint(*key),
+        **partition_kwargs
+    )
+    if partitioned:
+        _create_hash_partitions('ab_test_assignments')
+        _create_hash_partitions('ab_test_results')
+
+
+def _rebuild(partitioned):
+    """Move both tables aside, recreate them in the target layout and copy the rows back"""
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        pk_name = inspector.get_pk_constraint(table)['name']
+        op.rename_table(table, f'{table}_old')
+        # The primary key index name must be free for the new table
+        op.execute(f"ALTER TABLE {table}_old RENAME CONSTRAINT {pk_name} TO {table}_old_pkey")
+
+    _create_tables(partitioned)
+
+    for table in reversed(TABLES):
+        columns = ', '.join(COLUMNS[table])
+        op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_old")
+
+    for table in TABLES:
+        op.drop_table(f'{table}_old')
+
+
+def upgrade():
+    if _is_partitioned('ab_test_assignments'):
+        return
+    _rebuild(partitioned=True)
+
+
+def downgrade():
+    if not _is_partitioned('ab_test_assignments'):
+        return
+    # The old partitions are dropped along with their parents
+    _rebuild(partitioned=False)
@@ -3,45 +3,40 @@ Authentication API routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.api.deps import get_db, get_current_user
+from app.api.routing import ORJSONRoute
+from app.core.config import settings
+from app.core.rate_limit import limiter
 from app.schemas.auth import Token, LoginRequest, RegisterRequest, RefreshTokenRequest
 from app.schemas.user import UserResponse
-from app.services.auth import AuthService
+from app.services.auth import AuthService, USER_BY_ID_QUERY
 from app.services.user import UserService
 from app.services.audit import AuditService
 from app.models.user import User
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=ORJSONRoute)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     request: Request,
     user_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new user"""
     # Check if email already exists
-    existing_user = UserService.get_user_by_email(db, user_data.email)
+    existing_user = await db.run_sync(UserService.get_user_by_email, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email already registered"
         )
 
-    # Create user
-    from app.schemas.user import UserCreate
-    user_create = UserCreate(
-        email=user_data.email,
-        password=user_data.password,
-        display_name=user_data.display_name,
-        has_adhd=user_data.has_adhd,
-        has_autism_spectrum=user_data.has_autism_spectrum,
-        has_anxiety=user_data.has_anxiety,
-        has_depression=user_data.has_depression
-    )
-    user = UserService.create_user(db, user_create)
+    # Create user straight from the validated request
+    password_hash = await run_in_threadpool(AuthService.get_password_hash, user_data.password)
+    user = await db.run_sync(UserService.create_user, user_data, password_hash)
 
     # Log registration
     AuditService.log_action(
@@ -56,21 +51,23 @@ def register(
 
 
 @router.post("/login", response_model=Token)
-def login(
+@limiter.limit(settings.LOGIN_RATE_LIMIT)
+async def login(
     request: Request,
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Authenticate user and return tokens"""
-    user = AuthService.authenticate_user(db, login_data.email, login_data.password)
+    user, failure_reason = await AuthService.authenticate_user_async(
+        db, login_data.email, login_data.password
+    )
 
-    if not user:
-        # Log failed attempt
-        existing_user = UserService.get_user_by_email(db, login_data.email)
-        if existing_user:
+    if failure_reason:
+        # Log failed attempt against the row authentication already fetched
+        if user:
             AuditService.log_user_login(
                 db=db,
-                user_id=existing_user.id,
+                user_id=user.id,
                 ip_address=request.client.host if request.client else "unknown",
                 user_agent=request.headers.get("user-agent", "unknown"),
                 success=False
@@ -101,9 +98,9 @@ def login(
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(
+async def refresh_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Refresh access token"""
     token_data = AuthService.verify_token(refresh_data.refresh_token)
@@ -113,7 +110,8 @@ def refresh_token(
             detail="Invalid refresh token"
         )
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    result = await db.execute(USER_BY_ID_QUERY, {"user_id": token_data.user_id})
+    user = result.scalar_one_or_none()
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -124,13 +122,13 @@ def refresh_token(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: User = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 
 @router.post("/logout")
-def logout(current_user: User = Depends(get_current_user)):
+async def logout(current_user: User = Depends(get_current_user)):
     """Logout user (client should discard tokens)"""
     # In production, would add token to blacklist in Redis
     return {"message": "Successfully logged out"}
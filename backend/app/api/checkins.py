@@ -1,32 +1,47 @@
 """
 Mood Check-in API routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 from app.api.deps import get_db, get_current_user
+from app.api.routing import ORJSONRoute
+from app.core.config import settings
+from app.core.database import run_in_sync_session
 from app.schemas.checkin import CheckinCreate, CheckinResponse, CheckinListResponse
 from app.schemas.intervention import RecommendationResponse
 from app.services.checkin import CheckinService
 from app.services.recommendation import RecommendationService
 from app.services.crisis import CrisisDetectionService
 from app.services.audit import AuditService
+from app.services.ml_model_cache import invalidate_cached_model
 from app.models.user import User
 
-router = APIRouter(prefix="/checkins", tags=["Check-ins"])
+router = APIRouter(prefix="/checkins", tags=["Check-ins"], route_class=ORJSONRoute)
+
+# Validates a whole page of ORM rows in one pydantic-core call
+_CHECKINS_ADAPTER = TypeAdapter(List[CheckinResponse])
+
+
+async def _learn_from_checkin(user_id: UUID) -> None:
+    """Model bookkeeping for a check-in; every tenth one retrains the model"""
+    await run_in_sync_session(CheckinService.trigger_ml_learning, user_id)
+    await invalidate_cached_model(user_id)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_checkin(
+async def create_checkin(
     request: Request,
     checkin_data: CheckinCreate,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new mood check-in and get recommendations"""
-    checkin = CheckinService.create_checkin(db, current_user.id, checkin_data)
+    checkin = await db.run_sync(CheckinService.create_checkin, current_user.id, checkin_data)
 
     # Log the check-in
     AuditService.log_data_access(
@@ -38,21 +53,28 @@ def create_checkin(
         ip_address=request.client.host if request.client else "unknown"
     )
 
-    # Get recommendations
-    recommendations = RecommendationService.get_recommendations(
-        db=db,
-        user_id=current_user.id,
-        current_emotion=checkin.ai_emotion_primary or "neutral",
-        energy_level=checkin.energy_level,
-        time_available_minutes=10,  # Default 10 minutes
-        context=checkin.context_activity
-    )
+    # Single commit for the check-in and its audit entry
+    await db.commit()
 
-    # Check for crisis
+    # Model bookkeeping commits on its own, in the threadpool after the response
+    background_tasks.add_task(_learn_from_checkin, current_user.id)
+
+    # Crisis takes over the response; skip the ML recommendation pass
     crisis_alert = checkin.crisis_flagged
-    crisis_resources = None
     if crisis_alert:
+        recommendations = []
         crisis_resources = CrisisDetectionService.get_crisis_resources()
+    else:
+        recommendations = await run_in_sync_session(
+            RecommendationService.get_recommendations,
+            user_id=current_user.id,
+            current_emotion=checkin.ai_emotion_primary or "neutral",
+            energy_level=checkin.energy_level,
+            time_available_minutes=10,  # Default 10 minutes
+            context=checkin.context_activity,
+            user=current_user
+        )
+        crisis_resources = None
 
     return {
         "checkin": CheckinResponse.model_validate(checkin),
@@ -63,24 +85,24 @@ def create_checkin(
 
 
 @router.get("/", response_model=CheckinListResponse)
-def get_checkins(
+async def get_checkins(
     request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(30, ge=1, le=100),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's check-in history"""
     skip = (page - 1) * page_size
-    checkins = CheckinService.get_user_checkins(
-        db, current_user.id, skip, page_size, start_date, end_date
+    checkins = await db.run_sync(
+        CheckinService.get_user_checkins, current_user.id, skip, page_size, start_date, end_date
     )
-    total = CheckinService.get_checkin_count(db, current_user.id, start_date, end_date)
+    total = await db.run_sync(CheckinService.get_checkin_count, current_user.id, start_date, end_date)
 
     return CheckinListResponse(
-        checkins=[CheckinResponse.model_validate(c) for c in checkins],
+        checkins=_CHECKINS_ADAPTER.validate_python(checkins, from_attributes=True),
         total=total,
         page=page,
         page_size=page_size
@@ -88,34 +110,36 @@ def get_checkins(
 
 
 @router.get("/stats")
-def get_checkin_stats(
-    db: Session = Depends(get_db),
+async def get_checkin_stats(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get check-in statistics"""
-    streak = CheckinService.get_streak_length(db, current_user.id)
-    avg_mood_7d = CheckinService.get_average_mood(db, current_user.id, days=7)
-    avg_mood_30d = CheckinService.get_average_mood(db, current_user.id, days=30)
-    mood_trend = CheckinService.get_mood_trend(db, current_user.id)
-    total_checkins = CheckinService.get_checkin_count(db, current_user.id)
+    stats = None
+    if settings.ENABLE_STATS_MATVIEW:
+        stats = await db.run_sync(CheckinService.get_cached_stats, current_user.id)
+    if stats is None:
+        stats = await db.run_sync(CheckinService.get_full_stats, current_user.id)
+    avg_mood_7d = stats["average_mood_7_days"]
+    avg_mood_30d = stats["average_mood_30_days"]
 
     return {
-        "streak_length": streak,
+        "streak_length": stats["streak_length"],
         "average_mood_7_days": round(avg_mood_7d, 2) if avg_mood_7d else None,
         "average_mood_30_days": round(avg_mood_30d, 2) if avg_mood_30d else None,
-        "mood_trend": mood_trend,
-        "total_checkins": total_checkins
+        "mood_trend": stats["mood_trend"],
+        "total_checkins": stats["total_checkins"]
     }
 
 
 @router.get("/{checkin_id}", response_model=CheckinResponse)
-def get_checkin(
+async def get_checkin(
     checkin_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get specific check-in by ID"""
-    checkin = CheckinService.get_checkin_by_id(db, checkin_id, current_user.id)
+    checkin = await db.run_sync(CheckinService.get_checkin_by_id, checkin_id, current_user.id)
     if not checkin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,9 +1,11 @@
 """
 Crisis Support API routes
 """
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_user
+from app.api.routing import ORJSONRoute
 from app.services.crisis import CrisisDetectionService
 from app.services.audit import AuditService
 from app.models.user import User
@@ -11,7 +13,24 @@ from app.models.crisis import CrisisEvent
 from pydantic import BaseModel
 
 
-router = APIRouter(prefix="/crisis", tags=["Crisis Support"])
+router = APIRouter(prefix="/crisis", tags=["Crisis Support"], route_class=ORJSONRoute)
+
+# Built once so the compiled form and prepared statement are reused (mark_safe).
+# Resolves the newest open event in a single UPDATE with the DB timestamp.
+_RESOLVE_LATEST_CRISIS_QUERY = (
+    update(CrisisEvent)
+    .where(
+        CrisisEvent.id == (
+            select(CrisisEvent.id)
+            .where(CrisisEvent.user_id == bindparam("user_id"), CrisisEvent.resolved == False)
+            .order_by(CrisisEvent.created_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+    )
+    .values(resolved=True, resolved_at=func.now(), resolution_notes="User marked self as safe")
+    .execution_options(synchronize_session=False)
+)
 
 
 class SafetyPlanRequest(BaseModel):
@@ -24,15 +43,18 @@ class SafetyPlanRequest(BaseModel):
 
 
 @router.get("/resources")
-def get_crisis_resources(current_user: User = Depends(get_current_user)):
+async def get_crisis_resources(current_user: User = Depends(get_current_user)):
     """Get crisis resources and hotline information"""
-    return CrisisDetectionService.get_crisis_resources()
+    return Response(
+        content=CrisisDetectionService.get_crisis_resources_json(),
+        media_type="application/json"
+    )
 
 
 @router.post("/report")
-def report_crisis(
+async def report_crisis(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """User self-reports being in crisis"""
@@ -46,7 +68,7 @@ def report_crisis(
         hotline_info_displayed=True
     )
     db.add(crisis_event)
-    db.commit()
+    await db.commit()
 
     # Log the event
     AuditService.log_action(
@@ -66,24 +88,15 @@ def report_crisis(
 
 
 @router.post("/safe-now")
-def mark_safe(
+async def mark_safe(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """User confirms they are safe"""
-    # Find most recent unresolved crisis event
-    recent_crisis = db.query(CrisisEvent).filter(
-        CrisisEvent.user_id == current_user.id,
-        CrisisEvent.resolved == False
-    ).order_by(CrisisEvent.created_at.desc()).first()
-
-    if recent_crisis:
-        from datetime import datetime
-        recent_crisis.resolved = True
-        recent_crisis.resolved_at = datetime.utcnow()
-        recent_crisis.resolution_notes = "User marked self as safe"
-        db.commit()
+    # Resolve most recent unresolved crisis event
+    await db.execute(_RESOLVE_LATEST_CRISIS_QUERY, {"user_id": current_user.id})
+    await db.commit()
 
     AuditService.log_action(
         db=db,
@@ -104,8 +117,8 @@ def mark_safe(
 
 
 @router.get("/safety-plan")
-def get_safety_plan(
-    db: Session = Depends(get_db),
+async def get_safety_plan(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's safety plan (stored in preferences or separate table)"""
@@ -129,10 +142,10 @@ def get_safety_plan(
 
 
 @router.put("/safety-plan")
-def update_safety_plan(
+async def update_safety_plan(
     request: Request,
     plan_data: SafetyPlanRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update user's safety plan"""
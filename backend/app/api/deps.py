@@ -1,32 +1,27 @@
 """
 API Dependencies - Authentication and database session
 """
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.services.auth import AuthService
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.services.auth import AuthService, USER_BY_ID_QUERY
+from app.services.user_cache import get_cached_user, cache_user
 from app.models.user import User
-from uuid import UUID
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_db() -> Generator:
-    """Get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
-    """Get current authenticated user from token"""
+    """
+    Get current authenticated user from token.
+    The user is also stored on request.state.user so middleware and services
+    further down the request can reuse it instead of querying by id again.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -37,9 +32,14 @@ def get_current_user(
     if token_data is None or token_data.user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    # Column-only snapshot from Redis; relationships must be queried explicitly
+    user = await get_cached_user(token_data.user_id)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(USER_BY_ID_QUERY, {"user_id": token_data.user_id})
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise credentials_exception
+        await cache_user(user)
 
     if not user.is_active:
         raise HTTPException(
@@ -47,10 +47,11 @@ def get_current_user(
             detail="Inactive user"
         )
 
+    request.state.user = user
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Ensure user is active"""
     if not current_user.is_active:
         raise HTTPException(
@@ -1,26 +1,49 @@
 """
 Interventions API routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional, List
+import base64
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
 from datetime import datetime
 from uuid import UUID
 from app.api.deps import get_db, get_current_user
+from app.api.routing import ORJSONRoute
+from app.core.database import run_in_sync_session
 from app.schemas.intervention import (
-    InterventionResponse, InterventionSessionCreate,
+    InterventionResponse, InterventionListItem, InterventionSessionCreate,
     InterventionSessionComplete, InterventionSessionResponse,
     RecommendationRequest
 )
 from app.services.intervention import InterventionService
 from app.services.recommendation import RecommendationService
+from app.services.ml_model_cache import invalidate_cached_model
 from app.models.user import User
+from app.models.intervention import InterventionSession
 
-router = APIRouter(prefix="/interventions", tags=["Interventions"])
+router = APIRouter(prefix="/interventions", tags=["Interventions"], route_class=ORJSONRoute)
 
 
-@router.get("/", response_model=List[InterventionResponse])
-def get_interventions(
+def _encode_cursor(session: InterventionSession) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    raw = f"{session.created_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Parse a cursor back into (created_at, id)"""
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(session_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("/", response_model=List[InterventionListItem])
+async def get_interventions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     therapeutic_approach: Optional[str] = None,
@@ -28,15 +51,15 @@ def get_interventions(
     target_emotion: Optional[str] = None,
     adhd_friendly: Optional[bool] = None,
     asd_friendly: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get intervention library with optional filters"""
     # Filter premium if user is not premium
     is_premium = None if current_user.is_premium else False
 
-    interventions = InterventionService.get_all_interventions(
-        db=db,
+    interventions = await db.run_sync(
+        InterventionService.get_all_interventions,
         skip=skip,
         limit=limit,
         therapeutic_approach=therapeutic_approach,
@@ -50,31 +73,31 @@ def get_interventions(
 
 
 @router.post("/recommendations")
-def get_recommendations(
+async def get_recommendations(
     request: RecommendationRequest,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get personalized intervention recommendations"""
-    recommendations = RecommendationService.get_recommendations(
-        db=db,
+    recommendations = await run_in_sync_session(
+        RecommendationService.get_recommendations,
         user_id=current_user.id,
         current_emotion=request.current_emotion,
         energy_level=request.energy_level,
         time_available_minutes=request.time_available_minutes,
-        context=request.context
+        context=request.context,
+        user=current_user
     )
     return {"recommendations": recommendations}
 
 
 @router.get("/{intervention_id}", response_model=InterventionResponse)
-def get_intervention(
+async def get_intervention(
     intervention_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get specific intervention by ID"""
-    intervention = InterventionService.get_intervention_by_id(db, intervention_id)
+    intervention = await db.run_sync(InterventionService.get_intervention_by_id, intervention_id)
     if not intervention:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -84,49 +107,53 @@ def get_intervention(
 
 
 @router.post("/sessions", response_model=InterventionSessionResponse, status_code=status.HTTP_201_CREATED)
-def start_intervention_session(
+async def start_intervention_session(
     session_data: InterventionSessionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Start an intervention session"""
     # Verify intervention exists
-    intervention = InterventionService.get_intervention_by_id(db, session_data.intervention_id)
+    intervention = await db.run_sync(InterventionService.get_intervention_by_id, session_data.intervention_id)
     if not intervention:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Intervention not found"
         )
 
-    session = InterventionService.start_session(db, current_user.id, session_data)
+    session = await db.run_sync(InterventionService.start_session, current_user.id, session_data)
     return session
 
 
 @router.post("/sessions/{session_id}/complete", response_model=InterventionSessionResponse)
-def complete_intervention_session(
+async def complete_intervention_session(
     session_id: UUID,
     completion_data: InterventionSessionComplete,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Complete an intervention session with feedback"""
-    session = InterventionService.complete_session(db, session_id, current_user.id, completion_data)
+    session = await db.run_sync(
+        InterventionService.complete_session, session_id, current_user.id, completion_data
+    )
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Session not found"
         )
+    # A rating updates the model's beliefs (and may retrain it)
+    await invalidate_cached_model(current_user.id)
     return session
 
 
 @router.post("/sessions/{session_id}/skip", response_model=InterventionSessionResponse)
-def skip_intervention_session(
+async def skip_intervention_session(
     session_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Skip an intervention session"""
-    session = InterventionService.skip_session(db, session_id, current_user.id)
+    session = await db.run_sync(InterventionService.skip_session, session_id, current_user.id)
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,22 +163,35 @@ def skip_intervention_session(
 
 
 @router.get("/sessions/history", response_model=List[InterventionSessionResponse])
-def get_session_history(
-    skip: int = Query(0, ge=0),
+async def get_session_history(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Offset paging; use cursor"),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get user's intervention session history"""
-    sessions = InterventionService.get_user_sessions(db, current_user.id, skip, limit)
+    """Get user's intervention session history (keyset paginated, newest first)"""
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass either cursor or skip, not both"
+        )
+    before = _decode_cursor(cursor) if cursor else None
+    sessions = await db.run_sync(
+        InterventionService.get_user_sessions, current_user.id, limit, before, skip or 0
+    )
+
+    if len(sessions) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(sessions[-1])
     return sessions
 
 
 @router.get("/effective")
-def get_effective_interventions(
-    db: Session = Depends(get_db),
+async def get_effective_interventions(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get interventions that have been effective for user"""
-    effective = InterventionService.get_user_effective_interventions(db, current_user.id)
+    effective = await db.run_sync(InterventionService.get_user_effective_interventions, current_user.id)
     return {"effective_interventions": effective}
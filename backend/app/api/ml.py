@@ -1,17 +1,23 @@
 """
 Machine Learning API endpoints - Insights, predictions, and personalization
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_db, get_current_user
+from app.api.routing import ORJSONRoute
+from app.core.database import run_in_sync_session
 from app.models.user import User
+from app.models.ml_model import UserMLModel
 from app.services.ml_training import MLTrainingService
 from app.services.mood_prediction import MoodPredictionService
 from app.services.insights import InsightsService
+from app.services.ml_model_cache import get_cached_model, cache_model, invalidate_cached_model
+from app.services.belief_queue import enqueue_belief_update
 from app.schemas.ml import (
     MLModelInfo,
     MoodPrediction,
@@ -28,53 +34,84 @@ from app.schemas.ml import (
     UpdateBeliefRequest
 )
 
-router = APIRouter(prefix="/ml", tags=["Machine Learning"])
+router = APIRouter(prefix="/ml", tags=["Machine Learning"], route_class=ORJSONRoute)
+
+
+async def _get_user_model(db: AsyncSession, user_id: UUID) -> UserMLModel:
+    """Read-only model state, served from Redis when fresh"""
+    model = await get_cached_model(user_id)
+    if model is None:
+        model = await db.run_sync(MLTrainingService.get_or_create_user_model, user_id)
+        await cache_model(model)
+    return model
+
+
+def _model_etag(model: UserMLModel) -> str:
+    """Validator that changes whenever training or a belief update touches the model"""
+    digest = hashlib.blake2s(
+        f"{model.user_id}:{model.model_version}:{model.last_model_update}".encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _not_modified(request: Request, response: Response, model: UserMLModel) -> Optional[Response]:
+    """Return a 304 when the client's copy is current; otherwise tag the response"""
+    headers = {"ETag": _model_etag(model), "Cache-Control": "private, max-age=60"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
 
 @router.get("/model/info", response_model=MLModelInfo)
-def get_ml_model_info(
-    db: Session = Depends(get_db),
+async def get_ml_model_info(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get information about user's ML model"""
-    model = MLTrainingService.get_or_create_user_model(db, current_user.id)
+    info = await db.run_sync(MLTrainingService.get_model_info, current_user.id)
+    not_modified = _not_modified(request, response, info)
+    if not_modified is not None:
+        return not_modified
 
     patterns_available = []
-    if model.circadian_patterns:
+    if info.has_circadian_patterns:
         patterns_available.append("circadian_patterns")
-    if model.trigger_patterns:
+    if info.has_trigger_patterns:
         patterns_available.append("trigger_patterns")
-    if model.coping_effectiveness_map:
+    if info.has_coping_effectiveness:
         patterns_available.append("coping_effectiveness")
-    if model.intervention_prior_beliefs:
+    if info.has_intervention_beliefs:
         patterns_available.append("intervention_beliefs")
 
     return MLModelInfo(
         user_id=current_user.id,
-        model_version=model.model_version,
-        total_interactions=model.total_interactions,
-        last_model_update=model.last_model_update,
+        model_version=info.model_version,
+        total_interactions=info.total_interactions,
+        last_model_update=info.last_model_update,
         patterns_available=patterns_available
     )
 
 
 @router.post("/model/train", response_model=TrainModelResponse)
-def train_user_model(
-    db: Session = Depends(get_db),
+async def train_user_model(
     current_user: User = Depends(get_current_user)
 ):
     """
     Trigger full model training for current user.
     Learns circadian patterns, triggers, and coping effectiveness.
     """
-    result = MLTrainingService.train_user_model(db, current_user.id)
+    result = await run_in_sync_session(MLTrainingService.train_user_model, current_user.id)
+    await invalidate_cached_model(current_user.id)
     return result
 
 
 @router.post("/model/update-belief")
-def update_intervention_belief(
+async def update_intervention_belief(
     request: UpdateBeliefRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -87,180 +124,192 @@ def update_intervention_belief(
         "time_of_day": request.context_time_of_day or "unknown"
     }
 
-    MLTrainingService.update_intervention_belief(
-        db,
-        current_user.id,
-        request.intervention_id,
-        request.effectiveness_rating,
-        context
+    queued = await enqueue_belief_update(
+        current_user.id, request.intervention_id, request.effectiveness_rating, context
     )
+    if not queued:
+        await db.run_sync(
+            MLTrainingService.update_intervention_belief,
+            current_user.id,
+            request.intervention_id,
+            request.effectiveness_rating,
+            context
+        )
+        await invalidate_cached_model(current_user.id)
 
-    return {"status": "belief_updated", "intervention_id": str(request.intervention_id)}
+    return {
+        "status": "belief_queued" if queued else "belief_updated",
+        "intervention_id": str(request.intervention_id)
+    }
 
 
 @router.get("/predict/mood", response_model=MoodPrediction)
-def predict_mood(
+async def predict_mood(
     hours_ahead: int = Query(default=24, ge=1, le=168),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Predict user's mood for the next N hours.
     Uses exponential smoothing and circadian patterns.
     """
-    prediction = MoodPredictionService.predict_next_mood(db, current_user.id, hours_ahead)
+    prediction = await run_in_sync_session(MoodPredictionService.predict_next_mood, current_user.id, hours_ahead)
     return prediction
 
 
 @router.get("/predict/forecast")
-def get_mood_forecast(
+async def get_mood_forecast(
     days: int = Query(default=7, ge=1, le=14),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get mood forecast for the next N days.
     Returns morning, afternoon, and evening predictions.
     """
-    from datetime import datetime
-    forecasts = MoodPredictionService.get_mood_forecast(db, current_user.id, days)
+    forecasts = await run_in_sync_session(MoodPredictionService.get_mood_forecast, current_user.id, days)
     return {
         "forecasts": forecasts,
-        "generated_at": datetime.utcnow().isoformat()
+        "generated_at": datetime.utcnow()
     }
 
 
 @router.get("/patterns/mood", response_model=PatternDetection)
-def detect_mood_patterns(
-    db: Session = Depends(get_db),
+async def detect_mood_patterns(
     current_user: User = Depends(get_current_user)
 ):
     """
     Detect patterns in user's mood data.
     Identifies weekly cycles, time-of-day effects, and volatility.
     """
-    patterns = MoodPredictionService.detect_mood_patterns(db, current_user.id)
+    patterns = await run_in_sync_session(MoodPredictionService.detect_mood_patterns, current_user.id)
     return patterns
 
 
 @router.get("/patterns/circadian")
-def get_circadian_patterns(
-    db: Session = Depends(get_db),
+async def get_circadian_patterns(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's learned circadian patterns"""
-    model = MLTrainingService.get_or_create_user_model(db, current_user.id)
+    model = await _get_user_model(db, current_user.id)
+    not_modified = _not_modified(request, response, model)
+    if not_modified is not None:
+        return not_modified
     return model.circadian_patterns or {"message": "No circadian patterns learned yet"}
 
 
 @router.get("/patterns/triggers")
-def get_trigger_patterns(
-    db: Session = Depends(get_db),
+async def get_trigger_patterns(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's learned trigger patterns"""
-    model = MLTrainingService.get_or_create_user_model(db, current_user.id)
+    model = await _get_user_model(db, current_user.id)
+    not_modified = _not_modified(request, response, model)
+    if not_modified is not None:
+        return not_modified
     return model.trigger_patterns or {"message": "No trigger patterns learned yet"}
 
 
 @router.get("/risk/crisis", response_model=CrisisRiskAssessment)
-def assess_crisis_risk(
-    db: Session = Depends(get_db),
+async def assess_crisis_risk(
     current_user: User = Depends(get_current_user)
 ):
     """
     Assess crisis risk based on recent patterns.
     NOT a clinical assessment - for informational purposes only.
     """
-    assessment = MoodPredictionService.predict_crisis_risk(db, current_user.id)
+    assessment = await run_in_sync_session(MoodPredictionService.predict_crisis_risk, current_user.id)
     return assessment
 
 
 @router.get("/optimal-times", response_model=OptimalInterventionTimes)
-def get_optimal_intervention_times(
-    db: Session = Depends(get_db),
+async def get_optimal_intervention_times(
     current_user: User = Depends(get_current_user)
 ):
     """
     Get optimal times for interventions based on learned patterns.
     Identifies times when mood is lower but energy is available.
     """
-    optimal = MoodPredictionService.get_optimal_intervention_times(db, current_user.id)
+    optimal = await run_in_sync_session(MoodPredictionService.get_optimal_intervention_times, current_user.id)
     return optimal
 
 
 @router.get("/insights/daily", response_model=DailyInsight)
-def get_daily_insight(
-    db: Session = Depends(get_db),
+async def get_daily_insight(
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a personalized daily insight based on patterns and current state.
     """
-    insight = InsightsService.get_daily_insight(db, current_user.id)
+    insight = await run_in_sync_session(InsightsService.get_daily_insight, current_user.id, current_user)
     return insight
 
 
 @router.get("/insights/weekly")
-def get_weekly_insights(
-    db: Session = Depends(get_db),
+async def get_weekly_insights(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Generate comprehensive weekly insights.
     Includes mood trends, achievements, and personalized tips.
     """
-    insights = InsightsService.generate_weekly_insights(db, current_user.id)
+    insights = await db.run_sync(InsightsService.get_precomputed_weekly_insights, current_user.id)
+    if insights is None:
+        insights = await run_in_sync_session(InsightsService.generate_weekly_insights, current_user.id, current_user)
     return insights
 
 
 @router.get("/insights/effectiveness", response_model=InterventionEffectivenessReport)
-def get_intervention_effectiveness(
-    db: Session = Depends(get_db),
+async def get_intervention_effectiveness(
     current_user: User = Depends(get_current_user)
 ):
     """
     Get report on which interventions are most effective for the user.
     """
-    report = InsightsService.get_intervention_effectiveness_report(db, current_user.id)
+    report = await run_in_sync_session(InsightsService.get_intervention_effectiveness_report, current_user.id)
     return report
 
 
 @router.get("/insights/comprehensive", response_model=ComprehensiveReport)
-def get_comprehensive_report(
-    db: Session = Depends(get_db),
+async def get_comprehensive_report(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Generate comprehensive ML insights report.
     Combines all analyses into a single report.
     """
-    report = InsightsService.generate_comprehensive_report(db, current_user.id)
+    report = await InsightsService.generate_comprehensive_report_async(db, current_user.id, current_user)
     return report
 
 
 @router.get("/score/intervention")
-def get_personalized_intervention_score(
+async def get_personalized_intervention_score(
     intervention_id: UUID,
     emotion: str = Query(..., description="Current emotion"),
     energy_level: int = Query(default=5, ge=1, le=10),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get personalized effectiveness score for an intervention.
     Uses Thompson Sampling and learned patterns.
     """
-    from datetime import datetime
+    hour = datetime.utcnow().hour
     context = {
         "emotion": emotion,
         "energy_level": energy_level,
-        "time_of_day": datetime.utcnow().strftime("%p").lower(),
-        "hour": datetime.utcnow().hour
+        "time_of_day": "am" if hour < 12 else "pm",
+        "hour": hour
     }
 
-    score, explanation = MLTrainingService.get_personalized_score(
-        db, current_user.id, intervention_id, emotion, context
+    score, explanation = await run_in_sync_session(
+        MLTrainingService.get_personalized_score,
+        current_user.id, intervention_id, emotion, context
     )
 
     return PersonalizedScore(
@@ -271,15 +320,20 @@ def get_personalized_intervention_score(
 
 
 @router.get("/coping-map")
-def get_coping_effectiveness_map(
-    db: Session = Depends(get_db),
+async def get_coping_effectiveness_map(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get learned coping effectiveness map.
     Shows which interventions work best for which emotions.
     """
-    model = MLTrainingService.get_or_create_user_model(db, current_user.id)
+    model = await _get_user_model(db, current_user.id)
+    not_modified = _not_modified(request, response, model)
+    if not_modified is not None:
+        return not_modified
     coping_map = model.coping_effectiveness_map or {}
 
     if not coping_map or coping_map == {}:
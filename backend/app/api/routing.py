@@ -0,0 +1,89 @@
+"""
+Route class that renders untyped JSON responses with orjson directly
+"""
+import functools
+import inspect
+from typing import Any, Callable
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Statuses that must not carry a body (FastAPI drops it for these too)
+_NO_BODY_STATUSES = {204, 304}
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError
+
+
+def render_json(content: Any) -> bytes:
+    """orjson in one pass, falling back to jsonable_encoder for types orjson rejects"""
+    try:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    except TypeError:
+        return orjson.dumps(jsonable_encoder(content), option=_ORJSON_OPTIONS)
+
+
+class ORJSONRoute(APIRoute):
+    """
+    For routes without a response_model, FastAPI walks the whole return value
+    with jsonable_encoder before ORJSONResponse encodes it again. This route
+    class renders such values with orjson in one pass (datetimes, UUIDs, numpy
+    and pydantic models handled natively) and returns the finished Response,
+    which FastAPI passes through untouched. Routes with a response_model, or
+    another response class, keep the stock path.
+
+    Only the endpoint is wrapped, before APIRoute builds anything from it, so
+    FastAPI's own request handling is not re-implemented.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        self._render_directly = False
+        super().__init__(path, self._wrap(endpoint), **kwargs)
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        self._render_directly = self.response_field is None and issubclass(response_class, ORJSONResponse)
+
+    def _wrap(self, call: Callable[..., Any]) -> Callable[..., Any]:
+        # include_router rebuilds routes from route.endpoint; wrap the original once
+        call = getattr(call, "__orjson_route_call__", call)
+        is_coroutine = inspect.iscoroutinefunction(call)
+
+        @functools.wraps(call)
+        async def endpoint(*args: Any, **kwargs: Any) -> Any:
+            if is_coroutine:
+                content = await call(*args, **kwargs)
+            else:
+                content = await run_in_threadpool(call, *args, **kwargs)
+            if not self._render_directly or isinstance(content, Response):
+                return content
+
+            status_code = self.status_code or 200
+            if status_code in _NO_BODY_STATUSES or status_code < 200:
+                response = Response(status_code=status_code)
+            else:
+                response = Response(render_json(content), status_code=status_code, media_type="application/json")
+
+            # Carry over status and headers set on an injected Response parameter
+            for value in kwargs.values():
+                if isinstance(value, Response):
+                    if value.status_code:
+                        response.status_code = value.status_code
+                    response.headers.raw.extend(value.headers.raw)
+            return response
+
+        # Resolved against the endpoint's module, since the wrapper's globals are this one's
+        endpoint.__signature__ = inspect.signature(call, eval_str=True)
+        endpoint.__orjson_route_call__ = call
+        return endpoint
@@ -2,36 +2,40 @@
 User management API routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_user
+from app.api.routing import ORJSONRoute
 from app.schemas.user import UserUpdate, UserResponse, UserPreferencesUpdate, UserPreferencesResponse
 from app.services.user import UserService
 from app.services.audit import AuditService
+from app.services.user_cache import invalidate_cached_user
 from app.models.user import User
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=ORJSONRoute)
 
 
 @router.get("/me", response_model=UserResponse)
-def get_my_profile(current_user: User = Depends(get_current_user)):
+async def get_my_profile(current_user: User = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 
 @router.patch("/me", response_model=UserResponse)
-def update_my_profile(
+async def update_my_profile(
     request: Request,
     user_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update current user profile"""
-    updated_user = UserService.update_user(db, current_user.id, user_data)
+    updated_user = await db.run_sync(UserService.update_user, current_user.id, user_data)
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    await invalidate_cached_user(current_user.id)
 
     AuditService.log_action(
         db=db,
@@ -44,28 +48,29 @@ def update_my_profile(
 
 
 @router.get("/me/preferences", response_model=UserPreferencesResponse)
-def get_my_preferences(
-    db: Session = Depends(get_db),
+async def get_my_preferences(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user preferences"""
-    if not current_user.preferences:
+    preferences = await db.run_sync(UserService.get_preferences, current_user.id)
+    if not preferences:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Preferences not found"
         )
-    return current_user.preferences
+    return preferences
 
 
 @router.put("/me/preferences", response_model=UserPreferencesResponse)
-def update_my_preferences(
+async def update_my_preferences(
     request: Request,
     prefs_data: UserPreferencesUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update current user preferences"""
-    updated_prefs = UserService.update_preferences(db, current_user.id, prefs_data)
+    updated_prefs = await db.run_sync(UserService.update_preferences, current_user.id, prefs_data)
     if not updated_prefs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,15 +87,13 @@ def update_my_preferences(
     return updated_prefs
 
 
-@router.get("/me/export")
-def export_my_data(
+@router.get("/me/export", response_class=StreamingResponse)
+async def export_my_data(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Export all user data (GDPR/CCPA compliance)"""
-    data = UserService.export_user_data(db, current_user.id)
-
+    """Export all user data (GDPR/CCPA compliance), streamed as it is read"""
     AuditService.log_sensitive_data_export(
         db=db,
         user_id=current_user.id,
@@ -98,13 +101,16 @@ def export_my_data(
         export_type="full_data_export"
     )
 
-    return data
+    return StreamingResponse(
+        UserService.stream_user_data_export(current_user),
+        media_type="application/json"
+    )
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-def delete_my_account(
+async def delete_my_account(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete user account and all data (Right to be Forgotten)"""
@@ -118,11 +124,12 @@ def delete_my_account(
         ip_address=request.client.host if request.client else None
     )
 
-    success = UserService.delete_user(db, user_id)
+    success = await db.run_sync(UserService.delete_user, user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete account"
         )
+    await invalidate_cached_user(user_id)
 
     return None
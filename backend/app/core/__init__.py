@@ -1,5 +1,5 @@
 """Core module for Firefly application"""
 from app.core.config import settings
-from app.core.database import Base, engine, get_db
+from app.core.database import Base, engine, async_engine, get_db
 
-__all__ = ["settings", "Base", "engine", "get_db"]
+__all__ = ["settings", "Base", "engine", "async_engine", "get_db"]
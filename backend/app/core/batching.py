@@ -0,0 +1,125 @@
+"""
+In-process micro-batching: an asyncio queue drained by one worker task that
+hands each batch to a handler, plus a registry so the app lifespan can stop
+every worker that was started
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, List, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_running: Set["MicroBatchWorker"] = set()
+
+
+class MicroBatchWorker(Generic[T]):
+    """
+    Collects queued items into batches of up to max_batch, waiting at most
+    max_wait_seconds after the first item, and awaits handle(batch) for each.
+    The handler runs on the event loop; push blocking work to a thread.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[List[T]], Awaitable[None]],
+        max_batch: int = 1,
+        max_wait_seconds: float = 0.0,
+        name: str = "micro-batch"
+    ):
+        self.handle = handle
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._loop.is_closed()
+
+    def start(self) -> None:
+        """Start the worker on the running loop (no-op if already running)"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._drain())
+        _running.add(self)
+
+    def put(self, item: T) -> None:
+        """Queue an item from the event loop, starting the worker on first use"""
+        self.start()
+        self._queue.put_nowait(item)
+
+    def put_threadsafe(self, item: T) -> bool:
+        """Queue an item from any thread. Returns False when the worker is not running."""
+        if not self.running:
+            return False
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._queue.put_nowait(item)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        return True
+
+    async def stop(self) -> List[T]:
+        """Cancel the worker and return the items it had not started on"""
+        _running.discard(self)
+        if self._task is None:
+            return []
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._queue, self._loop, self._task = None, None, None
+        return pending
+
+    async def _collect(self) -> List[T]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait_seconds
+        try:
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Hand the partial batch back so stop() returns it
+            for item in batch:
+                self._queue.put_nowait(item)
+            raise
+        return batch
+
+    async def _drain(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self.handle(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+
+
+async def stop_micro_batch_workers() -> None:
+    """Stop every running worker; their unstarted items are dropped"""
+    for worker in list(_running):
+        pending = await worker.stop()
+        if pending:
+            logger.warning(f"{worker.name}: dropped {len(pending)} queued items on shutdown")
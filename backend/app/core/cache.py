@@ -0,0 +1,135 @@
+"""
+Redis caches: read-through JSON results for expensive computations (ML
+inference, analyses) and short-TTL column snapshots of hot ORM rows
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Generic, Iterable, Mapping, Optional, Type, TypeVar
+from uuid import UUID
+
+import numpy as np
+import orjson
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.core.redis import get_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def data_digest(arrays: Mapping[str, np.ndarray]) -> str:
+    """Short content hash of column arrays, for cache keys that change with the data"""
+    h = hashlib.blake2b(digest_size=8)
+    for name, values in arrays.items():
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()
+
+
+async def cached(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Awaitable[Any]],
+    should_cache: Optional[Callable[[Any], bool]] = None
+) -> Any:
+    """
+    Return the JSON value stored under key, or await compute() and store it
+    for ttl seconds. Results rejected by should_cache (e.g. failures) are not
+    stored. Redis errors fall through to compute().
+    """
+    redis = get_redis()
+    try:
+        raw = await redis.get(key)
+    except Exception as e:
+        logger.debug(f"Result cache read failed for {key}: {e}")
+        raw = None
+    if raw is not None:
+        return orjson.loads(raw)
+
+    result = await compute()
+    if should_cache is None or should_cache(result):
+        try:
+            await redis.setex(key, ttl, orjson.dumps(result, option=_ORJSON_OPTIONS))
+        except Exception as e:
+            logger.debug(f"Result cache write failed for {key}: {e}")
+    return result
+
+
+ModelT = TypeVar("ModelT")
+
+
+class RowCache(Generic[ModelT]):
+    """
+    Short-TTL Redis snapshot of one ORM row's columns, keyed by key_column.
+    Reads rebuild a detached instance carrying column values only; Redis
+    errors read as misses. Writers invalidate after their commit.
+    """
+
+    def __init__(
+        self,
+        model: Type[ModelT],
+        key_prefix: str,
+        ttl: int,
+        key_column: str = "id",
+        exclude: Iterable[str] = ()
+    ):
+        excluded = set(exclude)
+        columns = [c for c in model.__table__.columns if c.key not in excluded]
+        self._model = model
+        self._key_prefix = key_prefix
+        self._ttl = ttl
+        self._key_column = key_column
+        self._keys = [c.key for c in columns]
+        self._datetime_keys = [c.key for c in columns if isinstance(c.type, DateTime)]
+        self._uuid_keys = [c.key for c in columns if isinstance(c.type, PG_UUID)]
+
+    def _cache_key(self, ident: Any) -> str:
+        return f"{self._key_prefix}:{ident}"
+
+    def _encode(self, row: ModelT) -> bytes:
+        return orjson.dumps({key: getattr(row, key) for key in self._keys})
+
+    def _decode(self, raw: bytes) -> ModelT:
+        data = orjson.loads(raw)
+        for key in self._datetime_keys:
+            if data.get(key) is not None:
+                data[key] = datetime.fromisoformat(data[key])
+        for key in self._uuid_keys:
+            if data.get(key) is not None:
+                data[key] = UUID(data[key])
+        return self._model(**data)
+
+    async def get(self, ident: Any) -> Optional[ModelT]:
+        """Return the cached row, or None on a miss or Redis error"""
+        try:
+            raw = await get_redis().get(self._cache_key(ident))
+        except Exception as e:
+            logger.debug(f"{self._model.__name__} cache read failed: {e}")
+            return None
+        return self._decode(raw) if raw else None
+
+    async def put(self, row: ModelT) -> None:
+        """Store the row's columns for the cache TTL"""
+        try:
+            await get_redis().setex(
+                self._cache_key(getattr(row, self._key_column)), self._ttl, self._encode(row)
+            )
+        except Exception as e:
+            logger.debug(f"{self._model.__name__} cache write failed: {e}")
+
+    async def invalidate(self, ident: Any) -> None:
+        """Drop the cached row; call once the change is committed"""
+        try:
+            await get_redis().delete(self._cache_key(ident))
+        except Exception as e:
+            logger.warning(f"{self._model.__name__} cache invalidation failed for {ident}: {e}")
+
+    def invalidate_sync(self, ident: Any) -> None:
+        """Blocking variant for worker threads and scripts; never call it on the event loop"""
+        try:
+            get_sync_redis().delete(self._cache_key(ident))
+        except Exception as e:
+            logger.warning(f"{self._model.__name__} cache invalidation failed for {ident}: {e}")
@@ -1,6 +1,7 @@
 """
 Configuration settings for Firefly application
 """
+from functools import cached_property
 from pydantic_settings import BaseSettings
 from typing import List
 
@@ -15,15 +16,28 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DB_STATEMENT_CACHE_SIZE: int = 512
+    # Each worker process opens up to DB_POOL_SIZE + DB_MAX_OVERFLOW async
+    # connections plus DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW sync ones
+    # (55 with the defaults); size max_connections for that times workers.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    # The sync engine only serves threadpool work (ML services, reports, background tasks)
+    DB_SYNC_POOL_SIZE: int = 10
+    DB_SYNC_MAX_OVERFLOW: int = 5
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_PRE_PING: bool = True
 
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    LOGIN_RATE_LIMIT: str = "10/minute"
+    RATE_LIMIT_STORAGE_URL: str = "memory://"  # e.g. redis://localhost:6379/1
 
     # CORS
-    CORS_ORIGINS: str = "http://localhost:3000"
+    CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000,http://localhost:3001"  # comma-separated
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -43,13 +57,15 @@ class Settings(BaseSettings):
     ENABLE_CRISIS_DETECTION: bool = True
     ENABLE_ML_RECOMMENDATIONS: bool = False  # Phase 2
     ENABLE_WEARABLE_INTEGRATION: bool = False  # Phase 4
+    ENABLE_STATS_MATVIEW: bool = False  # Requires checkin_stats_mv migration
 
     class Config:
         env_file = ".env"
         case_sensitive = True
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
+        """CORS_ORIGINS parsed once"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
 
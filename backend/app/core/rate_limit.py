@@ -0,0 +1,9 @@
+"""
+Rate limiting for abuse-prone endpoints
+"""
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.core.config import settings
+
+# Keyed by client IP
+limiter = Limiter(key_func=get_remote_address, storage_uri=settings.RATE_LIMIT_STORAGE_URL)
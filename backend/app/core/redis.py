@@ -0,0 +1,26 @@
+"""
+Shared Redis clients
+"""
+from typing import Optional
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+_async_client: Optional[aioredis.Redis] = None
+_sync_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Get the shared async Redis client"""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.REDIS_URL)
+    return _async_client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Get the shared sync Redis client (for sync routes and services)"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _sync_client
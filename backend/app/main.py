@@ -3,14 +3,22 @@ Firefly Mental Health - Main FastAPI Application
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from sqlalchemy import text
 import os
 import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.batching import stop_micro_batch_workers
+from app.core.database import async_engine, Base
+from app.core.rate_limit import limiter
+from app.services.audit_queue import start_audit_worker, stop_audit_worker
+from app.services.belief_queue import start_belief_worker, stop_belief_worker
 from app.api.auth import router as auth_router
 from app.api.users import router as users_router
 from app.api.checkins import router as checkins_router
@@ -32,32 +40,51 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Firefly API...")
 
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created/verified")
+    # Create database tables in dev/test only; deployed environments run Alembic migrations
+    if settings.ENVIRONMENT in ("development", "test"):
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        logger.info("Database tables created/verified")
+
+    # Start batched audit log writer and belief update consumer
+    await start_audit_worker()
+    await start_belief_worker()
 
     yield
 
     # Shutdown
     logger.info("Shutting down Firefly API...")
+    await stop_belief_worker()
+    await stop_audit_worker()
+    # Analysis, training and forecast batchers start lazily on first use
+    await stop_micro_batch_workers()
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="AI-Powered Mental Wellness Platform with Neurodiversity Support",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Rate limiting
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000", "http://localhost:3001"],
+    allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress JSON payloads (ML insights, pattern maps, row lists such as
+# /ml/predictions and /ml/ab-tests, whose repeated keys compress well)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -90,6 +117,25 @@ async def health_check():
     }
 
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness check: the database answers a trivial query"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "version": settings.APP_VERSION}
+        )
+    return {
+        "status": "ready",
+        "service": "firefly-backend",
+        "version": settings.APP_VERSION
+    }
+
+
 @app.get("/api/v1/info", tags=["Health"])
 async def api_info():
     """API information"""
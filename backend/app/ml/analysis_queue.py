@@ -0,0 +1,119 @@
+"""
+Background journal analysis queue
+Requests get a task_id immediately; a worker analyzes queued texts in
+batches off the event loop and stores results in Redis for polling.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.core.batching import MicroBatchWorker
+from app.core.database import SessionLocal
+from app.core.redis import get_redis
+from app.ml.models import JournalAnalysis
+from app.ml.nlp_service import get_nlp_service
+
+logger = logging.getLogger(__name__)
+
+# Texts analyzed per batch, and how long to wait for a batch to fill
+BATCH_SIZE = 32
+BATCH_WAIT_SECONDS = 0.05
+RESULT_TTL_SECONDS = 3600
+
+
+def _task_key(task_id: str) -> str:
+    return f"nlp:task:{task_id}"
+
+
+async def _set_task(task_id: str, data: Dict[str, Any]) -> None:
+    await get_redis().setex(_task_key(task_id), RESULT_TTL_SECONDS, orjson.dumps(data))
+
+
+async def submit_analysis(text: str, user_id: Any, journal_entry_id: Optional[uuid.UUID] = None) -> str:
+    """Queue a journal text for analysis and return its task_id"""
+    task_id = uuid.uuid4().hex
+    await _set_task(task_id, {"status": "pending", "user_id": str(user_id)})
+    _worker.put({
+        "task_id": task_id,
+        "text": text,
+        "user_id": user_id,
+        "journal_entry_id": journal_entry_id
+    })
+    return task_id
+
+
+async def get_analysis_task(task_id: str) -> Optional[Dict[str, Any]]:
+    """Return {status, user_id, result?, error?} or None if unknown/expired"""
+    raw = await get_redis().get(_task_key(task_id))
+    return orjson.loads(raw) if raw else None
+
+
+def _analyze_batch(texts: List[str]) -> List[Dict]:
+    """Run the NLP pipelines for a batch (worker thread, private event loop)"""
+    return asyncio.run(get_nlp_service().analyze_journal_entries_batch(texts))
+
+
+def _store_analyses(jobs: List[Dict], analyses: List[Dict]) -> None:
+    """Persist analyses for jobs tied to a journal entry, in one transaction"""
+    rows = [
+        JournalAnalysis(
+            checkin_id=job["journal_entry_id"],
+            user_id=job["user_id"],
+            sentiment_score=analysis['sentiment']['score'],
+            sentiment_label=analysis['sentiment']['label'],
+            sentiment_confidence=analysis['sentiment']['confidence'],
+            primary_emotion=analysis['emotions']['primary_emotion'],
+            primary_emotion_score=analysis['emotions']['primary_score'],
+            all_emotions=analysis['emotions']['all_emotions'],
+            crisis_detected=analysis['crisis_detection']['crisis_detected'],
+            crisis_score=analysis['crisis_detection']['crisis_score'],
+            risk_level=analysis['crisis_detection']['risk_level'],
+            matched_keywords=analysis['crisis_detection']['matched_keywords'],
+            requires_immediate_attention=analysis['crisis_detection']['requires_immediate_attention'],
+            themes=analysis['themes'],
+            text_length=analysis['text_length'],
+            word_count=analysis['word_count']
+        )
+        for job, analysis in zip(jobs, analyses)
+        if job["journal_entry_id"]
+    ]
+    if not rows:
+        return
+
+    db = SessionLocal()
+    try:
+        db.add_all(rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _process_batch(jobs: List[Dict]) -> List[Dict]:
+    analyses = _analyze_batch([job["text"] for job in jobs])
+    _store_analyses(jobs, analyses)
+    return analyses
+
+
+async def _handle(jobs: List[Dict]) -> None:
+    """Analyze a batch off the event loop and publish each job's result"""
+    try:
+        analyses = await asyncio.to_thread(_process_batch, jobs)
+        for job, analysis in zip(jobs, analyses):
+            await _set_task(job["task_id"], {
+                "status": "complete", "user_id": str(job["user_id"]), "result": analysis
+            })
+    except Exception as e:
+        logger.error(f"Journal analysis batch of {len(jobs)} failed: {e}")
+        for job in jobs:
+            await _set_task(job["task_id"], {
+                "status": "failed", "user_id": str(job["user_id"]), "error": "Analysis failed"
+            })
+
+
+_worker: MicroBatchWorker[Dict] = MicroBatchWorker(
+    _handle, max_batch=BATCH_SIZE, max_wait_seconds=BATCH_WAIT_SECONDS, name="Journal analysis"
+)
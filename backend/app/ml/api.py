@@ -3,17 +3,28 @@ API Endpoints for ML Features
 Provides endpoints for NLP analysis, predictions, and recommendations
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.database import get_db
 from app.auth import get_current_user
+from app.api.routing import ORJSONRoute
 from app.ml.nlp_service import get_nlp_service
+from app.ml.analysis_queue import submit_analysis, get_analysis_task
+from app.ml.training_queue import submit_training, get_training_job
+from app.ml.mood_data import fetch_user_mood_array, n_days
+from app.core.cache import cached, data_digest
 from app.ml.prediction_service import get_prediction_service
 from app.ml.collaborative_filtering import get_collaborative_filtering_service
+from app.services.bulk_insert import bulk_persist
 from app.ml.models import (
     JournalAnalysis,
     MoodPrediction,
@@ -24,7 +35,29 @@ from app.ml.models import (
     ABTest
 )
 
-router = APIRouter(prefix="/ml", tags=["Machine Learning"])
+router = APIRouter(
+    prefix="/ml",
+    tags=["Machine Learning"],
+    route_class=ORJSONRoute,
+    default_response_class=ORJSONResponse
+)
+
+# Days of mood history loaded for a forecast (covers the LSTM input window)
+PREDICTION_HISTORY_DAYS = 90
+
+# Columns served by GET /predictions; plain rows, no ORM hydration
+_PREDICTION_COLUMNS = (
+    MoodPrediction.prediction_date,
+    MoodPrediction.predicted_mood,
+    MoodPrediction.confidence_lower,
+    MoodPrediction.confidence_upper,
+    MoodPrediction.model_type,
+)
+
+# Result cache TTLs (seconds); keys include a digest of the mood history
+PREDICTION_CACHE_TTL = 3600
+SEASONAL_CACHE_TTL = 86400
+SIMILAR_USERS_CACHE_TTL = 3600
 
 
 # ============================================================================
@@ -33,7 +66,7 @@ router = APIRouter(prefix="/ml", tags=["Machine Learning"])
 
 class AnalyzeJournalRequest(BaseModel):
     text: str = Field(..., min_length=10)
-    journal_entry_id: Optional[int] = None
+    journal_entry_id: Optional[uuid.UUID] = None  # mood check-in holding the journal text
 
 
 class AnalyzeJournalResponse(BaseModel):
@@ -44,12 +77,26 @@ class AnalyzeJournalResponse(BaseModel):
     analyzed_at: str
 
 
+class AnalyzeJournalTaskResponse(BaseModel):
+    task_id: str
+    status: str  # pending, complete, failed
+    result: Optional[AnalyzeJournalResponse] = None
+    error: Optional[str] = None
+
+
 class TrainModelRequest(BaseModel):
     model_type: str = Field(..., pattern="^(lstm|transformer)$")
     sequence_length: int = Field(14, ge=7, le=60)
     epochs: int = Field(50, ge=10, le=200)
 
 
+class TrainModelTaskResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, complete, failed
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
 class PredictMoodRequest(BaseModel):
     days_ahead: int = Field(7, ge=1, le=30)
     include_confidence: bool = True
@@ -63,6 +110,8 @@ class MoodPredictionResponse(BaseModel):
 
 
 class InterventionRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     id: str
     name: str
     description: str
@@ -70,6 +119,8 @@ class InterventionRequest(BaseModel):
 
 
 class RecommendInterventionsRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     available_interventions: List[InterventionRequest]
     n_recommendations: int = Field(5, ge=1, le=20)
 
@@ -97,50 +148,33 @@ class RecordABResultRequest(BaseModel):
 # NLP Endpoints
 # ============================================================================
 
-@router.post("/analyze-journal", response_model=AnalyzeJournalResponse)
+@router.post("/analyze-journal", response_model=AnalyzeJournalTaskResponse, status_code=status.HTTP_202_ACCEPTED)
 async def analyze_journal_entry(
     request: AnalyzeJournalRequest,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
-    Analyze a journal entry using NLP
-    Performs sentiment analysis, emotion classification, crisis detection, and theme extraction
+    Queue a journal entry for NLP analysis
+    Sentiment, emotion classification, crisis detection, and theme extraction run
+    in a background worker; poll GET /analyze-journal/{task_id} for the result
     """
-    try:
-        nlp_service = get_nlp_service()
-        analysis = await nlp_service.analyze_journal_entry(request.text)
-
-        # Store analysis in database
-        if request.journal_entry_id:
-            db_analysis = JournalAnalysis(
-                journal_entry_id=request.journal_entry_id,
-                user_id=current_user["id"],
-                sentiment_score=analysis['sentiment']['score'],
-                sentiment_label=analysis['sentiment']['label'],
-                sentiment_confidence=analysis['sentiment']['confidence'],
-                primary_emotion=analysis['emotions']['primary_emotion'],
-                primary_emotion_score=analysis['emotions']['primary_score'],
-                all_emotions=analysis['emotions']['all_emotions'],
-                crisis_detected=analysis['crisis_detection']['crisis_detected'],
-                crisis_score=analysis['crisis_detection']['crisis_score'],
-                risk_level=analysis['crisis_detection']['risk_level'],
-                matched_keywords=analysis['crisis_detection']['matched_keywords'],
-                requires_immediate_attention=analysis['crisis_detection']['requires_immediate_attention'],
-                themes=analysis['themes'],
-                text_length=analysis['text_length'],
-                word_count=analysis['word_count']
-            )
-            db.add(db_analysis)
-            db.commit()
+    task_id = await submit_analysis(request.text, current_user["id"], request.journal_entry_id)
+    return {"task_id": task_id, "status": "pending"}
 
-        return analysis
 
-    except Exception as e:
+@router.get("/analyze-journal/{task_id}", response_model=AnalyzeJournalTaskResponse)
+async def get_journal_analysis_task(
+    task_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Poll a queued journal analysis"""
+    task = await get_analysis_task(task_id)
+    if task is None or task["user_id"] != str(current_user["id"]):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Analysis failed: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis task not found"
         )
+    return {"task_id": task_id, **task}
 
 
 @router.get("/journal-analyses")
@@ -181,56 +215,38 @@ async def get_crisis_alerts(
 # Prediction Endpoints
 # ============================================================================
 
-@router.post("/train-model")
+@router.post("/train-model", response_model=TrainModelTaskResponse, status_code=status.HTTP_202_ACCEPTED)
 async def train_prediction_model(
     request: TrainModelRequest,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     """
-    Train mood prediction model on user's historical data
-    Requires at least 21 days of mood data
+    Queue training of the mood prediction model on user's historical data
+    Requires at least 21 days of mood data; poll GET /train-status/{job_id}
     """
-    try:
-        # Fetch user's mood data (assuming you have a Mood model)
-        # This is a placeholder - adjust based on your actual data model
-        mood_data = []  # TODO: Fetch from database
-
-        if len(mood_data) < 21:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Need at least 21 days of mood data to train model"
-            )
-
-        prediction_service = get_prediction_service()
-
-        if request.model_type == 'lstm':
-            result = await prediction_service.train_lstm_model(
-                mood_data,
-                sequence_length=request.sequence_length,
-                epochs=request.epochs
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only LSTM model is currently supported"
-            )
+    if request.model_type != 'lstm':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only LSTM model is currently supported"
+        )
 
-        if not result['success']:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=result.get('error', 'Training failed')
-            )
+    job_id = await submit_training(current_user["id"], request.sequence_length, request.epochs)
+    return {"job_id": job_id, "status": "queued"}
 
-        return result
 
-    except HTTPException:
-        raise
-    except Exception as e:
+@router.get("/train-status/{job_id}", response_model=TrainModelTaskResponse)
+async def get_training_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Poll a queued training job"""
+    job = await get_training_job(job_id)
+    if job is None or job["user_id"] != str(current_user["id"]):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Training failed: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training job not found"
         )
+    return {"job_id": job_id, **job}
 
 
 @router.post("/predict-mood", response_model=List[MoodPredictionResponse])
@@ -244,15 +260,48 @@ async def predict_mood(
     Model must be trained first
     """
     try:
-        # Fetch recent mood data
-        recent_data = []  # TODO: Fetch from database
+        # Recent daily moods; enough to cover the model's input window
+        recent_data = fetch_user_mood_array(
+            db, current_user["id"], since=datetime.utcnow() - timedelta(days=PREDICTION_HISTORY_DAYS)
+        )
 
         prediction_service = get_prediction_service()
-        result = await prediction_service.predict_mood(
-            recent_data,
-            days_ahead=request.days_ahead,
-            include_confidence=request.include_confidence
+
+        async def compute():
+            result = await prediction_service.predict_mood(
+                recent_data,
+                days_ahead=request.days_ahead,
+                include_confidence=request.include_confidence
+            )
+            if result['success']:
+                predictions = result['predictions']
+                # Epoch seconds -> datetimes in one vectorized pass, no string parsing
+                prediction_dates = np.asarray(
+                    result['prediction_epochs'], dtype=np.int64
+                ).astype('datetime64[s]').astype(object)
+
+                # Store predictions in database (one multi-row INSERT)
+                bulk_persist(db, MoodPrediction.__tablename__, [
+                    {
+                        'id': uuid.uuid4(),
+                        'user_id': current_user["id"],
+                        'prediction_date': prediction_date,
+                        'predicted_mood': pred['predicted_mood'],
+                        'confidence_lower': pred.get('confidence_lower'),
+                        'confidence_upper': pred.get('confidence_upper'),
+                        'model_type': result['model_type']
+                    }
+                    for pred, prediction_date in zip(predictions, prediction_dates)
+                ])
+                db.commit()
+            return result
+
+        # Same history, model and params -> same forecast; skip the forward pass
+        key = (
+            f"predict:{current_user['id']}:{data_digest(recent_data)}:"
+            f"{prediction_service.lstm_trained_at}:{request.days_ahead}:{request.include_confidence}"
         )
+        result = await cached(key, PREDICTION_CACHE_TTL, compute, lambda r: r['success'])
 
         if not result['success']:
             raise HTTPException(
@@ -260,20 +309,6 @@ async def predict_mood(
                 detail=result.get('error', 'Prediction failed')
             )
 
-        # Store predictions in database
-        for pred in result['predictions']:
-            db_prediction = MoodPrediction(
-                user_id=current_user["id"],
-                prediction_date=datetime.fromisoformat(pred['date']),
-                predicted_mood=pred['predicted_mood'],
-                confidence_lower=pred.get('confidence_lower'),
-                confidence_upper=pred.get('confidence_upper'),
-                model_type=result['model_type']
-            )
-            db.add(db_prediction)
-
-        db.commit()
-
         return result['predictions']
 
     except HTTPException:
@@ -287,17 +322,26 @@ async def predict_mood(
 
 @router.get("/predictions")
 async def get_predictions(
-    limit: int = 30,
+    response: Response,
+    limit: int = Query(30, ge=1, le=365),
+    cursor: Optional[datetime] = Query(None, description="X-Next-Cursor value from the previous page"),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get stored mood predictions"""
-    predictions = db.query(MoodPrediction)\
-        .filter(MoodPrediction.user_id == current_user["id"])\
-        .order_by(MoodPrediction.prediction_date.desc())\
-        .limit(limit)\
-        .all()
-
+    """Get stored mood predictions, newest first, one page at a time"""
+    query = (
+        select(*_PREDICTION_COLUMNS)
+        .where(MoodPrediction.user_id == current_user["id"])
+        .order_by(MoodPrediction.prediction_date.desc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        query = query.where(MoodPrediction.prediction_date < cursor)
+
+    predictions = [dict(row) for row in db.execute(query).mappings()]
+
+    if len(predictions) == limit:
+        response.headers["X-Next-Cursor"] = predictions[-1]["prediction_date"].isoformat()
     return predictions
 
 
@@ -311,30 +355,32 @@ async def detect_seasonal_patterns(
     Requires at least 90 days of data
     """
     try:
-        # Fetch mood data
-        mood_data = []  # TODO: Fetch from database
+        mood_data = fetch_user_mood_array(db, current_user["id"])
 
         prediction_service = get_prediction_service()
-        result = await prediction_service.detect_seasonal_patterns(mood_data)
 
-        if result['patterns_detected']:
-            # Store in database
-            db_pattern = SeasonalPattern(
-                user_id=current_user["id"],
-                pattern_type='comprehensive',
-                pattern_data=result,
-                best_day=result.get('weekly_pattern', {}).get('best_day'),
-                worst_day=result.get('weekly_pattern', {}).get('worst_day'),
-                weekly_p_value=result.get('weekly_pattern', {}).get('p_value'),
-                best_month=result.get('yearly_pattern', {}).get('best_month'),
-                worst_month=result.get('yearly_pattern', {}).get('worst_month'),
-                dominant_cycles=result.get('dominant_cycles'),
-                data_span_days=result.get('data_span_days')
-            )
-            db.add(db_pattern)
-            db.commit()
+        async def compute():
+            result = await prediction_service.detect_seasonal_patterns(mood_data)
+            if result['patterns_detected']:
+                # Store in database
+                db_pattern = SeasonalPattern(
+                    user_id=current_user["id"],
+                    pattern_type='comprehensive',
+                    pattern_data=result,
+                    best_day=result.get('weekly_pattern', {}).get('best_day'),
+                    worst_day=result.get('weekly_pattern', {}).get('worst_day'),
+                    weekly_p_value=result.get('weekly_pattern', {}).get('p_value'),
+                    best_month=(result.get('yearly_pattern') or {}).get('best_month'),
+                    worst_month=(result.get('yearly_pattern') or {}).get('worst_month'),
+                    dominant_cycles=result.get('dominant_cycles'),
+                    data_span_days=result.get('data_span_days')
+                )
+                db.add(db_pattern)
+                db.commit()
+            return result
 
-        return result
+        key = f"seasonal:{current_user['id']}:{data_digest(mood_data)}"
+        return await cached(key, SEASONAL_CACHE_TTL, compute, lambda r: 'error' not in r)
 
     except Exception as e:
         raise HTTPException(
@@ -353,28 +399,30 @@ async def analyze_weather_correlation(
     Requires weather tracking data
     """
     try:
-        # Fetch mood and weather data
-        mood_data = []  # TODO: Fetch from database
-        weather_data = []  # TODO: Fetch from database
+        mood_data = fetch_user_mood_array(db, current_user["id"])
+        weather_data = []  # TODO: No weather source yet
 
         prediction_service = get_prediction_service()
-        result = await prediction_service.analyze_weather_correlation(
-            mood_data,
-            weather_data
-        )
 
-        if result['sufficient_data']:
-            # Store in database
-            db_correlation = CorrelationAnalysis(
-                user_id=current_user["id"],
-                analysis_type='weather',
-                correlation_data=result['correlations'],
-                n_data_points=result['n_days']
+        async def compute():
+            result = await prediction_service.analyze_weather_correlation(
+                mood_data,
+                weather_data
             )
-            db.add(db_correlation)
-            db.commit()
+            if result['sufficient_data']:
+                # Store in database
+                db_correlation = CorrelationAnalysis(
+                    user_id=current_user["id"],
+                    analysis_type='weather',
+                    correlation_data=result['correlations'],
+                    n_data_points=result['n_days']
+                )
+                db.add(db_correlation)
+                db.commit()
+            return result
 
-        return result
+        key = f"weather-corr:{current_user['id']}:{data_digest(mood_data)}"
+        return await cached(key, SEASONAL_CACHE_TTL, compute, lambda r: 'error' not in r)
 
     except Exception as e:
         raise HTTPException(
@@ -393,27 +441,29 @@ async def analyze_sleep_patterns(
     Requires sleep tracking data
     """
     try:
-        # Fetch mood and sleep data
-        mood_data = []  # TODO: Fetch from database
-        sleep_data = []  # TODO: Fetch from database
+        mood_data = fetch_user_mood_array(db, current_user["id"])
+        sleep_data = []  # TODO: No sleep tracking source yet
 
         prediction_service = get_prediction_service()
-        result = await prediction_service.analyze_sleep_patterns(
-            mood_data,
-            sleep_data
-        )
 
-        if result['sufficient_data']:
-            # Store in database
-            db_correlation = CorrelationAnalysis(
-                user_id=current_user["id"],
-                analysis_type='sleep',
-                correlation_data=result
+        async def compute():
+            result = await prediction_service.analyze_sleep_patterns(
+                mood_data,
+                sleep_data
             )
-            db.add(db_correlation)
-            db.commit()
+            if result['sufficient_data']:
+                # Store in database
+                db_correlation = CorrelationAnalysis(
+                    user_id=current_user["id"],
+                    analysis_type='sleep',
+                    correlation_data=result
+                )
+                db.add(db_correlation)
+                db.commit()
+            return result
 
-        return result
+        key = f"sleep-corr:{current_user['id']}:{data_digest(mood_data)}"
+        return await cached(key, SEASONAL_CACHE_TTL, compute, lambda r: 'error' not in r)
 
     except Exception as e:
         raise HTTPException(
@@ -436,8 +486,7 @@ async def create_user_profile(
     Used for personalized recommendations
     """
     try:
-        # Fetch user's mood data
-        mood_data = []  # TODO: Fetch from database
+        mood_data = fetch_user_mood_array(db, current_user["id"])
 
         cf_service = get_collaborative_filtering_service()
         result = await cf_service.create_user_profile(
@@ -447,14 +496,22 @@ async def create_user_profile(
         )
 
         if result['success']:
-            # Store in database
-            db_profile = UserProfile(
+            # Store in database; re-creating a profile refreshes it in place
+            stmt = pg_insert(UserProfile).values(
                 profile_id=result['profile_id'],
                 user_id=current_user["id"],
                 features=result['features'],
-                n_data_points=len(mood_data)
+                n_data_points=n_days(mood_data)
             )
-            db.add(db_profile)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[UserProfile.user_id],
+                set_={
+                    'profile_id': stmt.excluded.profile_id,
+                    'features': stmt.excluded.features,
+                    'n_data_points': stmt.excluded.n_data_points,
+                    'last_updated': func.now()
+                }
+            ))
             db.commit()
 
         return result
@@ -479,12 +536,10 @@ async def recommend_interventions(
     try:
         cf_service = get_collaborative_filtering_service()
 
-        # Convert request interventions to list of dicts
-        interventions = [i.dict() for i in request.available_interventions]
-
+        # Models go through as-is; only the recommended ones get serialized
         result = await cf_service.recommend_interventions(
             str(current_user["id"]),
-            interventions,
+            request.available_interventions,
             n_recommendations=request.n_recommendations
         )
 
@@ -516,24 +571,27 @@ async def record_intervention_effectiveness(
         )
 
         if result['success']:
-            # Get user's profile_id
-            profile = db.query(UserProfile)\
-                .filter(UserProfile.user_id == current_user["id"])\
-                .first()
-
-            if profile:
-                # Store in database
-                db_effectiveness = InterventionEffectiveness(
-                    profile_id=profile.profile_id,
-                    intervention_id=request.intervention_id,
-                    effectiveness_score=request.effectiveness_score,
-                    mood_before=request.mood_before,
-                    mood_after=request.mood_after,
-                    mood_improvement=(request.mood_after - request.mood_before)
-                    if request.mood_before and request.mood_after else None
-                )
-                db.add(db_effectiveness)
-                db.commit()
+            # INSERT ... SELECT from the user's profile: no separate lookup, and
+            # nothing is written when the user has no profile. The improvement
+            # is computed in SQL (NULL if either mood is missing).
+            columns = InterventionEffectiveness.__table__.c
+            mood_before = literal(request.mood_before, columns.mood_before.type)
+            mood_after = literal(request.mood_after, columns.mood_after.type)
+            db.execute(insert(InterventionEffectiveness).from_select(
+                ['id', 'profile_id', 'intervention_id', 'effectiveness_score',
+                 'n_uses', 'mood_before', 'mood_after', 'mood_improvement'],
+                select(
+                    literal(uuid.uuid4(), columns.id.type),
+                    UserProfile.profile_id,
+                    literal(request.intervention_id, columns.intervention_id.type),
+                    literal(request.effectiveness_score, columns.effectiveness_score.type),
+                    literal(1, columns.n_uses.type),
+                    mood_before,
+                    mood_after,
+                    mood_after - mood_before
+                ).where(UserProfile.user_id == current_user["id"])
+            ))
+            db.commit()
 
         return result
 
@@ -555,13 +613,13 @@ async def find_similar_users(
     """
     try:
         cf_service = get_collaborative_filtering_service()
-        result = await cf_service.find_similar_users(
-            str(current_user["id"]),
-            top_k=top_k
+        return await cached(
+            f"similar-users:{current_user['id']}:{top_k}",
+            SIMILAR_USERS_CACHE_TTL,
+            lambda: cf_service.find_similar_users(str(current_user["id"]), top_k=top_k),
+            lambda r: r.get('success', True)
         )
 
-        return result
-
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -692,12 +750,13 @@ async def list_ab_tests(
     db: Session = Depends(get_db)
 ):
     """List all A/B tests"""
-    query = db.query(ABTest)
+    # Table columns as plain mappings; no ORM objects to hydrate or re-walk
+    query = select(ABTest.__table__)
 
     if status_filter:
-        query = query.filter(ABTest.status == status_filter)
+        query = query.where(ABTest.status == status_filter)
 
-    tests = query.order_by(ABTest.created_at.desc()).all()
+    tests = [dict(row) for row in db.execute(query.order_by(ABTest.created_at.desc())).mappings()]
 
     return {"tests": tests, "count": len(tests)}
 
@@ -0,0 +1,70 @@
+"""
+Micro-batching for LSTM forecasts
+Concurrent /predict-mood requests each hold one (T, F) sequence; a single
+forward pass over a (B, T, F) batch costs about the same as one at batch 1.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from app.core.batching import MicroBatchWorker
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedPredictor:
+    """Coalesce concurrent single-sequence forecasts into one forward pass"""
+
+    def __init__(
+        self,
+        forward: Callable[[np.ndarray], np.ndarray],
+        max_batch: int = 32,
+        window_seconds: float = 0.015
+    ):
+        """
+        Args:
+            forward: Maps a (B, T, F) float32 batch to (B, horizon) predictions
+            max_batch: Most sequences run in one forward pass
+            window_seconds: How long the first request waits for company
+        """
+        self.forward = forward
+        self._worker: MicroBatchWorker[Tuple[np.ndarray, asyncio.Future]] = MicroBatchWorker(
+            self._handle, max_batch=max_batch, max_wait_seconds=window_seconds, name="LSTM forecast"
+        )
+
+    async def submit(self, sequence: np.ndarray) -> np.ndarray:
+        """Queue one (T, F) sequence and wait for its predictions"""
+        future = asyncio.get_running_loop().create_future()
+        self._worker.put((np.asarray(sequence, dtype=np.float32), future))
+        return await future
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.forward(batch))
+
+    async def _handle(self, items: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        # Sequences share the model's window length; group defensively
+        # in case the model was retrained with a different one mid-batch
+        by_shape = defaultdict(list)
+        for sequence, future in items:
+            by_shape[sequence.shape].append((sequence, future))
+
+        for group in by_shape.values():
+            futures = [future for _, future in group]
+            try:
+                outputs = await asyncio.to_thread(
+                    self._run, np.stack([sequence for sequence, _ in group])
+                )
+            except Exception as e:
+                logger.error(f"Batched forecast of {len(group)} sequences failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for future, output in zip(futures, outputs):
+                if not future.done():
+                    future.set_result(output)
@@ -3,20 +3,274 @@ Collaborative Filtering Service
 Implements user clustering, intervention recommendations, and A/B testing framework
 """
 
+import functools
 import logging
-from typing import Dict, List, Optional, Set
-from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from datetime import datetime, timedelta, timezone
 import hashlib
 import numpy as np
-import pandas as pd
-from sklearn.cluster import KMeans, DBSCAN
+from sklearn.cluster import MiniBatchKMeans, DBSCAN
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import PCA
+from scipy.sparse import csr_matrix
+from scipy.special import stdtr
 from scipy.spatial.distance import euclidean
 
+# Make Numba optional; profile statistics fall back to numpy
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Make hnswlib optional; similarity search stays exact without it
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    HAS_HNSWLIB = False
+
+from app.ml.mood_data import MoodData
+
+# A candidate intervention: a dict or any object with an ``id`` attribute
+# (e.g. the API's request model, passed through without dumping)
+Intervention = Union[Dict, Any]
+
 logger = logging.getLogger(__name__)
 
+# Below this many profiles an exact GEMV beats building and querying an ANN index
+ANN_MIN_PROFILES = 10_000
+
+
+def _n_records(mood_data: MoodData) -> int:
+    """Row count for either mood data layout"""
+    if isinstance(mood_data, dict):
+        return len(next(iter(mood_data.values()), ()))
+    return len(mood_data)
+
+
+def _naive_utc(value: Union[str, datetime]) -> datetime:
+    """A date/datetime (or ISO string) as a naive UTC datetime"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if getattr(value, 'tzinfo', None) is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _mood_columns(mood_data: MoodData) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Mood scores as float64 and dates as datetime64[D] (None when the data has
+    no dates), for either mood data layout. Records without a score are dropped.
+    """
+    if isinstance(mood_data, dict):
+        scores = np.asarray(mood_data.get('mood_score', ()), dtype=np.float64)
+        dates = mood_data.get('date')
+        if dates is not None:
+            dates = np.asarray(dates).astype('datetime64[D]')
+    else:
+        scores = np.fromiter(
+            (np.nan if d.get('mood_score') is None else d['mood_score'] for d in mood_data),
+            dtype=np.float64,
+            count=len(mood_data)
+        )
+        dates = None
+        if mood_data and 'date' in mood_data[0]:
+            raw_dates = [d['date'] for d in mood_data]
+            try:
+                dates = np.array(raw_dates, dtype='datetime64[s]')
+            except (ValueError, TypeError):
+                # Timezone-aware datetimes have no datetime64 form; go via naive UTC
+                dates = np.array([_naive_utc(d) for d in raw_dates], dtype='datetime64[s]')
+            dates = dates.astype('datetime64[D]')
+
+    present = ~np.isnan(scores)
+    if not present.all():
+        scores = scores[present]
+        dates = dates[present] if dates is not None else None
+    return scores, dates
+
+
+def _mood_trend(values: np.ndarray) -> float:
+    """
+    Least-squares slope of values against day index, in closed form. For
+    x = 0..n-1 the denominator sum((x - mean(x))^2) is n(n^2 - 1)/12, so no
+    design matrix is needed.
+    """
+    n = len(values)
+    if n < 2:
+        return 0.0
+
+    x_centered = np.arange(n) - (n - 1) / 2.0
+    return float(x_centered @ (values - values.mean()) / (n * (n * n - 1) / 12.0))
+
+
+def _lag1_autocorrelation(values: np.ndarray) -> float:
+    """Lag-1 autocorrelation (0 under a week of data, 1 for a constant series)"""
+    n = len(values)
+    if n < 7:
+        return 0.0
+
+    # Centered once; variance and lag-1 covariance are both dot products
+    centered = values - values.mean()
+    sum_sq = centered @ centered
+
+    if sum_sq == 0:
+        return 1.0
+
+    return float((centered[:-1] @ centered[1:]) / (sum_sq / n * (n - 1)))
+
+
+def _mood_stats_numpy(x: np.ndarray) -> Tuple[float, ...]:
+    """
+    (mean, median, std, min, max, trend, positive ratio, negative ratio,
+    mean |daily change|, std of daily change, lag-1 autocorrelation) of a
+    non-empty score array; sample std uses ddof=1, 0 when undefined
+    """
+    n = x.size
+    diff = np.diff(x)
+    return (
+        x.mean(),
+        np.median(x),
+        x.std(ddof=1) if n > 1 else 0.0,
+        x.min(),
+        x.max(),
+        _mood_trend(x),
+        (x >= 7).mean(),
+        (x <= 4).mean(),
+        np.abs(diff).mean() if n > 1 else 0.0,
+        diff.std(ddof=1) if n > 2 else 0.0,
+        _lag1_autocorrelation(x)
+    )
+
+
+def _mood_stats_loop(x):
+    """Same statistics as _mood_stats_numpy in three fused passes (compiled with Numba)"""
+    n = x.size
+    half = (n - 1) / 2.0
+    total = 0.0
+    lo = x[0]
+    hi = x[0]
+    n_pos = 0
+    n_neg = 0
+    trend_num = 0.0
+    for i in range(n):
+        v = x[i]
+        total += v
+        lo = min(lo, v)
+        hi = max(hi, v)
+        if v >= 7:
+            n_pos += 1
+        if v <= 4:
+            n_neg += 1
+        trend_num += (i - half) * v
+    mean = total / n
+
+    sq = 0.0
+    lag = 0.0
+    step_total = 0.0
+    step_abs = 0.0
+    for i in range(n):
+        d = x[i] - mean
+        sq += d * d
+        if i > 0:
+            lag += (x[i - 1] - mean) * d
+            step = x[i] - x[i - 1]
+            step_total += step
+            step_abs += abs(step)
+
+    step_sq = 0.0
+    if n > 2:
+        step_mean = step_total / (n - 1)
+        for i in range(1, n):
+            d = x[i] - x[i - 1] - step_mean
+            step_sq += d * d
+
+    if n < 7:
+        autocorr = 0.0
+    elif sq == 0:
+        autocorr = 1.0
+    else:
+        autocorr = lag / (sq / n * (n - 1))
+
+    return (
+        mean,
+        np.median(x),
+        np.sqrt(sq / (n - 1)) if n > 1 else 0.0,
+        lo,
+        hi,
+        trend_num / (n * (n * n - 1) / 12.0) if n > 1 else 0.0,
+        n_pos / n,
+        n_neg / n,
+        step_abs / (n - 1) if n > 1 else 0.0,
+        np.sqrt(step_sq / (n - 2)) if n > 2 else 0.0,
+        autocorr
+    )
+
+
+_mood_stats = njit(cache=True, fastmath=True)(_mood_stats_loop) if HAS_NUMBA else _mood_stats_numpy
+
+
+@functools.lru_cache(maxsize=65536)
+def _anonymize(user_id: str) -> str:
+    """Profile ID for a user ID; memoized since every CF call re-derives it"""
+    return hashlib.sha256(user_id.encode()).hexdigest()[:16]
+
+
+class _GrowArray:
+    """Append-only float64 buffer with amortized doubling; view() is zero-copy"""
+
+    def __init__(self, capacity: int = 64):
+        self._buf = np.empty(capacity, dtype=np.float64)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, value: float) -> None:
+        if self._n == self._buf.size:
+            grown = np.empty(self._buf.size * 2, dtype=np.float64)
+            grown[:self._n] = self._buf
+            self._buf = grown
+        self._buf[self._n] = value
+        self._n += 1
+
+    def view(self) -> np.ndarray:
+        return self._buf[:self._n]
+
+
+def _welford_update(stats: List, value: float) -> None:
+    """Fold one value into running [n, mean, sum of squared deviations]"""
+    stats[0] += 1
+    delta = value - stats[1]
+    stats[1] += delta / stats[0]
+    stats[2] += delta * (value - stats[1])
+
+
+def _welch_t_test(stats_a: List, stats_b: List) -> Tuple[float, float]:
+    """Welch's t statistic and two-sided p-value from running [n, mean, M2] stats"""
+    # float64 scalars, so zero variances give inf/nan instead of ZeroDivisionError
+    n_a, mean_a, m2_a = np.asarray(stats_a, dtype=np.float64)
+    n_b, mean_b, m2_b = np.asarray(stats_b, dtype=np.float64)
+    se_a = m2_a / (n_a - 1) / n_a
+    se_b = m2_b / (n_b - 1) / n_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = (mean_a - mean_b) / np.sqrt(se_a + se_b)
+        df = (se_a + se_b) ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+        # Both variances zero: df is undefined but irrelevant (t is 0/0 or
+        # infinite); use 1 like scipy.stats.ttest_ind
+        if np.isnan(df):
+            df = 1.0
+        p_value = 2 * stdtr(df, -np.abs(t_stat))
+    return float(t_stat), float(p_value)
+
+
+def _intervention_id(intervention: Intervention) -> str:
+    """ID of a candidate intervention, read by key or attribute"""
+    if isinstance(intervention, dict):
+        return intervention['id']
+    return intervention.id
+
 
 class CollaborativeFilteringService:
     """
@@ -29,14 +283,35 @@ class CollaborativeFilteringService:
         self.user_clusters = {}
         self.cluster_model = None
         self.scaler = StandardScaler()
+        # Scaler statistics are folded in per new profile; a re-profiled user
+        # would be counted twice, so that forces one full refit instead
+        self._scaler_stale = False
         self.user_profiles = {}
         self.intervention_effectiveness = {}
         self.ab_tests = {}
+        self._rng = np.random.default_rng()
+        # L2-normalized (U, F) float32 profile matrix for similarity search,
+        # a view of a buffer with spare rows; updated row-wise as profiles change
+        self._profile_matrix: Optional[np.ndarray] = None
+        self._profile_buffer: Optional[np.ndarray] = None
+        self._profile_ids: List[str] = []
+        self._profile_rows: Dict[str, int] = {}
+        # HNSW inner-product index over the profile matrix rows (large N only)
+        self._ann_index = None
+        # Feature order of every profile 'vec', fixed by the first profile
+        self._feature_names: Optional[Tuple[str, ...]] = None
+        # intervention_effectiveness as sparse (profiles x interventions) score
+        # and presence matrices; rebuilt lazily after effectiveness changes
+        self._effectiveness_matrix: Optional[csr_matrix] = None
+        self._effectiveness_mask: Optional[csr_matrix] = None
+        self._effectiveness_rows: Dict[str, int] = {}
+        self._intervention_columns: Dict[str, int] = {}
+        self._profile_effectiveness_rows: Optional[np.ndarray] = None
 
     async def create_user_profile(
         self,
         user_id: str,
-        mood_data: List[Dict],
+        mood_data: MoodData,
         demographics: Optional[Dict] = None,
         anonymize: bool = True
     ) -> Dict:
@@ -67,12 +342,26 @@ class CollaborativeFilteringService:
                 demo_features = self._extract_demographic_features(demographics)
                 features.update(demo_features)
 
-            # Store profile
+            # Store profile, with the features as a vector in fixed order
+            if self._feature_names is None:
+                self._feature_names = tuple(features)
+            is_new_profile = profile_id not in self.user_profiles
             self.user_profiles[profile_id] = {
                 'features': features,
+                'vec': np.fromiter(
+                    (features.get(name, 0.0) for name in self._feature_names),
+                    dtype=np.float64,
+                    count=len(self._feature_names)
+                ),
                 'created_at': datetime.utcnow().isoformat(),
-                'n_data_points': len(mood_data)
+                'n_data_points': _n_records(mood_data)
             }
+            self._refresh_profile_matrix_row(profile_id)
+
+            if is_new_profile and not self._scaler_stale:
+                self.scaler.partial_fit(self.user_profiles[profile_id]['vec'].reshape(1, -1))
+            else:
+                self._scaler_stale = True
 
             return {
                 'profile_id': profile_id,
@@ -85,10 +374,14 @@ class CollaborativeFilteringService:
             return {'success': False, 'error': str(e)}
 
     def _anonymize_user_id(self, user_id: str) -> str:
-        """Create anonymized hash of user ID"""
-        return hashlib.sha256(user_id.encode()).hexdigest()[:16]
+        """
+        Create anonymized hash of user ID.
+        Stays SHA-256: profile_id is persisted in user_profiles and referenced
+        by intervention_effectiveness, so changing the hash orphans history.
+        """
+        return _anonymize(user_id)
 
-    def _extract_user_features(self, mood_data: List[Dict]) -> Dict:
+    def _extract_user_features(self, mood_data: MoodData) -> Dict:
         """
         Extract feature vector from user's mood data
 
@@ -98,86 +391,58 @@ class CollaborativeFilteringService:
         Returns:
             Feature dictionary
         """
-        df = pd.DataFrame(mood_data)
+        scores, dates = _mood_columns(mood_data)
 
-        if len(df) == 0:
+        if scores.size == 0:
             return self._default_features()
 
+        (mean, median, std, lo, hi, trend, positive_ratio, negative_ratio,
+         change_mean, change_std, consistency) = _mood_stats(scores)
+
         # Statistical features
         features = {
             # Central tendency
-            'mean_mood': float(df['mood_score'].mean()),
-            'median_mood': float(df['mood_score'].median()),
+            'mean_mood': float(mean),
+            'median_mood': float(median),
 
             # Variability
-            'std_mood': float(df['mood_score'].std()),
-            'mood_range': float(df['mood_score'].max() - df['mood_score'].min()),
-            'coefficient_of_variation': float(df['mood_score'].std() / df['mood_score'].mean())
-            if df['mood_score'].mean() > 0 else 0,
+            'std_mood': float(std),
+            'mood_range': float(hi - lo),
+            'coefficient_of_variation': float(std / mean) if mean > 0 else 0,
 
             # Trends
-            'trend': self._calculate_trend(df['mood_score'].values),
-            'positive_days_ratio': float((df['mood_score'] >= 7).sum() / len(df)),
-            'negative_days_ratio': float((df['mood_score'] <= 4).sum() / len(df)),
+            'trend': float(trend),
+            'positive_days_ratio': float(positive_ratio),
+            'negative_days_ratio': float(negative_ratio),
 
             # Volatility
-            'daily_change_mean': float(df['mood_score'].diff().abs().mean()),
-            'daily_change_std': float(df['mood_score'].diff().std()),
+            'daily_change_mean': float(change_mean),
+            'daily_change_std': float(change_std),
 
             # Temporal patterns
-            'weekend_effect': self._calculate_weekend_effect(df),
-            'consistency_score': self._calculate_consistency_score(df)
+            'weekend_effect': self._calculate_weekend_effect(scores, dates),
+            'consistency_score': float(consistency)
         }
 
         return features
 
-    def _calculate_trend(self, values: np.ndarray) -> float:
-        """Calculate linear trend of mood over time"""
-        if len(values) < 2:
-            return 0.0
-
-        x = np.arange(len(values))
-        coeffs = np.polyfit(x, values, 1)
-        return float(coeffs[0])  # Slope
-
-    def _calculate_weekend_effect(self, df: pd.DataFrame) -> float:
+    def _calculate_weekend_effect(self, scores: np.ndarray, dates: Optional[np.ndarray]) -> float:
         """Calculate difference between weekend and weekday mood"""
-        if 'date' not in df.columns:
+        if dates is None:
             return 0.0
 
-        df['date'] = pd.to_datetime(df['date'])
-        df['is_weekend'] = df['date'].dt.dayofweek >= 5
+        # 1970-01-01 was a Thursday: Monday=0 weekday is (days + 3) % 7
+        is_weekend = (dates.view('i8') + 3) % 7 >= 5
+        n_weekend = int(is_weekend.sum())
 
-        if df['is_weekend'].sum() == 0 or (~df['is_weekend']).sum() == 0:
+        if n_weekend == 0 or n_weekend == len(is_weekend):
             return 0.0
 
-        weekend_mood = df[df['is_weekend']]['mood_score'].mean()
-        weekday_mood = df[~df['is_weekend']]['mood_score'].mean()
+        weekend_mood = scores[is_weekend].mean()
+        weekday_mood = scores[~is_weekend].mean()
 
         return float(weekend_mood - weekday_mood)
 
-    def _calculate_consistency_score(self, df: pd.DataFrame) -> float:
-        """Calculate how consistent mood patterns are"""
-        if len(df) < 7:
-            return 0.0
-
-        # Calculate autocorrelation
-        mood_values = df['mood_score'].values
-        mean = np.mean(mood_values)
-        var = np.var(mood_values)
-
-        if var == 0:
-            return 1.0
-
-        # Lag-1 autocorrelation
-        autocorr = np.correlate(
-            mood_values[:-1] - mean,
-            mood_values[1:] - mean,
-            mode='valid'
-        )[0] / (var * (len(mood_values) - 1))
-
-        return float(autocorr)
-
     def _extract_demographic_features(self, demographics: Dict) -> Dict:
         """Extract and anonymize demographic features"""
         features = {}
@@ -235,22 +500,24 @@ class CollaborativeFilteringService:
 
             # Prepare feature matrix
             profile_ids = list(self.user_profiles.keys())
-            features = [
-                list(self.user_profiles[pid]['features'].values())
-                for pid in profile_ids
-            ]
-
-            X = np.array(features)
+            X = self._build_feature_matrix(profile_ids)
 
             # Standardize features
-            X_scaled = self.scaler.fit_transform(X)
+            if self._scaler_stale:
+                X_scaled = self.scaler.fit_transform(X)
+                self._scaler_stale = False
+            else:
+                X_scaled = self.scaler.transform(X)
 
             # Apply clustering
             if method == 'kmeans':
-                self.cluster_model = KMeans(
+                # Mini-batch Lloyd steps are a few dense products against the
+                # centroids; three restarts are plenty for well-separated profiles
+                self.cluster_model = MiniBatchKMeans(
                     n_clusters=n_clusters,
                     random_state=42,
-                    n_init=10
+                    n_init=3,
+                    batch_size=1024
                 )
             elif method == 'dbscan':
                 self.cluster_model = DBSCAN(
@@ -273,11 +540,18 @@ class CollaborativeFilteringService:
                 profile_ids
             )
 
+            # Label histogram; DBSCAN noise (-1) is counted separately
+            counts = np.bincount(cluster_labels[cluster_labels >= 0])
+            cluster_distribution = {int(label): int(n) for label, n in enumerate(counts) if n}
+            n_noise = int((cluster_labels < 0).sum())
+            if n_noise:
+                cluster_distribution[-1] = n_noise
+
             return {
                 'success': True,
                 'n_users': len(profile_ids),
                 'n_clusters': len(set(cluster_labels)),
-                'cluster_distribution': dict(pd.Series(cluster_labels).value_counts()),
+                'cluster_distribution': cluster_distribution,
                 'cluster_analysis': cluster_analysis
             }
 
@@ -293,39 +567,41 @@ class CollaborativeFilteringService:
     ) -> Dict:
         """Analyze cluster characteristics"""
         clusters = {}
-
-        for cluster_id in set(labels):
-            if cluster_id == -1:  # Noise cluster in DBSCAN
-                continue
-
-            cluster_mask = labels == cluster_id
-            cluster_data = X[cluster_mask]
-
-            # Get original feature names
-            sample_profile = list(self.user_profiles.values())[0]
-            feature_names = list(sample_profile['features'].keys())
-
-            # Calculate cluster center (in original feature space)
-            cluster_center = cluster_data.mean(axis=0)
-
-            # Find defining features (highest deviation from global mean)
-            global_mean = X.mean(axis=0)
-            feature_importance = np.abs(cluster_center - global_mean)
-            top_features_idx = np.argsort(feature_importance)[-3:][::-1]
-
+        feature_names = self._feature_names
+
+        # All cluster centers (in original feature space) in one pass over X;
+        # DBSCAN noise (-1) is left out
+        assigned = labels >= 0
+        cluster_ids, inverse = np.unique(labels[assigned], return_inverse=True)
+        if cluster_ids.size == 0:
+            return clusters
+        sizes = np.bincount(inverse)
+        centers = np.zeros((cluster_ids.size, X.shape[1]))
+        np.add.at(centers, inverse, X[assigned])
+        centers /= sizes[:, None]
+
+        # Defining features: top 3 deviations from the global mean per cluster
+        importance = np.abs(centers - X.mean(axis=0))
+        k = min(3, importance.shape[1])
+        top_idx = np.argpartition(-importance, k - 1, axis=1)[:, :k]
+        top_idx = np.take_along_axis(
+            top_idx, np.argsort(-np.take_along_axis(importance, top_idx, axis=1), axis=1), axis=1
+        )
+
+        for cluster_id, size, center, top_features_idx in zip(cluster_ids, sizes, centers, top_idx):
             clusters[int(cluster_id)] = {
-                'size': int(cluster_mask.sum()),
+                'size': int(size),
                 'defining_features': [
                     {
                         'feature': feature_names[idx],
-                        'value': float(cluster_center[idx])
+                        'value': float(center[idx])
                     }
                     for idx in top_features_idx
                 ],
                 'description': self._generate_cluster_description(
                     cluster_id,
                     feature_names,
-                    cluster_center
+                    center
                 )
             }
 
@@ -370,39 +646,19 @@ class CollaborativeFilteringService:
             if profile_id not in self.user_profiles:
                 return {'success': False, 'error': 'User profile not found'}
 
-            # Get user's feature vector
-            user_features = np.array(
-                list(self.user_profiles[profile_id]['features'].values())
-            ).reshape(1, -1)
-
-            # Get all other users' features
-            other_profiles = {
-                pid: prof for pid, prof in self.user_profiles.items()
-                if pid != profile_id
-            }
-
-            if len(other_profiles) == 0:
+            if len(self.user_profiles) < 2:
                 return {'success': False, 'error': 'No other users to compare'}
 
-            other_ids = list(other_profiles.keys())
-            other_features = np.array([
-                list(other_profiles[pid]['features'].values())
-                for pid in other_ids
-            ])
-
-            # Calculate similarities
-            similarities = cosine_similarity(user_features, other_features)[0]
-
-            # Get top-k similar users
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            top_rows, similarities = self._find_similar_impl(profile_id, top_k)
+            other_ids = self._profile_ids
 
             similar_users = [
                 {
-                    'profile_id': other_ids[idx],
-                    'similarity': float(similarities[idx]),
-                    'cluster': self.user_clusters.get(other_ids[idx])
+                    'profile_id': other_ids[row],
+                    'similarity': float(similarity),
+                    'cluster': self.user_clusters.get(other_ids[row])
                 }
-                for idx in top_indices
+                for row, similarity in zip(top_rows, similarities)
             ]
 
             return {
@@ -415,10 +671,160 @@ class CollaborativeFilteringService:
             logger.error(f"Similar users search error: {e}")
             return {'success': False, 'error': str(e)}
 
+    def _find_similar_impl(self, profile_id: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows (into _profile_ids) and cosine similarities of the top_k profiles
+        most similar to an existing profile, best first, excluding itself
+        """
+        matrix = self._get_profile_matrix()
+        row = self._profile_rows[profile_id]
+
+        # Approximate search on large populations
+        k = max(0, min(top_k, len(self._profile_ids) - 1))
+        ann_index = self._get_ann_index(matrix)
+        if ann_index is not None and k > 0:
+            ann_index.set_ef(max(64, k + 1))
+            labels, distances = ann_index.knn_query(matrix[row], k=k + 1)
+            keep = labels[0] != row  # exclude the user themself
+            top_rows = labels[0][keep][:k].astype(np.intp)
+            return top_rows, (1.0 - distances[0][keep][:k]).astype(matrix.dtype)
+
+        # Cosine similarity against every profile in one GEMV
+        similarities = matrix @ matrix[row]
+        similarities[row] = -np.inf  # exclude the user themself
+
+        # Top-k without sorting every profile
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=similarities.dtype)
+        top_rows = np.argpartition(-similarities, k - 1)[:k]
+        top_rows = top_rows[np.argsort(-similarities[top_rows])]
+        return top_rows, similarities[top_rows]
+
+    def _get_ann_index(self, matrix: np.ndarray):
+        """
+        HNSW index over the normalized profile rows (inner product = cosine),
+        or None without hnswlib or below ANN_MIN_PROFILES. Rows only ever get
+        appended, so new profiles are added incrementally.
+        """
+        if not HAS_HNSWLIB or len(matrix) < ANN_MIN_PROFILES:
+            return None
+
+        if self._ann_index is None:
+            self._ann_index = hnswlib.Index(space='ip', dim=matrix.shape[1])
+            self._ann_index.init_index(max_elements=2 * len(matrix), ef_construction=200, M=16)
+
+        index = self._ann_index
+        count = index.get_current_count()
+        if count < len(matrix):
+            if len(matrix) > index.get_max_elements():
+                index.resize_index(2 * len(matrix))
+            index.add_items(matrix[count:], np.arange(count, len(matrix)))
+        return index
+
+    def _build_feature_matrix(self, profile_ids: List[str], dtype=np.float64) -> np.ndarray:
+        """
+        Stack profile vectors into one (N, F) array (columns in _feature_names
+        order; features a profile lacks, e.g. demographics, are 0)
+        """
+        X = np.empty((len(profile_ids), len(self._feature_names or ())), dtype=dtype)
+        for i, pid in enumerate(profile_ids):
+            X[i] = self.user_profiles[pid]['vec']
+        return X
+
+    def _get_profile_matrix(self) -> np.ndarray:
+        """Build (or reuse) the L2-normalized profile matrix"""
+        if self._profile_matrix is None:
+            self._profile_ids = list(self.user_profiles.keys())
+            self._profile_rows = {pid: i for i, pid in enumerate(self._profile_ids)}
+            matrix = self._build_feature_matrix(self._profile_ids, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._profile_buffer = np.ascontiguousarray(matrix / norms)
+            self._profile_matrix = self._profile_buffer
+        return self._profile_matrix
+
+    def _refresh_profile_matrix_row(self, profile_id: str) -> None:
+        """
+        Keep the cached matrix (and ANN index) in step with a stored profile:
+        a re-profiled user's row is rewritten in place, a new user's row is
+        appended (capacity doubles when the buffer is full)
+        """
+        row = self._profile_rows.get(profile_id)
+        if row is None:
+            if self._profile_matrix is None:
+                return  # built on the next similarity query
+
+            row = len(self._profile_ids)
+            if row == len(self._profile_buffer):
+                grown = np.empty((2 * row, self._profile_buffer.shape[1]), dtype=np.float32)
+                grown[:row] = self._profile_buffer[:row]
+                self._profile_buffer = grown
+            self._profile_ids.append(profile_id)
+            self._profile_rows[profile_id] = row
+            self._profile_matrix = self._profile_buffer[:row + 1]
+
+        vector = self.user_profiles[profile_id]['vec'].astype(np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+
+        # Rows are stable across rebuilds, so the index entry stays valid
+        if self._ann_index is not None and row < self._ann_index.get_current_count():
+            self._ann_index.add_items(vector[None, :], [row])
+        if self._profile_matrix is not None:
+            self._profile_matrix[row] = vector
+
+    def _get_effectiveness_matrices(self) -> Tuple[csr_matrix, csr_matrix]:
+        """
+        Build (or reuse) intervention_effectiveness as CSR matrices: scores and
+        a 0/1 "tried" mask, rows per profile and columns per intervention
+        """
+        if self._effectiveness_matrix is None:
+            self._effectiveness_rows = {}
+            self._intervention_columns = {}
+            indptr, indices, data = [0], [], []
+            for profile_id, scores in self.intervention_effectiveness.items():
+                self._effectiveness_rows[profile_id] = len(self._effectiveness_rows)
+                for intervention_id, score in scores.items():
+                    indices.append(
+                        self._intervention_columns.setdefault(intervention_id, len(self._intervention_columns))
+                    )
+                    data.append(score)
+                indptr.append(len(indices))
+
+            shape = (len(self._effectiveness_rows), len(self._intervention_columns))
+            indices = np.asarray(indices, dtype=np.int32)
+            indptr = np.asarray(indptr, dtype=np.int32)
+            self._effectiveness_matrix = csr_matrix(
+                (np.asarray(data, dtype=np.float64), indices, indptr), shape=shape
+            )
+            self._effectiveness_mask = csr_matrix(
+                (np.ones(len(data), dtype=np.float64), indices, indptr), shape=shape
+            )
+            self._profile_effectiveness_rows = None
+        return self._effectiveness_matrix, self._effectiveness_mask
+
+    def _get_profile_effectiveness_rows(self) -> np.ndarray:
+        """
+        Effectiveness-matrix row for each similarity-matrix row (-1 when the
+        profile has no recorded effectiveness); extended as profiles are added
+        """
+        lookup = self._profile_effectiveness_rows
+        start = 0 if lookup is None else len(lookup)
+        if start < len(self._profile_ids):
+            tail = np.fromiter(
+                (self._effectiveness_rows.get(pid, -1) for pid in self._profile_ids[start:]),
+                dtype=np.intp,
+                count=len(self._profile_ids) - start
+            )
+            lookup = tail if lookup is None else np.concatenate([lookup, tail])
+            self._profile_effectiveness_rows = lookup
+        return lookup
+
     async def recommend_interventions(
         self,
         user_id: str,
-        available_interventions: List[Dict],
+        available_interventions: Sequence[Intervention],
         n_recommendations: int = 5
     ) -> Dict:
         """
@@ -426,68 +832,63 @@ class CollaborativeFilteringService:
 
         Args:
             user_id: User ID
-            available_interventions: List of available interventions
+            available_interventions: Candidate interventions (dicts or models
+                with an ``id``); returned as given in the recommendations
             n_recommendations: Number of recommendations
 
         Returns:
             Ranked intervention recommendations
         """
         try:
-            # Find similar users
-            similar_users = await self.find_similar_users(user_id, top_k=20)
+            # Find similar users (no result dicts; rows and similarities only)
+            profile_id = self._anonymize_user_id(user_id)
 
-            if not similar_users.get('success'):
+            if profile_id not in self.user_profiles or len(self.user_profiles) < 2:
                 # Fallback to general recommendations
                 return self._get_general_recommendations(
                     available_interventions,
                     n_recommendations
                 )
 
-            # Get interventions that worked for similar users
-            intervention_scores = {}
-
-            for similar_user in similar_users['similar_users']:
-                similarity = similar_user['similarity']
-                profile_id = similar_user['profile_id']
-
-                # Get effective interventions for this user
-                if profile_id in self.intervention_effectiveness:
-                    for intervention_id, effectiveness in \
-                            self.intervention_effectiveness[profile_id].items():
-                        if intervention_id not in intervention_scores:
-                            intervention_scores[intervention_id] = {
-                                'weighted_effectiveness': 0,
-                                'total_weight': 0,
-                                'n_users': 0
-                            }
-
-                        intervention_scores[intervention_id]['weighted_effectiveness'] += \
-                            effectiveness * similarity
-                        intervention_scores[intervention_id]['total_weight'] += similarity
-                        intervention_scores[intervention_id]['n_users'] += 1
-
-            # Calculate final scores
-            recommendations = []
-            for intervention in available_interventions:
-                intervention_id = intervention['id']
-
-                if intervention_id in intervention_scores:
-                    score_data = intervention_scores[intervention_id]
-                    avg_effectiveness = (
-                        score_data['weighted_effectiveness'] /
-                        score_data['total_weight']
-                        if score_data['total_weight'] > 0 else 0
-                    )
-
-                    recommendations.append({
-                        'intervention': intervention,
-                        'score': avg_effectiveness,
-                        'evidence_from_n_users': score_data['n_users'],
-                        'confidence': min(score_data['n_users'] / 5, 1.0)
-                    })
+            similar_rows, similarities = self._find_similar_impl(profile_id, top_k=20)
+
+            # Weighted effectiveness of every intervention across the similar
+            # users who tried it: two sparse matrix-vector products
+            effectiveness, tried = self._get_effectiveness_matrices()
+            rows = self._get_profile_effectiveness_rows()[similar_rows]
+            has_history = rows >= 0
+            rows = rows[has_history]
+            weights = similarities[has_history].astype(np.float64)
+
+            # Candidates' columns; -1 (never recorded) hits the zero sentinel
+            columns = np.fromiter(
+                (self._intervention_columns.get(_intervention_id(i), -1) for i in available_interventions),
+                dtype=np.intp,
+                count=len(available_interventions)
+            )
 
-            # Sort by score
-            recommendations.sort(key=lambda x: x['score'], reverse=True)
+            recommendations = []
+            if rows.size:
+                tried_rows = tried[rows]
+                weighted_effectiveness = np.append(effectiveness[rows].T @ weights, 0.0)[columns]
+                total_weight = np.append(tried_rows.T @ weights, 0.0)[columns]
+                n_users = np.append(np.asarray(tried_rows.sum(axis=0)).ravel(), 0.0)[columns]
+
+                # Calculate final scores, sorted best first (ties keep input order)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    scores = np.where(total_weight > 0, weighted_effectiveness / total_weight, 0.0)
+                ranked = np.flatnonzero(n_users > 0)
+                ranked = ranked[np.argsort(-scores[ranked], kind='stable')]
+
+                recommendations = [
+                    {
+                        'intervention': available_interventions[i],
+                        'score': float(scores[i]),
+                        'evidence_from_n_users': int(n_users[i]),
+                        'confidence': float(min(n_users[i] / 5, 1.0))
+                    }
+                    for i in ranked
+                ]
 
             # Fill with general recommendations if needed
             if len(recommendations) < n_recommendations:
@@ -500,7 +901,7 @@ class CollaborativeFilteringService:
             return {
                 'success': True,
                 'recommendations': recommendations[:n_recommendations],
-                'based_on_similar_users': len(similar_users.get('similar_users', []))
+                'based_on_similar_users': len(similar_rows)
             }
 
         except Exception as e:
@@ -509,7 +910,7 @@ class CollaborativeFilteringService:
 
     def _get_general_recommendations(
         self,
-        interventions: List[Dict],
+        interventions: Sequence[Intervention],
         n: int
     ) -> Dict:
         """Get general recommendations when no user data available"""
@@ -552,6 +953,7 @@ class CollaborativeFilteringService:
 
             self.intervention_effectiveness[profile_id][intervention_id] = \
                 float(effectiveness_score)
+            self._effectiveness_matrix = None
 
             return {'success': True}
 
@@ -579,8 +981,9 @@ class CollaborativeFilteringService:
             A/B test configuration
         """
         try:
+            now = datetime.utcnow()
             test_id = hashlib.sha256(
-                f"{test_name}_{datetime.utcnow().isoformat()}".encode()
+                f"{test_name}_{now.isoformat()}".encode()
             ).hexdigest()[:16]
 
             test_config = {
@@ -588,19 +991,27 @@ class CollaborativeFilteringService:
                 'name': test_name,
                 'variants': variants,
                 'target_metric': target_metric,
-                'start_date': datetime.utcnow().isoformat(),
-                'end_date': (datetime.utcnow() + timedelta(days=duration_days)).isoformat(),
+                'start_date': now.isoformat(),
+                'end_date': (now + timedelta(days=duration_days)).isoformat(),
                 'status': 'active',
                 'assignments': {},  # user_id -> variant_id
-                'results': {v['id']: [] for v in variants}
+                'variant_ids': tuple(v['id'] for v in variants),
+                'variant_counts': {v['id']: 0 for v in variants},  # assignments per variant
+                'results': {v['id']: _GrowArray() for v in variants},
+                # Running [n, mean, sum of squared deviations] per variant (Welford)
+                'result_stats': {v['id']: [0, 0.0, 0.0] for v in variants}
             }
 
             self.ab_tests[test_id] = test_config
 
+            # Result buffers and running stats stay internal
             return {
                 'success': True,
                 'test_id': test_id,
-                'config': test_config
+                'config': {
+                    key: value for key, value in test_config.items()
+                    if key not in ('results', 'result_stats')
+                }
             }
 
         except Exception as e:
@@ -643,19 +1054,17 @@ class CollaborativeFilteringService:
             # Assign to variant
             if method == 'random':
                 # Random assignment
-                variant_id = np.random.choice([v['id'] for v in test['variants']])
+                variant_ids = test['variant_ids']
+                variant_id = variant_ids[self._rng.integers(len(variant_ids))]
             elif method == 'balanced':
                 # Balanced assignment (minimize difference in group sizes)
-                variant_counts = {v['id']: 0 for v in test['variants']}
-                for assigned in test['assignments'].values():
-                    variant_counts[assigned] += 1
-
-                variant_id = min(variant_counts.items(), key=lambda x: x[1])[0]
+                variant_id = min(test['variant_counts'].items(), key=lambda x: x[1])[0]
             else:
                 return {'success': False, 'error': f'Unknown method: {method}'}
 
             # Record assignment
             test['assignments'][profile_id] = variant_id
+            test['variant_counts'][variant_id] += 1
 
             return {
                 'success': True,
@@ -695,7 +1104,9 @@ class CollaborativeFilteringService:
                 return {'success': False, 'error': 'User not assigned to test'}
 
             variant_id = test['assignments'][profile_id]
-            test['results'][variant_id].append(float(metric_value))
+            value = float(metric_value)
+            test['results'][variant_id].append(value)
+            _welford_update(test['result_stats'][variant_id], value)
 
             return {'success': True}
 
@@ -720,14 +1131,16 @@ class CollaborativeFilteringService:
             test = self.ab_tests[test_id]
             results = {}
 
-            for variant_id, values in test['results'].items():
-                if len(values) == 0:
+            for variant_id, buffer in test['results'].items():
+                if len(buffer) == 0:
                     continue
 
+                values = buffer.view()
+                n, mean, m2 = test['result_stats'][variant_id]
                 results[variant_id] = {
-                    'n': len(values),
-                    'mean': float(np.mean(values)),
-                    'std': float(np.std(values)),
+                    'n': n,
+                    'mean': mean,
+                    'std': float(np.sqrt(m2 / n)),
                     'median': float(np.median(values)),
                     'min': float(np.min(values)),
                     'max': float(np.max(values))
@@ -736,16 +1149,14 @@ class CollaborativeFilteringService:
             # Statistical comparison (if 2 variants)
             variant_ids = list(results.keys())
             if len(variant_ids) == 2:
-                from scipy.stats import ttest_ind
-
-                values_a = test['results'][variant_ids[0]]
-                values_b = test['results'][variant_ids[1]]
+                stats_a = test['result_stats'][variant_ids[0]]
+                stats_b = test['result_stats'][variant_ids[1]]
 
-                if len(values_a) > 1 and len(values_b) > 1:
-                    t_stat, p_value = ttest_ind(values_a, values_b)
+                if stats_a[0] > 1 and stats_b[0] > 1:
+                    t_stat, p_value = _welch_t_test(stats_a, stats_b)
 
                     statistical_test = {
-                        'test': 't-test',
+                        'test': 'welch t-test',
                         't_statistic': float(t_stat),
                         'p_value': float(p_value),
                         'significant': p_value < 0.05,
@@ -790,13 +1201,7 @@ class CollaborativeFilteringService:
         return f"Variant {best_variant[0]} shows best performance, but results not statistically significant yet"
 
 
-# Singleton instance
-_collaborative_filtering_instance = None
-
-
+@functools.lru_cache(maxsize=1)
 def get_collaborative_filtering_service() -> CollaborativeFilteringService:
     """Get or create collaborative filtering service singleton"""
-    global _collaborative_filtering_instance
-    if _collaborative_filtering_instance is None:
-        _collaborative_filtering_instance = CollaborativeFilteringService()
-    return _collaborative_filtering_instance
+    return CollaborativeFilteringService()
@@ -3,20 +3,30 @@ Configuration for ML Services
 Centralized configuration for models, parameters, and resources
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 import os
 
 
 class NLPConfig(BaseModel):
     """Configuration for NLP service"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     sentiment_model: str = "nlptown/bert-base-multilingual-uncased-sentiment"
     emotion_model: str = "j-hartmann/emotion-english-distilroberta-base"
-    crisis_model: str = "facebook/bart-large-mnli"
+    # Zero-shot crisis classifier; "facebook/bart-large-mnli" is the larger,
+    # slower alternative
+    crisis_model: str = "valhalla/distilbart-mnli-12-3"
+
+    # Zero-shot crisis classification only runs for keyword scores strictly
+    # between these; outside them the keyword score is decisive
+    crisis_skip_threshold_low: float = 0.0
+    crisis_skip_threshold_high: float = 0.75
 
     # Device configuration
     use_gpu: bool = True
     device: int = 0  # GPU device index
+    quantize_models: bool = True  # int8 dynamic quantization of classifiers on CPU
 
     # Text processing
     max_text_length: int = 500
@@ -30,6 +40,8 @@ class NLPConfig(BaseModel):
 
 class PredictionConfig(BaseModel):
     """Configuration for prediction service"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     # LSTM parameters
     lstm_sequence_length: int = 14
     lstm_n_features: int = 5
@@ -56,6 +68,8 @@ class PredictionConfig(BaseModel):
 
 class CollaborativeFilteringConfig(BaseModel):
     """Configuration for collaborative filtering"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     # Clustering
     default_n_clusters: int = 5
     min_users_for_clustering: int = 10
@@ -83,6 +97,8 @@ class CollaborativeFilteringConfig(BaseModel):
 
 class MLConfig(BaseModel):
     """Master ML configuration"""
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
     nlp: NLPConfig = NLPConfig()
     prediction: PredictionConfig = PredictionConfig()
     collaborative_filtering: CollaborativeFilteringConfig = CollaborativeFilteringConfig()
@@ -121,14 +137,14 @@ def get_ml_config() -> MLConfig:
 
 
 def update_ml_config(**kwargs) -> MLConfig:
-    """Update ML configuration"""
+    """Replace the ML configuration with an updated copy (configs are frozen)"""
     global _config
     if _config is None:
         _config = MLConfig(**kwargs)
     else:
-        for key, value in kwargs.items():
-            if hasattr(_config, key):
-                setattr(_config, key, value)
+        _config = _config.model_copy(
+            update={key: value for key, value in kwargs.items() if key in MLConfig.model_fields}
+        )
     return _config
 
 
@@ -4,8 +4,8 @@ Stores analysis results, predictions, user profiles, and A/B test data
 """
 
 import uuid
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Boolean, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, ForeignKeyConstraint, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -16,7 +16,7 @@ class JournalAnalysis(Base):
     """Stores NLP analysis results for journal entries"""
     __tablename__ = "journal_analyses"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     checkin_id = Column(UUID(as_uuid=True), ForeignKey("mood_checkins.id"), nullable=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
@@ -28,17 +28,17 @@ class JournalAnalysis(Base):
     # Emotions
     primary_emotion = Column(String)
     primary_emotion_score = Column(Float)
-    all_emotions = Column(JSON)  # Dict of all emotion scores
+    all_emotions = Column(JSONB)  # Dict of all emotion scores
 
     # Crisis Detection
     crisis_detected = Column(Boolean, default=False)
     crisis_score = Column(Float)  # 0.0 to 1.0
     risk_level = Column(String)  # none, low, moderate, high, critical
-    matched_keywords = Column(JSON)  # List of detected crisis keywords
+    matched_keywords = Column(JSONB)  # List of detected crisis keywords
     requires_immediate_attention = Column(Boolean, default=False)
 
     # Themes
-    themes = Column(JSON)  # Extracted themes and keywords
+    themes = Column(JSONB)  # Extracted themes and keywords
 
     # Metadata
     text_length = Column(Integer)
@@ -49,12 +49,28 @@ class JournalAnalysis(Base):
     # Relationships
     # journal_entry = relationship("JournalEntry", back_populates="analyses")
 
+    __table_args__ = (
+        Index("ix_journal_analyses_user_analyzed", "user_id", analyzed_at.desc()),
+        Index(
+            "ix_journal_analyses_user_crisis",
+            "user_id",
+            analyzed_at.desc(),
+            postgresql_where=(crisis_detected == True)
+        ),
+        Index(
+            "ix_journal_analyses_themes_gin",
+            themes,
+            postgresql_using="gin",
+            postgresql_ops={"themes": "jsonb_path_ops"}
+        ),
+    )
+
 
 class MoodPrediction(Base):
     """Stores mood predictions for future days"""
     __tablename__ = "mood_predictions"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     prediction_date = Column(DateTime(timezone=True), nullable=False)
@@ -72,16 +88,20 @@ class MoodPrediction(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_mood_predictions_user_date", "user_id", prediction_date.desc()),
+    )
+
 
 class SeasonalPattern(Base):
     """Stores detected seasonal patterns"""
     __tablename__ = "seasonal_patterns"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     pattern_type = Column(String)  # weekly, monthly, yearly
-    pattern_data = Column(JSON)  # Detailed pattern information
+    pattern_data = Column(JSONB)  # Detailed pattern information
 
     # Weekly patterns
     best_day = Column(String)
@@ -93,7 +113,7 @@ class SeasonalPattern(Base):
     worst_month = Column(String, nullable=True)
 
     # Cycle detection
-    dominant_cycles = Column(JSON)  # FFT-detected cycles
+    dominant_cycles = Column(JSONB)  # FFT-detected cycles
 
     data_span_days = Column(Integer)
     confidence_score = Column(Float)
@@ -106,11 +126,11 @@ class CorrelationAnalysis(Base):
     """Stores correlation analysis results"""
     __tablename__ = "correlation_analyses"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     analysis_type = Column(String)  # weather, sleep, exercise, etc.
-    correlation_data = Column(JSON)  # Detailed correlation results
+    correlation_data = Column(JSONB)  # Detailed correlation results
 
     # Summary metrics
     primary_correlation = Column(Float)  # Strongest correlation value
@@ -130,12 +150,12 @@ class UserProfile(Base):
     """Anonymized user profiles for collaborative filtering"""
     __tablename__ = "user_profiles"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     profile_id = Column(String, unique=True, index=True)  # Anonymized hash
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, unique=True)
 
     # Feature vector (anonymized behavioral patterns)
-    features = Column(JSON, nullable=False)
+    features = Column(JSONB, nullable=False)
 
     # Clustering
     cluster_id = Column(UUID(as_uuid=True), nullable=True)
@@ -151,7 +171,7 @@ class InterventionEffectiveness(Base):
     """Records intervention effectiveness for users"""
     __tablename__ = "intervention_effectiveness"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     profile_id = Column(String, ForeignKey("user_profiles.profile_id"), nullable=False)
     intervention_id = Column(String, nullable=False)
 
@@ -173,11 +193,11 @@ class ABTest(Base):
     """A/B test configurations"""
     __tablename__ = "ab_tests"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     test_id = Column(String, unique=True, index=True)
     name = Column(String, nullable=False)
 
-    variants = Column(JSON, nullable=False)  # List of variant configurations
+    variants = Column(JSONB, nullable=False)  # List of variant configurations
     target_metric = Column(String, nullable=False)
 
     status = Column(String, default='active')  # active, paused, completed
@@ -196,8 +216,9 @@ class ABTestAssignment(Base):
     """User assignments to A/B test variants"""
     __tablename__ = "ab_test_assignments"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    test_id = Column(String, ForeignKey("ab_tests.test_id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Part of the primary key: table is hash-partitioned by test_id
+    test_id = Column(String, ForeignKey("ab_tests.test_id"), primary_key=True)
     profile_id = Column(String, ForeignKey("user_profiles.profile_id"), nullable=False)
 
     variant_id = Column(String, nullable=False)
@@ -208,31 +229,39 @@ class ABTestResult(Base):
     """Individual results from A/B tests"""
     __tablename__ = "ab_test_results"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    test_id = Column(String, ForeignKey("ab_tests.test_id"), nullable=False)
-    assignment_id = Column(UUID(as_uuid=True), ForeignKey("ab_test_assignments.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Part of the primary key: table is hash-partitioned by test_id
+    test_id = Column(String, ForeignKey("ab_tests.test_id"), primary_key=True)
+    assignment_id = Column(UUID(as_uuid=True), nullable=False)
 
     metric_value = Column(Float, nullable=False)
     recorded_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["assignment_id", "test_id"],
+            ["ab_test_assignments.id", "ab_test_assignments.test_id"]
+        ),
+    )
+
 
 class MLModelVersion(Base):
     """Track ML model versions and performance"""
     __tablename__ = "ml_model_versions"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     model_type = Column(String, nullable=False)  # lstm, transformer, etc.
     version = Column(String, nullable=False)
 
     # Model metadata
-    architecture = Column(JSON)  # Model architecture details
-    hyperparameters = Column(JSON)
+    architecture = Column(JSONB)  # Model architecture details
+    hyperparameters = Column(JSONB)
     training_data_size = Column(Integer)
 
     # Performance metrics
     training_loss = Column(Float)
     validation_loss = Column(Float)
-    test_metrics = Column(JSON)
+    test_metrics = Column(JSONB)
 
     # Model storage
     model_path = Column(String)  # Path to saved model file
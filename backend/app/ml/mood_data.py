@@ -0,0 +1,55 @@
+"""
+Mood history loader for the ML endpoints
+One indexed query per request; check-ins are rolled up to daily averages
+in Postgres and returned as column arrays ready for pandas/numpy.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Column name -> array, one entry per day, ordered by date
+MoodArrays = Dict[str, np.ndarray]
+
+# What the ML services accept: a list of records or MoodArrays
+MoodData = Union[List[Dict], MoodArrays]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Days since epoch (UTC) so the date column loads as datetime64 without per-row parsing
+_DAILY_MOOD_QUERY = text("""
+    SELECT (created_at AT TIME ZONE 'UTC')::date - DATE '1970-01-01' AS day,
+           avg(mood_score)::float8 AS mood_score,
+           avg(energy_level)::float8 AS energy_level,
+           coalesce(avg(anxiety_level)::float8, 'NaN') AS anxiety_level,
+           coalesce(avg(stress_level)::float8, 'NaN') AS stress_level
+    FROM mood_checkins
+    WHERE user_id = :user_id AND created_at >= :since
+    GROUP BY 1
+    ORDER BY 1
+""")
+
+_VALUE_COLUMNS = ("mood_score", "energy_level", "anxiety_level", "stress_level")
+
+
+def fetch_user_mood_array(db: Session, user_id: UUID, since: Optional[datetime] = None) -> MoodArrays:
+    """
+    Daily mood averages for a user as {"date": datetime64[D], <column>: float32}.
+    Days without a check-in are absent; nullable columns are NaN when unset.
+    """
+    rows = db.execute(_DAILY_MOOD_QUERY, {"user_id": user_id, "since": since or _EPOCH}).all()
+    columns = list(zip(*rows)) if rows else [()] * (len(_VALUE_COLUMNS) + 1)
+
+    data = {"date": np.asarray(columns[0], dtype=np.int64).astype("datetime64[D]")}
+    for name, values in zip(_VALUE_COLUMNS, columns[1:]):
+        data[name] = np.asarray(values, dtype=np.float32)
+    return data
+
+
+def n_days(data: MoodArrays) -> int:
+    """Number of days in a fetched mood array"""
+    return len(data["date"])
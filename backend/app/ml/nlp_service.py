@@ -4,8 +4,11 @@ Provides sentiment analysis, emotion classification, crisis detection, and theme
 """
 
 import re
+import functools
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import numpy as np
 from transformers import (
@@ -15,14 +18,85 @@ from transformers import (
     AutoModelForTokenClassification
 )
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
 import torch
 
+from app.ml.config import get_ml_config
+
+# Make Numba optional; topic factorization falls back to numpy
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Make pyahocorasick optional; crisis keywords fall back to one alternation regex
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 logger = logging.getLogger(__name__)
 
+# Lazily loaded pipelines: name -> (task, NLPConfig model field, quantizable,
+# extra pipeline kwargs)
+_PIPELINE_SPECS = {
+    'sentiment': ("sentiment-analysis", 'sentiment_model', True, {}),
+    'emotion': ("text-classification", 'emotion_model', True, {'top_k': None}),
+    'crisis': ("zero-shot-classification", 'crisis_model', False, {}),
+}
+
+# Texts per forward pass, and tokenizer truncation for the classifiers
+PIPELINE_BATCH_SIZE = 32
+_TOKENIZER_KWARGS = {'padding': True, 'truncation': True, 'max_length': 256}
+
+# Multiplicative-update iterations for theme extraction
+NMF_ITERATIONS = 200
+
+# Theme-extraction tokens: letters only, at least 4 of them
+_TOKEN_RE = re.compile(r'[a-z]{4,}')
+
+
+def _build_pipeline(task: str, model_name: str, quantize: bool = False, **kwargs):
+    """
+    Load a sequence-classification model and wrap it in a pipeline: fp16 on
+    GPU, optionally int8 dynamically quantized Linear layers on CPU
+    """
+    use_gpu = torch.cuda.is_available()
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_name,
+        torch_dtype=torch.float16 if use_gpu else torch.float32,
+        low_cpu_mem_usage=True
+    )
+    if quantize and not use_gpu:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline(
+        task,
+        model=model,
+        tokenizer=AutoTokenizer.from_pretrained(model_name),
+        device=0 if use_gpu else -1,
+        **kwargs
+    )
+
+
+def _nmf_multiplicative_update(V: np.ndarray, W: np.ndarray, H: np.ndarray, n_iter: int):
+    """Lee-Seung multiplicative updates for V ~ W @ H (W and H updated in place)"""
+    eps = 1e-9
+    for _ in range(n_iter):
+        H *= (W.T @ V) / (W.T @ W @ H + eps)
+        W *= (V @ H.T) / (W @ H @ H.T + eps)
+    return W, H
+
+
+_nmf = njit(cache=True, fastmath=True)(_nmf_multiplicative_update) if HAS_NUMBA else _nmf_multiplicative_update
+
+
+def _is_word_char(char: str) -> bool:
+    """Same test as regex ``\\w``: keyword matches must sit on word boundaries"""
+    return char.isalnum() or char == '_'
+
 
 class NLPService:
     """Advanced NLP service for mental health journal analysis"""
@@ -43,35 +117,51 @@ class NLPService:
         except Exception as e:
             logger.warning(f"NLTK download warning: {e}")
 
-    def _initialize_models(self):
-        """Initialize transformer models for various NLP tasks"""
         try:
-            # Sentiment Analysis - fine-tuned model
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="nlptown/bert-base-multilingual-uncased-sentiment",
-                device=0 if torch.cuda.is_available() else -1
-            )
-
-            # Emotion Classification - 6 basic emotions
-            self.emotion_classifier = pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
-                device=0 if torch.cuda.is_available() else -1,
-                top_k=None
-            )
-
-            # Zero-shot classification for crisis detection
-            self.crisis_classifier = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
-                device=0 if torch.cuda.is_available() else -1
-            )
+            self._stopwords = frozenset(stopwords.words('english'))
+        except LookupError as e:
+            logger.warning(f"NLTK stopwords unavailable: {e}")
+            self._stopwords = frozenset()
 
-            logger.info("NLP models initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing NLP models: {e}")
-            raise
+    def _initialize_models(self):
+        """Prepare lazy transformer pipelines; each model loads on first use"""
+        self._pipelines: Dict[str, object] = {}
+        self._pipeline_lock = threading.Lock()
+
+    def _get_pipeline(self, name: str):
+        """Load a pipeline from _PIPELINE_SPECS once, even under concurrent first calls"""
+        loaded = self._pipelines.get(name)
+        if loaded is None:
+            with self._pipeline_lock:
+                loaded = self._pipelines.get(name)
+                if loaded is None:
+                    task, model_field, quantizable, kwargs = _PIPELINE_SPECS[name]
+                    nlp_config = get_ml_config().nlp
+                    model_name = getattr(nlp_config, model_field)
+                    quantize = quantizable and nlp_config.quantize_models
+                    try:
+                        loaded = _build_pipeline(task, model_name, quantize, **kwargs)
+                    except Exception as e:
+                        logger.error(f"Error initializing NLP model {model_name}: {e}")
+                        raise
+                    self._pipelines[name] = loaded
+                    logger.info(f"NLP model {model_name} initialized")
+        return loaded
+
+    @property
+    def sentiment_analyzer(self):
+        """Sentiment Analysis - fine-tuned 5-star rating model"""
+        return self._get_pipeline('sentiment')
+
+    @property
+    def emotion_classifier(self):
+        """Emotion Classification - 6 basic emotions plus neutral"""
+        return self._get_pipeline('emotion')
+
+    @property
+    def crisis_classifier(self):
+        """Zero-shot classification for crisis detection (distilled NLI model)"""
+        return self._get_pipeline('crisis')
 
     def _setup_crisis_keywords(self):
         """Define crisis keywords and patterns with severity weights"""
@@ -107,15 +197,68 @@ class NLPService:
             }
         }
 
-        # Compile regex patterns for efficiency
-        self.crisis_patterns = {}
-        for severity, data in self.crisis_keywords.items():
-            patterns = [re.compile(r'\b' + re.escape(kw) + r'\b', re.IGNORECASE)
-                       for kw in data['keywords']]
-            self.crisis_patterns[severity] = {
-                'patterns': patterns,
-                'weight': data['weight']
-            }
+        # Flat keyword table across tiers; a keyword's id indexes its
+        # severity and weight
+        self.crisis_severities = tuple(self.crisis_keywords)
+        self._crisis_keyword_table: List[str] = []
+        severity_ids = []
+        for severity_id, data in enumerate(self.crisis_keywords.values()):
+            for kw in data['keywords']:
+                self._crisis_keyword_table.append(kw.lower())
+                severity_ids.append(severity_id)
+        self._crisis_severity_ids = np.array(severity_ids, dtype=np.intp)
+        self._crisis_weights = np.array(
+            [data['weight'] for data in self.crisis_keywords.values()]
+        )[self._crisis_severity_ids]
+
+        # One automaton (or, without pyahocorasick, one alternation regex,
+        # longest keywords first) scans the text once for every keyword
+        self._crisis_automaton = None
+        self._crisis_pattern = None
+        if HAS_AHOCORASICK:
+            self._crisis_automaton = ahocorasick.Automaton()
+            for idx, kw in enumerate(self._crisis_keyword_table):
+                self._crisis_automaton.add_word(kw, (idx, len(kw)))
+            self._crisis_automaton.make_automaton()
+        else:
+            self._crisis_keyword_ids = {kw: idx for idx, kw in enumerate(self._crisis_keyword_table)}
+            alternatives = sorted(self._crisis_keyword_table, key=len, reverse=True)
+            self._crisis_pattern = re.compile(
+                r'\b(?:' + '|'.join(map(re.escape, alternatives)) + r')\b'
+            )
+
+    def _scan_crisis_keywords(self, text: str, text_lower: str) -> Tuple[np.ndarray, List[str]]:
+        """
+        Find crisis keywords on word boundaries in the already-lowercased text
+
+        Returns:
+            Keyword ids and matched texts, grouped by keyword in table order
+            and left to right within each keyword
+        """
+        if self._crisis_automaton is None:
+            spans = [
+                (self._crisis_keyword_ids[match.group()], match.start(), match.end())
+                for match in self._crisis_pattern.finditer(text_lower)
+            ]
+        else:
+            last = len(text_lower) - 1
+            spans = []
+            for end, (idx, length) in self._crisis_automaton.iter(text_lower):
+                start = end - length + 1
+                if start > 0 and _is_word_char(text_lower[start - 1]):
+                    continue
+                if end < last and _is_word_char(text_lower[end + 1]):
+                    continue
+                spans.append((idx, start, end + 1))
+        spans.sort()
+
+        # Report matches in the original casing; lowercasing can change the
+        # length of some non-ASCII text, so only slice it when offsets line up
+        source = text if len(text_lower) == len(text) else text_lower
+        return (
+            np.fromiter((idx for idx, _, _ in spans), dtype=np.intp, count=len(spans)),
+            [source[start:end] for _, start, end in spans]
+        )
 
     async def analyze_journal_entry(self, text: str) -> Dict:
         """
@@ -127,112 +270,135 @@ class NLPService:
         Returns:
             Dictionary containing all NLP analysis results
         """
-        if not text or len(text.strip()) < 10:
-            return self._empty_analysis()
+        return (await self.analyze_journal_entries_batch([text]))[0]
 
-        try:
-            # Run all analyses
-            sentiment = await self.analyze_sentiment(text)
-            emotions = await self.classify_emotions(text)
-            crisis = await self.detect_crisis_keywords(text)
-            themes = await self.extract_themes([text])
+    async def analyze_journal_entries_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze several journal entries, running each transformer once per batch
 
-            return {
-                'sentiment': sentiment,
-                'emotions': emotions,
-                'crisis_detection': crisis,
-                'themes': themes,
-                'analyzed_at': datetime.utcnow().isoformat(),
-                'text_length': len(text),
-                'word_count': len(text.split())
-            }
-        except Exception as e:
-            logger.error(f"Error analyzing journal entry: {e}")
-            return self._empty_analysis()
+        Args:
+            texts: Journal entry texts
 
-    async def analyze_sentiment(self, text: str) -> Dict:
+        Returns:
+            One analysis dict per text, in input order
+        """
+        analyses: List[Optional[Dict]] = [None] * len(texts)
+        valid = []
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) < 10:
+                analyses[i] = self._empty_analysis()
+            else:
+                valid.append(i)
+        if not valid:
+            return analyses
+
+        batch = [texts[i] for i in valid]
+        sentiments = await self.analyze_sentiment(batch)
+        emotions = await self.classify_emotions(batch)
+
+        for i, text, sentiment, emotion in zip(valid, batch, sentiments, emotions):
+            try:
+                analyses[i] = {
+                    'sentiment': sentiment,
+                    'emotions': emotion,
+                    'crisis_detection': await self.detect_crisis_keywords(text),
+                    'themes': await self.extract_themes([text]),
+                    'analyzed_at': datetime.utcnow().isoformat(),
+                    'text_length': len(text),
+                    'word_count': len(text.split())
+                }
+            except Exception as e:
+                logger.error(f"Error analyzing journal entry: {e}")
+                analyses[i] = self._empty_analysis()
+
+        return analyses
+
+    async def analyze_sentiment(self, text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
         """
         Analyze sentiment using fine-tuned transformer model
 
         Args:
-            text: Input text
+            text: Input text, or a list of texts analyzed as one batch
 
         Returns:
-            Sentiment analysis results with score and label
+            Sentiment analysis results with score and label (a list for list input)
         """
+        texts = [text] if isinstance(text, str) else text
         try:
-            # Truncate text if too long (model limit is typically 512 tokens)
-            max_length = 500
-            if len(text) > max_length:
-                # Analyze first and last portions
-                first_part = text[:max_length//2]
-                last_part = text[-max_length//2:]
-                text_to_analyze = first_part + " " + last_part
-            else:
-                text_to_analyze = text
-
-            result = self.sentiment_analyzer(text_to_analyze)[0]
-
-            # Convert 5-star rating to normalized score
-            # Model outputs: 1 star (very negative) to 5 stars (very positive)
-            star_rating = int(result['label'].split()[0])
-            normalized_score = (star_rating - 1) / 4  # 0.0 to 1.0
-
-            # Map to sentiment labels
-            if normalized_score < 0.3:
-                sentiment_label = 'negative'
-            elif normalized_score < 0.7:
-                sentiment_label = 'neutral'
-            else:
-                sentiment_label = 'positive'
-
-            return {
-                'score': normalized_score,
-                'label': sentiment_label,
-                'confidence': result['score'],
-                'raw_rating': star_rating
-            }
+            # The tokenizer truncates to the model's window
+            analyzer = self.sentiment_analyzer
+            with torch.inference_mode():
+                results = analyzer(texts, batch_size=PIPELINE_BATCH_SIZE, **_TOKENIZER_KWARGS)
+            sentiments = [self._sentiment_from_result(result) for result in results]
         except Exception as e:
             logger.error(f"Sentiment analysis error: {e}")
-            return {'score': 0.5, 'label': 'neutral', 'confidence': 0.0, 'error': str(e)}
+            sentiments = [
+                {'score': 0.5, 'label': 'neutral', 'confidence': 0.0, 'error': str(e)}
+                for _ in texts
+            ]
+        return sentiments[0] if isinstance(text, str) else sentiments
+
+    @staticmethod
+    def _sentiment_from_result(result: Dict) -> Dict:
+        """Convert the model's 5-star rating to a normalized score and label"""
+        # Model outputs: 1 star (very negative) to 5 stars (very positive)
+        star_rating = int(result['label'].split()[0])
+        normalized_score = (star_rating - 1) / 4  # 0.0 to 1.0
+
+        # Map to sentiment labels
+        if normalized_score < 0.3:
+            sentiment_label = 'negative'
+        elif normalized_score < 0.7:
+            sentiment_label = 'neutral'
+        else:
+            sentiment_label = 'positive'
+
+        return {
+            'score': normalized_score,
+            'label': sentiment_label,
+            'confidence': result['score'],
+            'raw_rating': star_rating
+        }
 
-    async def classify_emotions(self, text: str) -> Dict:
+    async def classify_emotions(self, text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
         """
         Classify emotions using transformer model
         Detects: anger, disgust, fear, joy, neutral, sadness, surprise
 
         Args:
-            text: Input text
+            text: Input text, or a list of texts classified as one batch
 
         Returns:
-            Emotion classification results
+            Emotion classification results (a list for list input)
         """
+        texts = [text] if isinstance(text, str) else text
         try:
-            # Truncate if needed
-            max_length = 500
-            text_to_analyze = text[:max_length] if len(text) > max_length else text
-
-            results = self.emotion_classifier(text_to_analyze)[0]
-
-            # Convert to dictionary with scores
-            emotions = {item['label']: item['score'] for item in results}
-
-            # Get primary emotion
-            primary_emotion = max(emotions.items(), key=lambda x: x[1])
-
-            return {
-                'primary_emotion': primary_emotion[0],
-                'primary_score': primary_emotion[1],
-                'all_emotions': emotions
-            }
+            classifier = self.emotion_classifier
+            with torch.inference_mode():
+                results = classifier(texts, batch_size=PIPELINE_BATCH_SIZE, **_TOKENIZER_KWARGS)
+            emotions = [self._emotions_from_result(scores) for scores in results]
         except Exception as e:
             logger.error(f"Emotion classification error: {e}")
-            return {
-                'primary_emotion': 'neutral',
-                'primary_score': 0.0,
-                'all_emotions': {},
-                'error': str(e)
-            }
+            emotions = [
+                {
+                    'primary_emotion': 'neutral',
+                    'primary_score': 0.0,
+                    'all_emotions': {},
+                    'error': str(e)
+                }
+                for _ in texts
+            ]
+        return emotions[0] if isinstance(text, str) else emotions
+
+    @staticmethod
+    def _emotions_from_result(scores: List[Dict]) -> Dict:
+        """Convert per-label scores to the primary emotion plus all scores"""
+        primary = max(scores, key=itemgetter('score'))
+        return {
+            'primary_emotion': primary['label'],
+            'primary_score': primary['score'],
+            'all_emotions': {item['label']: item['score'] for item in scores}
+        }
 
     async def detect_crisis_keywords(self, text: str) -> Dict:
         """
@@ -245,49 +411,30 @@ class NLPService:
             Crisis detection results with severity and matched keywords
         """
         text_lower = text.lower()
-        detected_keywords = []
-        total_weight = 0.0
-        severity_counts = {'critical': 0, 'high': 0, 'moderate': 0, 'low': 0}
-
-        # Check for keyword matches
-        for severity, data in self.crisis_patterns.items():
-            for pattern in data['patterns']:
-                matches = pattern.findall(text)
-                if matches:
-                    for match in matches:
-                        detected_keywords.append({
-                            'keyword': match,
-                            'severity': severity,
-                            'weight': data['weight']
-                        })
-                        total_weight += data['weight']
-                        severity_counts[severity] += 1
+
+        # Check for keyword matches; tally per severity on the id arrays
+        keyword_ids, matches = self._scan_crisis_keywords(text, text_lower)
+        severity_ids = self._crisis_severity_ids[keyword_ids]
+        weights = self._crisis_weights[keyword_ids]
+        total_weight = float(weights.sum())
+        severity_counts = dict(zip(
+            self.crisis_severities,
+            np.bincount(severity_ids, minlength=len(self.crisis_severities)).tolist()
+        ))
+        detected_keywords = [
+            {'keyword': match, 'severity': self.crisis_severities[severity_id], 'weight': weight}
+            for match, severity_id, weight in zip(matches, severity_ids.tolist(), weights.tolist())
+        ]
 
         # Calculate crisis score (0.0 to 1.0)
         crisis_score = min(total_weight / 3.0, 1.0)  # Normalize to max of 1.0
 
-        # Use zero-shot classification for additional context
-        try:
-            crisis_labels = [
-                "suicidal ideation",
-                "self-harm",
-                "severe depression",
-                "mental health crisis",
-                "normal mood"
-            ]
-
-            classification = self.crisis_classifier(
-                text[:500],  # Truncate for model
-                candidate_labels=crisis_labels
-            )
-
-            crisis_classification = {
-                label: score
-                for label, score in zip(classification['labels'], classification['scores'])
-            }
-        except Exception as e:
-            logger.warning(f"Zero-shot classification failed: {e}")
-            crisis_classification = {}
+        # Use zero-shot classification for additional context, only where the
+        # keyword score is ambiguous; it does not change the risk level
+        nlp_config = get_ml_config().nlp
+        crisis_classification = {}
+        if nlp_config.crisis_skip_threshold_low < crisis_score < nlp_config.crisis_skip_threshold_high:
+            crisis_classification = self._classify_crisis(text)
 
         # Determine overall risk level
         if crisis_score >= 0.75 or severity_counts['critical'] > 0:
@@ -311,9 +458,35 @@ class NLPService:
             'requires_immediate_attention': risk_level in ['critical', 'high']
         }
 
+    def _classify_crisis(self, text: str) -> Dict[str, float]:
+        """Zero-shot crisis label scores for a text ({} if the model fails)"""
+        try:
+            crisis_labels = [
+                "suicidal ideation",
+                "self-harm",
+                "severe depression",
+                "mental health crisis",
+                "normal mood"
+            ]
+
+            classifier = self.crisis_classifier
+            with torch.inference_mode():
+                classification = classifier(
+                    text[:500],  # Truncate for model
+                    candidate_labels=crisis_labels
+                )
+
+            return {
+                label: score
+                for label, score in zip(classification['labels'], classification['scores'])
+            }
+        except Exception as e:
+            logger.warning(f"Zero-shot classification failed: {e}")
+            return {}
+
     async def extract_themes(self, texts: List[str], n_topics: int = 5) -> Dict:
         """
-        Extract themes from journal entries using LDA topic modeling
+        Extract themes from journal entries using NMF topic modeling
 
         Args:
             texts: List of journal entry texts
@@ -343,21 +516,20 @@ class NLPService:
 
             tfidf_matrix = vectorizer.fit_transform(processed_texts)
 
-            # Apply LDA
+            # Factorize TF-IDF ~ W @ H; rows of H are topics over terms
             n_topics = min(n_topics, len(processed_texts))
-            lda_model = LatentDirichletAllocation(
-                n_components=n_topics,
-                random_state=42,
-                max_iter=20
-            )
-
-            lda_model.fit(tfidf_matrix)
+            tfidf = tfidf_matrix.toarray().astype(np.float32)
+            rng = np.random.default_rng(42)
+            scale = np.sqrt(tfidf.mean() / n_topics)
+            W = (scale * rng.random((tfidf.shape[0], n_topics))).astype(np.float32)
+            H = (scale * rng.random((n_topics, tfidf.shape[1]))).astype(np.float32)
+            _, topics = _nmf(tfidf, W, H, NMF_ITERATIONS)
 
             # Extract themes
             feature_names = vectorizer.get_feature_names_out()
             themes = []
 
-            for topic_idx, topic in enumerate(lda_model.components_):
+            for topic_idx, topic in enumerate(topics):
                 top_indices = topic.argsort()[-10:][::-1]
                 top_words = [feature_names[i] for i in top_indices]
                 top_weights = [float(topic[i]) for i in top_indices]
@@ -381,20 +553,9 @@ class NLPService:
             return {'themes': [], 'error': str(e)}
 
     def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for theme extraction"""
-        try:
-            # Remove special characters and digits
-            text = re.sub(r'[^a-zA-Z\s]', '', text)
-
-            # Tokenize and remove stopwords
-            tokens = word_tokenize(text.lower())
-            stop_words = set(stopwords.words('english'))
-            tokens = [t for t in tokens if t not in stop_words and len(t) > 3]
-
-            return ' '.join(tokens)
-        except Exception as e:
-            logger.warning(f"Text preprocessing error: {e}")
-            return text
+        """Preprocess text for theme extraction: words of 4+ letters, minus stopwords"""
+        tokens = _TOKEN_RE.findall(text.lower())
+        return ' '.join(t for t in tokens if t not in self._stopwords)
 
     def _generate_theme_name(self, keywords: List[str]) -> str:
         """Generate a human-readable theme name from keywords"""
@@ -419,13 +580,7 @@ class NLPService:
         }
 
 
-# Singleton instance
-_nlp_service_instance = None
-
-
+@functools.lru_cache(maxsize=1)
 def get_nlp_service() -> NLPService:
     """Get or create NLP service singleton"""
-    global _nlp_service_instance
-    if _nlp_service_instance is None:
-        _nlp_service_instance = NLPService()
-    return _nlp_service_instance
+    return NLPService()
@@ -3,13 +3,14 @@ Advanced Prediction Service for Mood Forecasting
 Implements LSTM/Transformer models, seasonal pattern detection, weather correlation, and sleep analysis
 """
 
+import functools
 import logging
+import threading
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
 import pandas as pd
 from scipy import stats
-from scipy.fft import fft
 from sklearn.preprocessing import MinMaxScaler
 
 # Make TensorFlow optional (not compatible with Python 3.14+)
@@ -31,9 +32,31 @@ try:
 except ImportError:
     HAS_TRANSFORMERS = False
 
+from app.ml.batched_predictor import BatchedPredictor
+from app.ml.mood_data import MoodData
+
 logger = logging.getLogger(__name__)
 
 
+def _pearson_columns(y: np.ndarray, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson r and two-sided p-value of y against every column of X.
+    Same statistic as scipy.stats.pearsonr, computed for all columns with one
+    centered matrix-vector product instead of a call per feature.
+    """
+    n = len(y)
+    y_centered = y - y.mean()
+    X_centered = X - X.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = (y_centered @ X_centered) / np.sqrt(
+            (y_centered @ y_centered) * np.einsum('ij,ij->j', X_centered, X_centered)
+        )
+        r = np.clip(r, -1.0, 1.0)
+        t = r * np.sqrt((n - 2) / (1.0 - r * r))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+    return r, p
+
+
 class PredictionService:
     """Advanced prediction service for mood forecasting and pattern analysis"""
 
@@ -44,6 +67,20 @@ class PredictionService:
         self.scaler = MinMaxScaler()
         self.is_lstm_trained = False
         self.is_transformer_trained = False
+        # Changes on every retrain; part of the forecast cache key
+        self.lstm_trained_at: Optional[str] = None
+        # Compiled (deterministic, MC-dropout) forward passes for self.lstm_model
+        self._lstm_inference_fns = None
+        self._lstm_inference_model = None
+        # Int8 TFLite copy of the LSTM for deterministic forecasts
+        self.quantize_lstm_inference = True
+        self._quantized_lstm_content = None
+        self._quantized_lstm_key = None
+        self._quantized_lstm_lock = threading.Lock()
+        # One interpreter per (B, T, F) input shape, allocated for that shape
+        self._quantized_lstm_runners: Dict[Tuple[int, ...], object] = {}
+        # Coalesces concurrent forecasts into one (B, T, F) forward pass
+        self.batched_predictor = BatchedPredictor(self._forward_lstm_batch)
 
     def build_lstm_model(self, sequence_length: int = 14, n_features: int = 5):
         """
@@ -106,6 +143,97 @@ class PredictionService:
         logger.info(f"LSTM model built: {model.count_params()} parameters")
         return model
 
+    def _get_lstm_inference_fns(self):
+        """
+        Graph-compiled forward passes for the current LSTM, traced once per model.
+        Keras predict() rebuilds a data pipeline on every call, which dominates
+        the cost of a single (1, T, F) forecast. The MC-dropout variant keeps
+        dropout active but BatchNormalization in inference mode, so sampling
+        neither uses batch statistics nor updates the moving averages.
+        """
+        if self._lstm_inference_model is self.lstm_model:
+            return self._lstm_inference_fns
+
+        model = self.lstm_model
+        signature = [tf.TensorSpec([None, *model.input_shape[1:]], tf.float32)]
+
+        def forward(x, mc_dropout):
+            for layer in model.layers:
+                if isinstance(layer, layers.BatchNormalization):
+                    x = layer(x, training=False)
+                else:
+                    x = layer(x, training=mc_dropout)
+            return x
+
+        self._lstm_inference_fns = (
+            tf.function(lambda x: forward(x, False), input_signature=signature),
+            tf.function(lambda x: forward(x, True), input_signature=signature)
+        )
+        self._lstm_inference_model = model
+        return self._lstm_inference_fns
+
+    def _get_quantized_lstm(self) -> Optional[bytes]:
+        """
+        Dynamic-range int8 TFLite flatbuffer for the current LSTM, rebuilt after
+        each retrain. Weights are stored as int8 (about 4x smaller than fp32) and
+        the LSTM/Dense matmuls run on int8 kernels with float activations.
+        Returns None when conversion fails; callers fall back to fp32.
+        """
+        key = (id(self.lstm_model), self.lstm_trained_at)
+        if self._quantized_lstm_key == key:
+            return self._quantized_lstm_content
+
+        self._quantized_lstm_content = None
+        self._quantized_lstm_runners = {}
+        self._quantized_lstm_key = key
+        try:
+            predict_fn, _ = self._get_lstm_inference_fns()
+            converter = tf.lite.TFLiteConverter.from_concrete_functions(
+                [predict_fn.get_concrete_function()], self.lstm_model
+            )
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS,
+                tf.lite.OpsSet.SELECT_TF_OPS
+            ]
+            self._quantized_lstm_content = converter.convert()
+            logger.info("LSTM quantized to int8 for inference")
+        except Exception as e:
+            logger.warning(f"LSTM int8 quantization failed, serving fp32: {e}")
+        return self._quantized_lstm_content
+
+    def _get_quantized_lstm_runner(self, shape: Tuple[int, ...]):
+        """
+        Interpreter specialized to one input shape. Batch sizes are bounded by
+        the batched predictor, so only a handful of shapes ever occur; each is
+        planned once instead of being resized and re-allocated whenever
+        consecutive batches differ in size.
+        """
+        content = self._get_quantized_lstm()
+        if content is None:
+            return None
+
+        runner = self._quantized_lstm_runners.get(shape)
+        if runner is None:
+            runner = tf.lite.Interpreter(model_content=content)
+            runner.resize_tensor_input(runner.get_input_details()[0]['index'], shape)
+            runner.allocate_tensors()
+            self._quantized_lstm_runners[shape] = runner
+        return runner
+
+    def _forward_lstm_batch(self, X: np.ndarray) -> np.ndarray:
+        """Deterministic forecast for a (B, T, F) batch"""
+        if self.quantize_lstm_inference:
+            with self._quantized_lstm_lock:
+                runner = self._get_quantized_lstm_runner(X.shape)
+                if runner is not None:
+                    runner.set_tensor(runner.get_input_details()[0]['index'], X)
+                    runner.invoke()
+                    return runner.get_tensor(runner.get_output_details()[0]['index'])
+
+        predict_fn, _ = self._get_lstm_inference_fns()
+        return predict_fn(X).numpy()
+
     def build_transformer_model(self, sequence_length: int = 30) -> TimeSeriesTransformerForPrediction:
         """
         Build Transformer model for mood forecasting
@@ -143,7 +271,7 @@ class PredictionService:
 
     async def train_lstm_model(
         self,
-        mood_data: List[Dict],
+        mood_data: MoodData,
         sequence_length: int = 14,
         epochs: int = 50
     ) -> Dict:
@@ -208,6 +336,7 @@ class PredictionService:
             )
 
             self.is_lstm_trained = True
+            self.lstm_trained_at = datetime.utcnow().isoformat()
 
             return {
                 'success': True,
@@ -223,7 +352,7 @@ class PredictionService:
 
     async def predict_mood(
         self,
-        recent_data: List[Dict],
+        recent_data: MoodData,
         days_ahead: int = 7,
         include_confidence: bool = True
     ) -> Dict:
@@ -260,17 +389,17 @@ class PredictionService:
                     'error': f'Need at least {sequence_length} days of data'
                 }
 
-            X = features[-sequence_length:].reshape(1, sequence_length, -1)
+            X = features[-sequence_length:].reshape(1, sequence_length, -1).astype(np.float32)
 
-            # Make prediction
-            predictions = self.lstm_model.predict(X, verbose=0)[0]
+            # Make prediction, batched with other in-flight requests. The model
+            # has a fixed horizon, so days_ahead only trims its output
+            predictions = (await self.batched_predictor.submit(X[0]))[:days_ahead]
 
-            # Generate prediction dates
-            last_date = df['date'].max()
-            prediction_dates = [
-                (last_date + timedelta(days=i+1)).isoformat()
-                for i in range(len(predictions))
-            ]
+            # Generate prediction dates in one vectorized step: ISO strings
+            # for the response, epoch seconds so callers need not parse them
+            last_date = df['date'].max().to_datetime64().astype('datetime64[s]')
+            prediction_days = last_date + np.arange(1, len(predictions) + 1) * np.timedelta64(1, 'D')
+            prediction_dates = np.datetime_as_string(prediction_days, unit='s').tolist()
 
             # Calculate confidence intervals using Monte Carlo dropout
             if include_confidence:
@@ -291,6 +420,7 @@ class PredictionService:
                     }
                     for i, (date, pred) in enumerate(zip(prediction_dates, predictions))
                 ],
+                'prediction_epochs': prediction_days.astype(np.int64).tolist(),
                 'model_type': 'lstm'
             }
 
@@ -369,14 +499,9 @@ class PredictionService:
         Returns:
             List of (lower, upper) confidence bounds
         """
-        predictions = []
-
-        # Enable dropout at inference time
-        for _ in range(n_iterations):
-            pred = self.lstm_model(X, training=True)
-            predictions.append(pred.numpy()[0])
-
-        predictions = np.array(predictions)
+        # All dropout samples in one batched forward pass
+        _, mc_dropout_fn = self._get_lstm_inference_fns()
+        predictions = mc_dropout_fn(np.repeat(X, n_iterations, axis=0)).numpy()
 
         # Calculate percentiles
         lower = np.percentile(predictions, 2.5, axis=0)
@@ -386,7 +511,7 @@ class PredictionService:
 
     async def detect_seasonal_patterns(
         self,
-        mood_data: List[Dict],
+        mood_data: MoodData,
         min_data_points: int = 90
     ) -> Dict:
         """
@@ -442,18 +567,16 @@ class PredictionService:
 
     def _detect_weekly_pattern(self, ts: pd.Series) -> Dict:
         """Detect weekly patterns"""
-        df = ts.to_frame('mood')
-        df['day_of_week'] = df.index.dayofweek
-
-        weekly_avg = df.groupby('day_of_week')['mood'].agg(['mean', 'std', 'count'])
+        by_day = ts.groupby(ts.index.dayofweek)
+        weekly_avg = by_day.agg(['mean', 'std', 'count'])
         day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
         # Find best and worst days
         best_day_idx = weekly_avg['mean'].idxmax()
         worst_day_idx = weekly_avg['mean'].idxmin()
 
-        # Statistical test for weekly pattern
-        groups = [df[df['day_of_week'] == i]['mood'].values for i in range(7)]
+        # Statistical test for weekly pattern (groups from the same single pass)
+        groups = [values.to_numpy() for _, values in by_day]
         f_stat, p_value = stats.f_oneway(*groups)
 
         return {
@@ -463,25 +586,22 @@ class PredictionService:
             'worst_day': day_names[worst_day_idx],
             'day_averages': {
                 day_names[i]: {
-                    'mean': float(weekly_avg.loc[i, 'mean']),
-                    'std': float(weekly_avg.loc[i, 'std'])
+                    'mean': float(row['mean']),
+                    'std': float(row['std'])
                 }
-                for i in range(7)
+                for i, row in weekly_avg.iterrows()
             }
         }
 
     def _detect_monthly_pattern(self, ts: pd.Series) -> Dict:
         """Detect monthly patterns"""
-        df = ts.to_frame('mood')
-        df['day_of_month'] = df.index.day
-
         # Group by day of month
-        monthly_avg = df.groupby('day_of_month')['mood'].agg(['mean', 'std', 'count'])
+        monthly_avg = ts.groupby(ts.index.day).mean()
 
         # Detect beginning/middle/end of month patterns
-        beginning = monthly_avg.loc[1:10, 'mean'].mean()
-        middle = monthly_avg.loc[11:20, 'mean'].mean()
-        end = monthly_avg.loc[21:31, 'mean'].mean()
+        beginning = monthly_avg.loc[1:10].mean()
+        middle = monthly_avg.loc[11:20].mean()
+        end = monthly_avg.loc[21:31].mean()
 
         return {
             'beginning_of_month': float(beginning),
@@ -493,59 +613,56 @@ class PredictionService:
 
     def _detect_yearly_pattern(self, ts: pd.Series) -> Dict:
         """Detect yearly/seasonal patterns"""
-        df = ts.to_frame('mood')
-        df['month'] = df.index.month
-
-        monthly_avg = df.groupby('month')['mood'].agg(['mean', 'std', 'count'])
+        monthly_avg = ts.groupby(ts.index.month).mean()
         month_names = [
             'January', 'February', 'March', 'April', 'May', 'June',
             'July', 'August', 'September', 'October', 'November', 'December'
         ]
 
-        best_month_idx = monthly_avg['mean'].idxmax()
-        worst_month_idx = monthly_avg['mean'].idxmin()
+        best_month_idx = monthly_avg.idxmax()
+        worst_month_idx = monthly_avg.idxmin()
 
         return {
             'best_month': month_names[best_month_idx - 1],
             'worst_month': month_names[worst_month_idx - 1],
             'monthly_averages': {
-                month_names[i]: float(monthly_avg.loc[i + 1, 'mean'])
-                for i in range(12) if (i + 1) in monthly_avg.index
+                month_names[month - 1]: float(mean)
+                for month, mean in monthly_avg.items()
             }
         }
 
     def _detect_frequencies(self, ts: pd.Series, top_n: int = 5) -> List[Dict]:
         """Detect dominant frequencies using FFT"""
         # Remove trend
-        detrended = ts - ts.rolling(window=7, center=True).mean()
-        detrended = detrended.dropna()
-
-        # Apply FFT
-        fft_values = fft(detrended.values)
-        frequencies = np.fft.fftfreq(len(detrended))
-
-        # Get positive frequencies only
-        positive_freq_idx = frequencies > 0
-        frequencies = frequencies[positive_freq_idx]
-        magnitudes = np.abs(fft_values[positive_freq_idx])
-
-        # Find top frequencies
-        top_indices = np.argsort(magnitudes)[-top_n:][::-1]
-
-        cycles = []
-        for idx in top_indices:
-            freq = frequencies[idx]
-            period_days = 1 / freq if freq > 0 else 0
-            cycles.append({
-                'period_days': float(period_days),
+        detrended = (ts - ts.rolling(window=7, center=True).mean()).dropna().to_numpy()
+
+        # Real FFT: only the non-negative half of the spectrum is computed
+        magnitudes = np.abs(np.fft.rfft(detrended))
+        frequencies = np.fft.rfftfreq(len(detrended))
+
+        # Positive frequencies below Nyquist
+        keep = (frequencies > 0) & (frequencies < 0.5)
+        frequencies = frequencies[keep]
+        magnitudes = magnitudes[keep]
+
+        # Find top frequencies without sorting the whole spectrum
+        top_n = min(top_n, len(magnitudes))
+        if top_n == 0:
+            return []
+        top_indices = np.argpartition(magnitudes, -top_n)[-top_n:]
+        top_indices = top_indices[np.argsort(magnitudes[top_indices])[::-1]]
+
+        return [
+            {
+                'period_days': float(1 / frequencies[idx]),
                 'magnitude': float(magnitudes[idx])
-            })
-
-        return cycles
+            }
+            for idx in top_indices
+        ]
 
     async def analyze_weather_correlation(
         self,
-        mood_data: List[Dict],
+        mood_data: MoodData,
         weather_data: List[Dict]
     ) -> Dict:
         """
@@ -574,17 +691,21 @@ class PredictionService:
                     'note': 'Need at least 30 days of combined data'
                 }
 
-            # Calculate correlations
+            # Calculate correlations for every available feature in one pass
             correlations = {}
             weather_features = ['temperature', 'precipitation', 'humidity', 'pressure', 'cloud_cover']
+            present = [feature for feature in weather_features if feature in merged.columns]
 
-            for feature in weather_features:
-                if feature in merged.columns:
-                    corr, p_value = stats.pearsonr(merged['mood_score'], merged[feature])
+            if present:
+                corrs, p_values = _pearson_columns(
+                    merged['mood_score'].to_numpy(dtype=np.float64),
+                    merged[present].to_numpy(dtype=np.float64)
+                )
+                for feature, corr, p_value in zip(present, corrs, p_values):
                     correlations[feature] = {
                         'correlation': float(corr),
                         'p_value': float(p_value),
-                        'significant': p_value < 0.05
+                        'significant': bool(p_value < 0.05)
                     }
 
             # Find strongest correlations
@@ -626,7 +747,7 @@ class PredictionService:
 
     async def analyze_sleep_patterns(
         self,
-        mood_data: List[Dict],
+        mood_data: MoodData,
         sleep_data: List[Dict]
     ) -> Dict:
         """
@@ -655,19 +776,19 @@ class PredictionService:
                     'note': 'Need at least 14 days of combined data'
                 }
 
-            # Analyze sleep duration
-            sleep_duration_corr, sleep_p = stats.pearsonr(
-                merged['mood_score'],
-                merged['sleep_hours']
+            # Analyze sleep duration, and quality if available, in one pass
+            sleep_columns = ['sleep_hours']
+            if 'sleep_quality' in merged.columns:
+                sleep_columns.append('sleep_quality')
+            corrs, p_values = _pearson_columns(
+                merged['mood_score'].to_numpy(dtype=np.float64),
+                merged[sleep_columns].to_numpy(dtype=np.float64)
             )
+            sleep_duration_corr, sleep_p = float(corrs[0]), float(p_values[0])
 
-            # Analyze sleep quality if available
             sleep_quality_corr = None
-            if 'sleep_quality' in merged.columns:
-                sleep_quality_corr, quality_p = stats.pearsonr(
-                    merged['mood_score'],
-                    merged['sleep_quality']
-                )
+            if len(sleep_columns) == 2:
+                sleep_quality_corr, quality_p = float(corrs[1]), float(p_values[1])
 
             # Find optimal sleep range
             optimal_range = self._find_optimal_sleep_range(merged)
@@ -687,7 +808,7 @@ class PredictionService:
                     'correlation': float(sleep_quality_corr),
                     'p_value': float(quality_p),
                     'significant': quality_p < 0.05
-                } if sleep_quality_corr else None,
+                } if sleep_quality_corr is not None else None,
                 'optimal_sleep_range': optimal_range,
                 'sleep_consistency_std': float(sleep_consistency),
                 'recommendation': self._generate_sleep_recommendation(
@@ -736,13 +857,7 @@ class PredictionService:
         return "; ".join(recommendations) if recommendations else "Continue monitoring sleep patterns"
 
 
-# Singleton instance
-_prediction_service_instance = None
-
-
+@functools.lru_cache(maxsize=1)
 def get_prediction_service() -> PredictionService:
     """Get or create prediction service singleton"""
-    global _prediction_service_instance
-    if _prediction_service_instance is None:
-        _prediction_service_instance = PredictionService()
-    return _prediction_service_instance
+    return PredictionService()
@@ -37,7 +37,7 @@ def download_transformer_models():
     models = [
         "nlptown/bert-base-multilingual-uncased-sentiment",
         "j-hartmann/emotion-english-distilroberta-base",
-        "facebook/bart-large-mnli"
+        "valhalla/distilbart-mnli-12-3"
     ]
 
     for model_name in models:
@@ -0,0 +1,95 @@
+"""
+Background model training queue
+Training requests get a job_id immediately; a worker fits models one at a
+time off the event loop and stores job status in Redis for polling.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.core.batching import MicroBatchWorker
+from app.core.database import SessionLocal
+from app.core.redis import get_redis
+from app.ml.mood_data import fetch_user_mood_array, n_days
+from app.ml.prediction_service import get_prediction_service
+
+logger = logging.getLogger(__name__)
+
+MIN_TRAINING_DAYS = 21
+STATUS_TTL_SECONDS = 24 * 3600
+
+
+def _job_key(job_id: str) -> str:
+    return f"ml:train:{job_id}"
+
+
+async def _set_job(job_id: str, data: Dict[str, Any]) -> None:
+    await get_redis().setex(_job_key(job_id), STATUS_TTL_SECONDS, orjson.dumps(data))
+
+
+async def submit_training(user_id: Any, sequence_length: int, epochs: int) -> str:
+    """Queue an LSTM training job for a user and return its job_id"""
+    job_id = uuid.uuid4().hex
+    await _set_job(job_id, {"status": "queued", "user_id": str(user_id)})
+    _worker.put({
+        "job_id": job_id,
+        "user_id": user_id,
+        "sequence_length": sequence_length,
+        "epochs": epochs
+    })
+    return job_id
+
+
+async def get_training_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return {status, user_id, result?, error?} or None if unknown/expired"""
+    raw = await get_redis().get(_job_key(job_id))
+    return orjson.loads(raw) if raw else None
+
+
+def _train(job: Dict) -> Dict:
+    """Load the user's history and fit the model (worker thread, private event loop)"""
+    db = SessionLocal()
+    try:
+        mood_data = fetch_user_mood_array(db, job["user_id"])
+    finally:
+        db.close()
+
+    if n_days(mood_data) < MIN_TRAINING_DAYS:
+        return {
+            'success': False,
+            'error': f'Need at least {MIN_TRAINING_DAYS} days of mood data to train model'
+        }
+
+    return asyncio.run(get_prediction_service().train_lstm_model(
+        mood_data,
+        sequence_length=job["sequence_length"],
+        epochs=job["epochs"]
+    ))
+
+
+async def _handle(jobs: List[Dict]) -> None:
+    """Run one training job off the event loop and publish its status"""
+    job = jobs[0]
+    user_id = str(job["user_id"])
+    await _set_job(job["job_id"], {"status": "running", "user_id": user_id})
+
+    try:
+        result = await asyncio.to_thread(_train, job)
+    except Exception as e:
+        logger.error(f"Training job {job['job_id']} failed: {e}")
+        result = {'success': False, 'error': 'Training failed'}
+
+    if result['success']:
+        await _set_job(job["job_id"], {"status": "complete", "user_id": user_id, "result": result})
+    else:
+        await _set_job(job["job_id"], {
+            "status": "failed", "user_id": user_id, "error": result.get('error', 'Training failed')
+        })
+
+
+# Jobs run one at a time; they share the prediction service's model
+_worker: MicroBatchWorker[Dict] = MicroBatchWorker(_handle, name="LSTM training")
@@ -6,7 +6,7 @@ from app.models.checkin import MoodCheckin
 from app.models.intervention import Intervention, InterventionSession
 from app.models.ml_model import UserMLModel
 from app.models.achievement import UserAchievement
-from app.models.summary import WeeklySummary
+from app.models.summary import WeeklySummary, WeeklyInsightsSnapshot
 from app.models.crisis import CrisisEvent
 from app.models.audit import AuditLog
 
@@ -19,6 +19,7 @@ __all__ = [
     "UserMLModel",
     "UserAchievement",
     "WeeklySummary",
+    "WeeklyInsightsSnapshot",
     "CrisisEvent",
     "AuditLog",
 ]
@@ -3,7 +3,7 @@ Mood Check-in model
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -57,3 +57,8 @@ class MoodCheckin(Base):
     # Relationships
     user = relationship("User", back_populates="checkins")
     intervention_sessions = relationship("InterventionSession", back_populates="checkin")
+
+    __table_args__ = (
+        # Per-user history, averages and counts
+        Index("ix_mood_checkins_user_created", "user_id", created_at.desc()),
+    )
@@ -3,7 +3,7 @@ Crisis Event model
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -42,3 +42,13 @@ class CrisisEvent(Base):
 
     # Relationship
     user = relationship("User", back_populates="crisis_events")
+
+    __table_args__ = (
+        # Most recent open event per user (mark_safe)
+        Index(
+            "ix_crisis_events_user_unresolved",
+            "user_id",
+            created_at.desc(),
+            postgresql_where=(resolved == False)
+        ),
+    )
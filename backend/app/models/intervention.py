@@ -3,7 +3,7 @@ Intervention and InterventionSession models
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -58,6 +58,21 @@ class Intervention(Base):
     # Relationships
     sessions = relationship("InterventionSession", back_populates="intervention")
 
+    __table_args__ = (
+        # Library filters (get_all_interventions always filters is_active)
+        Index(
+            "ix_interventions_filters",
+            "therapeutic_approach", "adhd_friendly", "asd_friendly", "is_premium", "duration_seconds",
+            postgresql_where=(is_active == True)
+        ),
+        Index(
+            "ix_interventions_free_duration",
+            "duration_seconds",
+            postgresql_where=(is_active == True) & (is_premium == False)
+        ),
+        Index("ix_interventions_target_emotions", "target_emotions", postgresql_using="gin"),
+    )
+
 
 class InterventionSession(Base):
     __tablename__ = "intervention_sessions"
@@ -94,3 +109,8 @@ class InterventionSession(Base):
     user = relationship("User", back_populates="intervention_sessions")
     intervention = relationship("Intervention", back_populates="sessions")
     checkin = relationship("MoodCheckin", back_populates="intervention_sessions")
+
+    __table_args__ = (
+        # Keyset pagination of session history
+        Index("ix_intervention_sessions_user_created_id", "user_id", created_at.desc(), id.desc()),
+    )
@@ -47,3 +47,12 @@ class WeeklySummary(Base):
 
     # Relationship
     user = relationship("User", back_populates="weekly_summaries")
+
+
+class WeeklyInsightsSnapshot(Base):
+    """Nightly precomputed /ml/insights/weekly payload (one row per user)"""
+    __tablename__ = "weekly_insights"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    insights = Column(JSONB, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
@@ -48,13 +48,15 @@ class User(Base):
     timezone = Column(String(50), default="UTC")
 
     # Relationships
-    preferences = relationship("UserPreferences", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    checkins = relationship("MoodCheckin", back_populates="user", cascade="all, delete-orphan")
-    intervention_sessions = relationship("InterventionSession", back_populates="user", cascade="all, delete-orphan")
-    ml_model = relationship("UserMLModel", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    achievements = relationship("UserAchievement", back_populates="user", cascade="all, delete-orphan")
-    weekly_summaries = relationship("WeeklySummary", back_populates="user", cascade="all, delete-orphan")
-    crisis_events = relationship("CrisisEvent", back_populates="user", cascade="all, delete-orphan")
+    # lazy="raise": load explicitly (selectinload or a service query) so no
+    # request silently pays an extra SELECT. Child FKs cascade in the database.
+    preferences = relationship("UserPreferences", back_populates="user", uselist=False, cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    checkins = relationship("MoodCheckin", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    intervention_sessions = relationship("InterventionSession", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    ml_model = relationship("UserMLModel", back_populates="user", uselist=False, cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    achievements = relationship("UserAchievement", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    weekly_summaries = relationship("WeeklySummary", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
+    crisis_events = relationship("CrisisEvent", back_populates="user", cascade="all, delete-orphan", lazy="raise", passive_deletes=True)
 
 
 class UserPreferences(Base):
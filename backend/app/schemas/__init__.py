@@ -8,7 +8,7 @@ from app.schemas.user import (
 from app.schemas.auth import Token, TokenData, LoginRequest, RegisterRequest
 from app.schemas.checkin import CheckinCreate, CheckinResponse, CheckinListResponse
 from app.schemas.intervention import (
-    InterventionResponse, InterventionSessionCreate,
+    InterventionResponse, InterventionListItem, InterventionSessionCreate,
     InterventionSessionResponse, RecommendationResponse
 )
 
@@ -17,6 +17,6 @@ __all__ = [
     "UserPreferencesCreate", "UserPreferencesUpdate", "UserPreferencesResponse",
     "Token", "TokenData", "LoginRequest", "RegisterRequest",
     "CheckinCreate", "CheckinResponse", "CheckinListResponse",
-    "InterventionResponse", "InterventionSessionCreate",
+    "InterventionResponse", "InterventionListItem", "InterventionSessionCreate",
     "InterventionSessionResponse", "RecommendationResponse",
 ]
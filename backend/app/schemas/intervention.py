@@ -39,6 +39,28 @@ class InterventionResponse(BaseModel):
         from_attributes = True
 
 
+class InterventionListItem(BaseModel):
+    """Library listing; detail fields come from GET /interventions/{id}"""
+    id: UUID
+    name: str
+    short_description: str
+    duration_seconds: int
+    effort_level: str
+    energy_required: str
+    therapeutic_approach: str
+    sub_category: Optional[str]
+    target_emotions: List[str]
+    is_premium: bool
+    adhd_friendly: bool
+    asd_friendly: bool
+    sensory_intensity: str
+    total_completions: int
+    average_rating: float
+
+    class Config:
+        from_attributes = True
+
+
 class InterventionSessionCreate(BaseModel):
     intervention_id: UUID
     checkin_id: Optional[UUID] = None
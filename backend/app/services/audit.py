@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Optional, Any, Dict
 from uuid import UUID
 from sqlalchemy.orm import Session
-from app.models.audit import AuditLog
+from app.services import audit_queue
 
 
 class AuditService:
@@ -23,23 +23,24 @@ class AuditService:
         request_details: Optional[Dict[str, Any]] = None,
         response_status: Optional[int] = None,
         additional_data: Optional[Dict[str, Any]] = None
-    ) -> AuditLog:
-        """Create an audit log entry"""
-        audit_entry = AuditLog(
-            user_id=user_id,
-            action_type=action_type,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            request_details=request_details,
-            response_status=response_status,
-            additional_data=additional_data
-        )
-        db.add(audit_entry)
-        db.commit()
-        db.refresh(audit_entry)
-        return audit_entry
+    ) -> None:
+        """
+        Queue an audit log entry.
+        Entries are batch-inserted by the background writer in audit_queue,
+        so the caller's session and transaction are left untouched.
+        """
+        audit_queue.enqueue({
+            "timestamp": datetime.utcnow(),
+            "user_id": user_id,
+            "action_type": action_type,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "request_details": request_details,
+            "response_status": response_status,
+            "additional_data": additional_data
+        })
 
     @staticmethod
     def log_user_login(
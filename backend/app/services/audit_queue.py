@@ -0,0 +1,64 @@
+"""
+Background audit log writer - batches audit events off the request path
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+
+from app.core.batching import MicroBatchWorker
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Flush when this many events are buffered or this much time has passed
+BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 0.2
+
+
+def _write_batch(events: List[Dict[str, Any]]) -> None:
+    """Insert a batch of audit events in a single transaction"""
+    db = SessionLocal()
+    try:
+        db.execute(insert(AuditLog), events)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to write {len(events)} audit events: {e}")
+    finally:
+        db.close()
+
+
+async def _handle(batch: List[Dict[str, Any]]) -> None:
+    await asyncio.to_thread(_write_batch, batch)
+
+
+_worker: MicroBatchWorker[Dict[str, Any]] = MicroBatchWorker(
+    _handle, max_batch=BATCH_SIZE, max_wait_seconds=FLUSH_INTERVAL_SECONDS, name="Audit log"
+)
+
+
+def enqueue(event: Dict[str, Any]) -> None:
+    """
+    Queue an audit event for the background writer.
+    Safe to call from sync routes running in the threadpool. Falls back to
+    a direct write when the worker is not running (scripts, tests).
+    """
+    event.setdefault("timestamp", datetime.utcnow())
+    if not _worker.put_threadsafe(event):
+        _write_batch([event])
+
+
+async def start_audit_worker() -> None:
+    """Start the background writer on the current event loop"""
+    _worker.start()
+
+
+async def stop_audit_worker() -> None:
+    """Stop the writer and flush any events still queued"""
+    pending = await _worker.stop()
+    for i in range(0, len(pending), BATCH_SIZE):
+        await asyncio.to_thread(_write_batch, pending[i:i + BATCH_SIZE])
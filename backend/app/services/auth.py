@@ -2,16 +2,23 @@
 Authentication service - JWT tokens and password hashing
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from uuid import UUID
 import jwt
 import bcrypt
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.auth import Token, TokenData
 
 
+# Hot lookups built once so the compiled form and prepared statement are reused
+USER_BY_ID_QUERY = select(User).where(User.id == bindparam("user_id"))
+USER_BY_EMAIL_QUERY = select(User).where(User.email == bindparam("email"))
+
+
 class AuthService:
     """Handle authentication operations"""
 
@@ -67,29 +74,38 @@ class AuthService:
             return None
 
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-        """Authenticate user with email and password"""
-        user = db.query(User).filter(User.email == email).first()
+    async def authenticate_user_async(
+        db: AsyncSession,
+        email: str,
+        password: str
+    ) -> Tuple[Optional[User], Optional[str]]:
+        """
+        Authenticate user with email and password; bcrypt runs off the event loop.
+        Returns (user row or None, failure reason or None). The row is returned
+        even on failure so callers can audit without querying again.
+        """
+        result = await db.execute(USER_BY_EMAIL_QUERY, {"email": email})
+        user = result.scalar_one_or_none()
         if not user:
-            return None
-        if not AuthService.verify_password(password, user.password_hash):
+            return None, "not_found"
+        if not await run_in_threadpool(AuthService.verify_password, password, user.password_hash):
             # Increment failed login attempts
             user.failed_login_attempts += 1
             if user.failed_login_attempts >= 5:
                 user.locked_until = datetime.utcnow() + timedelta(minutes=15)
-            db.commit()
-            return None
+            await db.commit()
+            return user, "invalid_password"
 
         # Check if account is locked
         if user.locked_until and user.locked_until > datetime.utcnow():
-            return None
+            return user, "locked"
 
         # Reset failed attempts on successful login
         user.failed_login_attempts = 0
         user.locked_until = None
         user.last_login = datetime.utcnow()
-        db.commit()
-        return user
+        await db.commit()
+        return user, None
 
     @staticmethod
     def create_tokens(user: User) -> Token:
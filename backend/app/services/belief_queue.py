@@ -0,0 +1,210 @@
+"""
+Redis-backed queue for Thompson Sampling belief updates.
+The API pushes rating events; a background consumer applies them in batches,
+one transaction per user, preserving each user's event order.
+
+Delivery is at-least-once. The consumer moves events (BLMOVE/LMOVE) into its
+own processing list and clears it only after the batch is applied; failed
+user groups go back to the head of the queue, up to MAX_ATTEMPTS. The
+heartbeat is refreshed while a batch runs, and a stop lets the batch in
+flight finish and ack; only lists left by consumers that died mid-batch (no
+heartbeat) are re-queued, and those events may be applied twice.
+BLMOVE/LMOVE require Redis >= 6.2.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Union
+from uuid import UUID, uuid4
+
+import orjson
+import redis.asyncio as aioredis
+
+from app.core.database import SessionLocal
+from app.core.redis import get_redis
+from app.services.ml_model_cache import invalidate_cached_model_sync
+from app.services.ml_training import MLTrainingService
+
+logger = logging.getLogger(__name__)
+
+BELIEF_QUEUE_KEY = "belief:queue"
+PROCESSING_KEY_PREFIX = "belief:processing"
+HEARTBEAT_KEY_PREFIX = "belief:consumer"
+HEARTBEAT_TTL_SECONDS = 60
+HEARTBEAT_REFRESH_SECONDS = HEARTBEAT_TTL_SECONDS / 3
+BATCH_SIZE = 1000
+POP_TIMEOUT_SECONDS = 1
+MAX_ATTEMPTS = 3
+
+_worker: Optional[asyncio.Task] = None
+_stopping: Optional[asyncio.Event] = None
+
+
+async def enqueue_belief_update(
+    user_id: UUID,
+    intervention_id: UUID,
+    effectiveness_rating: int,
+    context: Dict
+) -> bool:
+    """Queue a belief update. Returns False when Redis is unavailable."""
+    event = {
+        "user_id": user_id,
+        "intervention_id": intervention_id,
+        "effectiveness_rating": effectiveness_rating,
+        "context": context
+    }
+    try:
+        await get_redis().rpush(BELIEF_QUEUE_KEY, orjson.dumps(event))
+    except Exception as e:
+        logger.warning(f"Belief queue push failed: {e}")
+        return False
+    return True
+
+
+def _apply_batch(raw_events: List[bytes]) -> List[Dict]:
+    """
+    Group events by user (keeping arrival order) and apply each group in one transaction.
+    Returns the events of the groups that failed.
+    """
+    by_user: Dict[str, List[Dict]] = {}
+    for raw in raw_events:
+        event = orjson.loads(raw)
+        by_user.setdefault(event["user_id"], []).append(event)
+
+    failed: List[Dict] = []
+    db = SessionLocal()
+    try:
+        for user_id, events in by_user.items():
+            try:
+                MLTrainingService.apply_belief_updates(db, UUID(user_id), events)
+                invalidate_cached_model_sync(user_id)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to apply {len(events)} belief updates for {user_id}: {e}")
+                failed.extend(events)
+    finally:
+        db.close()
+    return failed
+
+
+def _retry_payloads(failed: List[Dict]) -> List[bytes]:
+    """Bump the attempt count of failed events, dropping those out of attempts"""
+    payloads = []
+    for event in failed:
+        attempts = event.get("attempts", 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            logger.error(f"Dropping belief update for {event['user_id']} after {attempts} attempts")
+            continue
+        payloads.append(orjson.dumps({**event, "attempts": attempts}))
+    return payloads
+
+
+async def _requeue(redis: aioredis.Redis, processing_key: Union[str, bytes]) -> None:
+    """Move a processing list back to the head of the queue, keeping its order"""
+    count = await redis.llen(processing_key)
+    if not count:
+        return
+    pipe = redis.pipeline(transaction=False)
+    for _ in range(count):
+        pipe.lmove(processing_key, BELIEF_QUEUE_KEY, "RIGHT", "LEFT")
+    await pipe.execute()
+    logger.warning(f"Re-queued {count} belief updates from {processing_key!r}")
+
+
+async def _requeue_orphans(redis: aioredis.Redis) -> None:
+    """Re-queue processing lists whose consumer stopped sending heartbeats"""
+    async for key in redis.scan_iter(match=f"{PROCESSING_KEY_PREFIX}:*"):
+        consumer_id = key.decode().rsplit(":", 1)[1]
+        if not await redis.exists(f"{HEARTBEAT_KEY_PREFIX}:{consumer_id}"):
+            await _requeue(redis, key)
+
+
+async def _ack(redis: aioredis.Redis, processing_key: str, retry: List[bytes]) -> None:
+    """Clear the processing list and put failed events back at the head of the queue"""
+    async with redis.pipeline(transaction=True) as pipe:
+        if retry:
+            # LPUSH prepends one value at a time; reverse to keep arrival order
+            pipe.lpush(BELIEF_QUEUE_KEY, *reversed(retry))
+        pipe.delete(processing_key)
+        await pipe.execute()
+
+
+async def _process(
+    redis: aioredis.Redis, processing_key: str, heartbeat_key: str, raw_events: List[bytes]
+) -> None:
+    """Apply a batch off the event loop and ack it, keeping the heartbeat alive meanwhile"""
+    apply = asyncio.ensure_future(asyncio.to_thread(_apply_batch, raw_events))
+    while True:
+        # asyncio.wait leaves the batch running on timeout (wait_for would cancel it)
+        await asyncio.wait({apply}, timeout=HEARTBEAT_REFRESH_SECONDS)
+        if apply.done():
+            break
+        await redis.set(heartbeat_key, 1, ex=HEARTBEAT_TTL_SECONDS)
+    await _ack(redis, processing_key, _retry_payloads(apply.result()))
+
+
+async def _consume(consumer_id: str, stopping: asyncio.Event) -> None:
+    """
+    Block for the first event, then drain up to BATCH_SIZE and apply off the event loop.
+    Returns once stopping is set and the batch in flight has been applied and acked.
+    """
+    redis = get_redis()
+    processing_key = f"{PROCESSING_KEY_PREFIX}:{consumer_id}"
+    heartbeat_key = f"{HEARTBEAT_KEY_PREFIX}:{consumer_id}"
+    loop = asyncio.get_running_loop()
+    next_recovery = 0.0
+
+    while not stopping.is_set():
+        try:
+            await redis.set(heartbeat_key, 1, ex=HEARTBEAT_TTL_SECONDS)
+            if loop.time() >= next_recovery:
+                await _requeue_orphans(redis)
+                next_recovery = loop.time() + HEARTBEAT_TTL_SECONDS
+
+            first = await redis.blmove(
+                BELIEF_QUEUE_KEY, processing_key, POP_TIMEOUT_SECONDS, "LEFT", "RIGHT"
+            )
+            if first is None:
+                continue
+            pending = min(await redis.llen(BELIEF_QUEUE_KEY), BATCH_SIZE - 1)
+            pipe = redis.pipeline(transaction=False)
+            for _ in range(pending):
+                pipe.lmove(BELIEF_QUEUE_KEY, processing_key, "LEFT", "RIGHT")
+            rest = [raw for raw in await pipe.execute() if raw is not None]
+
+            await _process(redis, processing_key, heartbeat_key, [first, *rest])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Belief queue consumer error: {e}")
+            await asyncio.sleep(POP_TIMEOUT_SECONDS)
+            try:
+                await _requeue(redis, processing_key)
+            except Exception as requeue_error:
+                logger.error(f"Belief queue re-queue failed: {requeue_error}")
+
+    try:
+        await redis.delete(heartbeat_key)
+    except Exception as e:
+        logger.warning(f"Belief queue heartbeat cleanup failed: {e}")
+
+
+async def start_belief_worker() -> None:
+    """Start the consumer on the current event loop"""
+    global _worker, _stopping
+    if _worker is None:
+        _stopping = asyncio.Event()
+        _worker = asyncio.create_task(_consume(uuid4().hex, _stopping))
+
+
+async def stop_belief_worker() -> None:
+    """
+    Stop the consumer without cancelling it: the batch in flight is applied and
+    acked first, so its events are not re-queued and applied again. Unconsumed
+    events stay in the queue.
+    """
+    global _worker, _stopping
+    if _worker is None:
+        return
+    _stopping.set()
+    await _worker
+    _worker, _stopping = None, None
@@ -0,0 +1,58 @@
+"""
+Bulk insert helpers for batch writes (ML pipeline output, nightly jobs)
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from psycopg2.extras import execute_values
+from sqlalchemy.orm import Session
+
+from app.core.database import _json_serializer
+
+
+def _columns_for(rows: List[Dict[str, Any]], columns: Optional[Sequence[str]]) -> List[str]:
+    """Use the given column list, or the keys of the first row"""
+    return list(columns) if columns else list(rows[0].keys())
+
+
+def _adapt(value: Any) -> Any:
+    """Adapt JSON-like and UUID values for psycopg2 parameters"""
+    if isinstance(value, (dict, list)):
+        # Same encoding as the engines' JSON columns (non-str keys, numpy)
+        return _json_serializer(value)
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def bulk_persist(
+    db: Session,
+    table: str,
+    rows: List[Dict[str, Any]],
+    columns: Optional[Sequence[str]] = None,
+    page_size: int = 500
+) -> int:
+    """
+    Insert rows with multi-row VALUES statements (psycopg2 execute_values).
+    Runs inside the session's transaction; the caller commits.
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+
+    cols = _columns_for(rows, columns)
+    values = [tuple(_adapt(row.get(col)) for col in cols) for row in rows]
+
+    cursor = db.connection().connection.cursor()
+    try:
+        execute_values(
+            cursor,
+            f"INSERT INTO {table} ({', '.join(cols)}) VALUES %s",
+            values,
+            page_size=page_size
+        )
+    finally:
+        cursor.close()
+
+    return len(rows)
+
@@ -1,23 +1,40 @@
 """
 Mood Check-in service
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import Date, Integer, cast, desc, func, select, text
 from app.models.checkin import MoodCheckin
 from app.schemas.checkin import CheckinCreate
 from app.services.crisis import CrisisDetectionService
 from app.services.ml_training import MLTrainingService
 
 
+# Stats row from the materialized view, flagged stale if the user has
+# checked in since the last refresh
+_CACHED_STATS_QUERY = text("""
+    SELECT mv.total_checkins, mv.avg_mood_7d, mv.avg_mood_30d, mv.avg_mood_prev_7d,
+           mv.streak_length, mv.refreshed_at,
+           EXISTS (
+               SELECT 1 FROM mood_checkins c
+               WHERE c.user_id = mv.user_id AND c.created_at > mv.refreshed_at
+           ) AS stale
+    FROM checkin_stats_mv mv
+    WHERE mv.user_id = :user_id
+""")
+
+
 class CheckinService:
     """Handle mood check-in operations"""
 
     @staticmethod
     def create_checkin(db: Session, user_id: UUID, checkin_data: CheckinCreate) -> MoodCheckin:
-        """Create a new mood check-in"""
+        """
+        Create a new mood check-in.
+        Only flushes; the caller owns the transaction and commits once.
+        """
         checkin = MoodCheckin(
             user_id=user_id,
             mood_score=checkin_data.mood_score,
@@ -48,19 +65,16 @@ class CheckinService:
             checkin.ai_emotion_primary = checkin_data.emotion_tags[0] if checkin_data.emotion_tags else None
 
         db.add(checkin)
-        db.commit()
-        db.refresh(checkin)
-
-        # Trigger ML pattern learning after certain milestones
-        CheckinService._trigger_ml_learning(db, user_id)
+        db.flush()
 
         return checkin
 
     @staticmethod
-    def _trigger_ml_learning(db: Session, user_id: UUID) -> None:
+    def trigger_ml_learning(db: Session, user_id: UUID) -> None:
         """
         Trigger ML pattern learning after check-in milestones.
-        Learns circadian patterns, triggers, etc.
+        Learns circadian patterns, triggers, etc. Commits its own transaction,
+        so call it after the check-in has been committed.
         """
         # Count total check-ins
         total_checkins = db.query(MoodCheckin).filter(
@@ -181,9 +195,97 @@ class CheckinService:
 
         previous_avg = sum(c.mood_score for c in previous_checkins) / len(previous_checkins)
 
+        return CheckinService._classify_trend(recent_avg, previous_avg)
+
+    @staticmethod
+    def _classify_trend(recent_avg: Optional[float], previous_avg: Optional[float]) -> str:
+        """Compare this week's average mood to last week's"""
+        if recent_avg is None or previous_avg is None:
+            return "stable"
+
         diff = recent_avg - previous_avg
         if diff > 0.5:
             return "improving"
         elif diff < -0.5:
             return "declining"
         return "stable"
+
+    @staticmethod
+    def get_cached_stats(db: Session, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Get stats from checkin_stats_mv.
+        Returns None when the user has no row, has checked in since the
+        last refresh, or the refresh happened on a previous UTC day.
+        """
+        row = db.execute(_CACHED_STATS_QUERY, {"user_id": user_id}).first()
+        if row is None or row.stale:
+            return None
+        if row.refreshed_at.astimezone(timezone.utc).date() != datetime.now(timezone.utc).date():
+            return None
+
+        avg_7d = float(row.avg_mood_7d) if row.avg_mood_7d is not None else None
+        avg_30d = float(row.avg_mood_30d) if row.avg_mood_30d is not None else None
+        avg_prev_7d = float(row.avg_mood_prev_7d) if row.avg_mood_prev_7d is not None else None
+
+        return {
+            "streak_length": row.streak_length or 0,
+            "average_mood_7_days": avg_7d,
+            "average_mood_30_days": avg_30d,
+            "mood_trend": CheckinService._classify_trend(avg_7d, avg_prev_7d),
+            "total_checkins": row.total_checkins
+        }
+
+    @staticmethod
+    def get_full_stats(db: Session, user_id: UUID) -> Dict[str, Any]:
+        """
+        Get streak, 7/30-day averages, trend and total count in one query.
+        Same results as the individual getters, but a single scan of the
+        user's check-ins instead of one round-trip per statistic.
+        """
+        now = datetime.now(timezone.utc)
+        today = now.date()
+
+        # Streak: distinct UTC days, grouped into runs of consecutive days.
+        # day + row_number (newest first) is constant within a run, and the
+        # run containing today has the value today + 1.
+        checkin_day = cast(func.timezone("UTC", MoodCheckin.created_at), Date)
+        days = (
+            select(checkin_day.label("day"))
+            .where(MoodCheckin.user_id == user_id)
+            .group_by(checkin_day)
+            .subquery()
+        )
+        runs = select(
+            (days.c.day + cast(func.row_number().over(order_by=days.c.day.desc()), Integer)).label("run")
+        ).subquery()
+        streak = (
+            select(func.count())
+            .select_from(runs)
+            .where(runs.c.run == today + timedelta(days=1))
+            .scalar_subquery()
+        )
+
+        mood = MoodCheckin.mood_score
+        created = MoodCheckin.created_at
+        row = db.query(
+            func.count(MoodCheckin.id).label("total"),
+            func.avg(mood).filter(created >= now - timedelta(days=7)).label("avg_7d"),
+            func.avg(mood).filter(created >= now - timedelta(days=30)).label("avg_30d"),
+            func.avg(mood).filter(
+                created >= now - timedelta(days=14),
+                created < now - timedelta(days=7)
+            ).label("avg_prev_7d"),
+            streak.label("streak")
+        ).filter(MoodCheckin.user_id == user_id).one()
+
+        avg_7d = float(row.avg_7d) if row.avg_7d is not None else None
+        avg_30d = float(row.avg_30d) if row.avg_30d is not None else None
+        avg_prev_7d = float(row.avg_prev_7d) if row.avg_prev_7d is not None else None
+
+        return {
+            "streak_length": row.streak or 0,
+            "average_mood_7_days": avg_7d,
+            "average_mood_30_days": avg_30d,
+            "mood_trend": CheckinService._classify_trend(avg_7d, avg_prev_7d),
+            "total_checkins": row.total
+        }
@@ -3,6 +3,40 @@ Crisis Detection Service - Safety-critical component
 """
 from typing import Dict, List, Tuple
 import re
+import orjson
+
+
+# Static content - built and serialized once at import
+_CRISIS_RESOURCES = {
+    "hotlines": [
+        {
+            "name": "988 Suicide & Crisis Lifeline",
+            "number": "988",
+            "description": "24/7 crisis support",
+            "type": "call"
+        },
+        {
+            "name": "Crisis Text Line",
+            "number": "741741",
+            "description": "Text HOME to connect",
+            "type": "text"
+        },
+        {
+            "name": "National Suicide Prevention Lifeline",
+            "number": "1-800-273-8255",
+            "description": "24/7 support",
+            "type": "call"
+        }
+    ],
+    "message": "You matter. If you're having thoughts of suicide, please reach out to one of these resources immediately.",
+    "safe_now_options": [
+        "Try a calming exercise",
+        "Review your safety plan",
+        "Contact someone you trust",
+        "Return to app"
+    ]
+}
+_CRISIS_RESOURCES_JSON = orjson.dumps(_CRISIS_RESOURCES)
 
 
 class CrisisDetectionService:
@@ -135,33 +169,10 @@ class CrisisDetectionService:
 
     @staticmethod
     def get_crisis_resources() -> Dict:
-        """Return crisis resource information"""
-        return {
-            "hotlines": [
-                {
-                    "name": "988 Suicide & Crisis Lifeline",
-                    "number": "988",
-                    "description": "24/7 crisis support",
-                    "type": "call"
-                },
-                {
-                    "name": "Crisis Text Line",
-                    "number": "741741",
-                    "description": "Text HOME to connect",
-                    "type": "text"
-                },
-                {
-                    "name": "National Suicide Prevention Lifeline",
-                    "number": "1-800-273-8255",
-                    "description": "24/7 support",
-                    "type": "call"
-                }
-            ],
-            "message": "You matter. If you're having thoughts of suicide, please reach out to one of these resources immediately.",
-            "safe_now_options": [
-                "Try a calming exercise",
-                "Review your safety plan",
-                "Contact someone you trust",
-                "Return to app"
-            ]
-        }
+        """Return crisis resource information (shared, do not mutate)"""
+        return _CRISIS_RESOURCES
+
+    @staticmethod
+    def get_crisis_resources_json() -> bytes:
+        """Return crisis resource information pre-serialized as JSON"""
+        return _CRISIS_RESOURCES_JSON
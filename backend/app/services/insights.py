@@ -1,28 +1,58 @@
 """
 Insights Generation Service - Generates personalized insights from ML patterns
 """
+import asyncio
+import functools
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import bindparam, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.database import run_in_sync_session
 from app.models.user import User
+from app.models.ml_model import UserMLModel
 from app.models.checkin import MoodCheckin
 from app.models.intervention import InterventionSession
+from app.models.summary import WeeklyInsightsSnapshot
 from app.services.ml_training import MLTrainingService
 from app.services.mood_prediction import MoodPredictionService
 
+# Snapshot plus a staleness flag for activity logged after it was computed
+_PRECOMPUTED_WEEKLY_QUERY = select(
+    WeeklyInsightsSnapshot.insights,
+    WeeklyInsightsSnapshot.computed_at,
+    or_(
+        exists().where(
+            MoodCheckin.user_id == WeeklyInsightsSnapshot.user_id,
+            MoodCheckin.created_at > WeeklyInsightsSnapshot.computed_at
+        ),
+        exists().where(
+            InterventionSession.user_id == WeeklyInsightsSnapshot.user_id,
+            InterventionSession.created_at > WeeklyInsightsSnapshot.computed_at
+        )
+    ).label("stale")
+).where(WeeklyInsightsSnapshot.user_id == bindparam("user_id"))
+
+
+# Comprehensive-report sections in flight across all requests. Each holds a
+# sync-pool connection, so this stays under DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW.
+REPORT_SECTION_CONCURRENCY = 10
+_report_sections = asyncio.Semaphore(REPORT_SECTION_CONCURRENCY)
+
 
 class InsightsService:
     """Generate personalized insights from user data"""
 
     @staticmethod
-    def generate_weekly_insights(db: Session, user_id: UUID) -> Dict:
+    def generate_weekly_insights(db: Session, user_id: UUID, user: Optional[User] = None) -> Dict:
         """
         Generate comprehensive weekly insights for user.
         Combines mood trends, patterns, and intervention effectiveness.
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            user = db.query(User).filter(User.id == user_id).first()
         if not user:
             return {"error": "User not found"}
 
@@ -245,12 +275,49 @@ class InsightsService:
         return achievements
 
     @staticmethod
-    def get_daily_insight(db: Session, user_id: UUID) -> Dict:
+    def get_precomputed_weekly_insights(db: Session, user_id: UUID) -> Optional[Dict]:
+        """
+        Get the nightly weekly_insights snapshot.
+        Returns None when the user has no row, has checked in or logged a
+        session since it was computed, or it was computed on a previous UTC day.
+        """
+        row = db.execute(_PRECOMPUTED_WEEKLY_QUERY, {"user_id": user_id}).first()
+        if row is None or row.stale:
+            return None
+        if row.computed_at.astimezone(timezone.utc).date() != datetime.now(timezone.utc).date():
+            return None
+        return row.insights
+
+    @staticmethod
+    def compute_weekly_insights(db: Session, user_id: UUID) -> Dict:
+        """Generate weekly insights and store them as the user's snapshot"""
+        insights = InsightsService.generate_weekly_insights(db, user_id)
+        stmt = pg_insert(WeeklyInsightsSnapshot).values(
+            user_id=user_id, insights=insights, computed_at=func.now()
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[WeeklyInsightsSnapshot.user_id],
+            set_={"insights": stmt.excluded.insights, "computed_at": stmt.excluded.computed_at}
+        ))
+        db.commit()
+        return insights
+
+    @staticmethod
+    def compute_all_weekly_insights(db: Session) -> int:
+        """Nightly job: refresh snapshots for every active user. Returns the count."""
+        user_ids = db.execute(select(User.id).where(User.is_active == True)).scalars().all()
+        for user_id in user_ids:
+            InsightsService.compute_weekly_insights(db, user_id)
+        return len(user_ids)
+
+    @staticmethod
+    def get_daily_insight(db: Session, user_id: UUID, user: Optional[User] = None) -> Dict:
         """
         Generate a single daily insight/tip for the user.
         Personalized based on their patterns and current state.
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            user = db.query(User).filter(User.id == user_id).first()
         if not user:
             return {"insight": "Take care of yourself today", "type": "general"}
 
@@ -430,6 +497,49 @@ class InsightsService:
         # Get model info
         model = MLTrainingService.get_or_create_user_model(db, user_id)
 
+        return InsightsService._build_comprehensive_report(
+            model, mood_patterns, crisis_risk, optimal_times, weekly, effectiveness
+        )
+
+    @staticmethod
+    async def generate_comprehensive_report_async(
+        db: AsyncSession, user_id: UUID, user: Optional[User] = None
+    ) -> Dict:
+        """
+        Async variant: the independent analyses run concurrently in the threadpool,
+        each on its own sync session. A report holds up to five sync-pool
+        connections at once, so sections across all requests share
+        REPORT_SECTION_CONCURRENCY slots.
+        """
+        # Create the model row up front so the sub-analyses never race to insert it
+        model = await db.run_sync(MLTrainingService.get_or_create_user_model, user_id)
+
+        async def run(fn):
+            async with _report_sections:
+                return await run_in_sync_session(fn, user_id)
+
+        mood_patterns, crisis_risk, optimal_times, weekly, effectiveness = await asyncio.gather(
+            run(MoodPredictionService.detect_mood_patterns),
+            run(MoodPredictionService.predict_crisis_risk),
+            run(MoodPredictionService.get_optimal_intervention_times),
+            run(functools.partial(InsightsService.generate_weekly_insights, user=user)),
+            run(InsightsService.get_intervention_effectiveness_report)
+        )
+
+        return InsightsService._build_comprehensive_report(
+            model, mood_patterns, crisis_risk, optimal_times, weekly, effectiveness
+        )
+
+    @staticmethod
+    def _build_comprehensive_report(
+        model: UserMLModel,
+        mood_patterns: Dict,
+        crisis_risk: Dict,
+        optimal_times: Dict,
+        weekly: Dict,
+        effectiveness: Dict
+    ) -> Dict:
+        """Assemble the comprehensive report from its sections"""
         return {
             "report_generated_at": datetime.now(timezone.utc).isoformat(),
             "model_version": model.model_version,
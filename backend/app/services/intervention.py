@@ -1,15 +1,34 @@
 """
 Intervention service
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import desc, and_, tuple_
 from app.models.intervention import Intervention, InterventionSession
 from app.schemas.intervention import InterventionSessionCreate, InterventionSessionComplete
 from app.services.ml_training import MLTrainingService
 
+# Columns InterventionListItem reads; the long text fields stay in the detail query
+_LIST_COLUMNS = load_only(
+    Intervention.id,
+    Intervention.name,
+    Intervention.short_description,
+    Intervention.duration_seconds,
+    Intervention.effort_level,
+    Intervention.energy_required,
+    Intervention.therapeutic_approach,
+    Intervention.sub_category,
+    Intervention.target_emotions,
+    Intervention.is_premium,
+    Intervention.adhd_friendly,
+    Intervention.asd_friendly,
+    Intervention.sensory_intensity,
+    Intervention.total_completions,
+    Intervention.average_rating
+)
+
 
 class InterventionService:
     """Handle intervention operations"""
@@ -26,8 +45,8 @@ class InterventionService:
         asd_friendly: Optional[bool] = None,
         is_premium: Optional[bool] = None
     ) -> List[Intervention]:
-        """Get interventions with optional filters"""
-        query = db.query(Intervention).filter(Intervention.is_active == True)
+        """Get interventions with optional filters (listing columns only)"""
+        query = db.query(Intervention).options(_LIST_COLUMNS).filter(Intervention.is_active == True)
 
         if therapeutic_approach:
             query = query.filter(Intervention.therapeutic_approach == therapeutic_approach)
@@ -160,13 +179,22 @@ class InterventionService:
     def get_user_sessions(
         db: Session,
         user_id: UUID,
-        skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        before: Optional[Tuple[datetime, UUID]] = None,
+        skip: int = 0
     ) -> List[InterventionSession]:
-        """Get user's intervention session history"""
-        return db.query(InterventionSession).filter(
-            InterventionSession.user_id == user_id
-        ).order_by(desc(InterventionSession.created_at)).offset(skip).limit(limit).all()
+        """
+        Get user's intervention session history, newest first.
+        Keyset paginated: pass the (created_at, id) of the last row seen as before.
+        skip is the deprecated OFFSET fallback, used only without before.
+        """
+        query = db.query(InterventionSession).filter(InterventionSession.user_id == user_id)
+        if before is not None:
+            query = query.filter(tuple_(InterventionSession.created_at, InterventionSession.id) < before)
+        query = query.order_by(desc(InterventionSession.created_at), desc(InterventionSession.id))
+        if before is None and skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
 
     @staticmethod
     def get_user_effective_interventions(db: Session, user_id: UUID) -> List[dict]:
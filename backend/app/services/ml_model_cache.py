@@ -0,0 +1,15 @@
+"""
+Short-TTL Redis cache for per-user ML model state (read-only endpoints)
+"""
+from app.core.cache import RowCache
+from app.models.ml_model import UserMLModel
+
+ML_MODEL_CACHE_TTL_SECONDS = 60
+
+_cache = RowCache(UserMLModel, "ml:model", ML_MODEL_CACHE_TTL_SECONDS, key_column="user_id")
+
+get_cached_model = _cache.get
+cache_model = _cache.put
+invalidate_cached_model = _cache.invalidate
+# Only for the belief worker thread and scripts
+invalidate_cached_model_sync = _cache.invalidate_sync
@@ -9,13 +9,32 @@ import json
 import math
 from collections import defaultdict
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import Row, and_, bindparam, func, select, text
 from app.models.user import User
 from app.models.ml_model import UserMLModel
 from app.models.checkin import MoodCheckin
 from app.models.intervention import Intervention, InterventionSession
 
 
+def _has_data(column):
+    """Server-side truthiness of a JSONB column (not NULL, {} or null)"""
+    return and_(column.isnot(None), column != text("'{}'::jsonb"), column != text("'null'::jsonb"))
+
+
+# Model metadata plus pattern flags, without shipping the JSONB blobs
+_MODEL_INFO_QUERY = select(
+    UserMLModel.user_id,
+    UserMLModel.model_version,
+    UserMLModel.total_interactions,
+    UserMLModel.last_model_update,
+    _has_data(UserMLModel.circadian_patterns).label("has_circadian_patterns"),
+    _has_data(UserMLModel.trigger_patterns).label("has_trigger_patterns"),
+    _has_data(UserMLModel.coping_effectiveness_map).label("has_coping_effectiveness"),
+    _has_data(UserMLModel.intervention_prior_beliefs).label("has_intervention_beliefs")
+).where(UserMLModel.user_id == bindparam("user_id"))
+
+
 class MLTrainingService:
     """Personalized ML model training and management"""
 
@@ -42,6 +61,15 @@ class MLTrainingService:
             db.refresh(model)
         return model
 
+    @staticmethod
+    def get_model_info(db: Session, user_id: UUID) -> Row:
+        """Get model metadata and which patterns are learned, creating the model if needed"""
+        row = db.execute(_MODEL_INFO_QUERY, {"user_id": user_id}).first()
+        if row is None:
+            MLTrainingService.get_or_create_user_model(db, user_id)
+            row = db.execute(_MODEL_INFO_QUERY, {"user_id": user_id}).first()
+        return row
+
     @staticmethod
     def update_intervention_belief(
         db: Session,
@@ -56,10 +84,38 @@ class MLTrainingService:
         - alpha = successes + 1
         - beta = failures + 1
         """
-        model = MLTrainingService.get_or_create_user_model(db, user_id)
+        MLTrainingService.apply_belief_updates(db, user_id, [{
+            "intervention_id": intervention_id,
+            "effectiveness_rating": effectiveness_rating,
+            "context": context
+        }])
+
+    @staticmethod
+    def apply_belief_updates(db: Session, user_id: UUID, updates: List[Dict]) -> None:
+        """
+        Apply a batch of belief updates, in order, with one read and one commit.
+        The model row is locked so concurrent writers cannot lose updates.
+        """
+        model = db.query(UserMLModel).filter(UserMLModel.user_id == user_id).with_for_update().first()
+        if model is None:
+            model = MLTrainingService.get_or_create_user_model(db, user_id)
 
-        # Get current beliefs
         beliefs = model.intervention_prior_beliefs or {}
+        for update in updates:
+            MLTrainingService._apply_belief(
+                beliefs, update["intervention_id"], update["effectiveness_rating"], update["context"]
+            )
+
+        # Update model; beliefs were mutated in place, so flag the JSONB column explicitly
+        model.intervention_prior_beliefs = beliefs
+        flag_modified(model, "intervention_prior_beliefs")
+        model.total_interactions += len(updates)
+        model.last_model_update = datetime.utcnow()
+        db.commit()
+
+    @staticmethod
+    def _apply_belief(beliefs: Dict, intervention_id: UUID, effectiveness_rating: int, context: Dict) -> None:
+        """Fold one rating into the Beta beliefs dict"""
         intervention_key = str(intervention_id)
 
         # Initialize if new intervention
@@ -94,12 +150,6 @@ class MLTrainingService:
         beliefs[intervention_key]["contexts"][context_key]["beta"] += (1 - success)
         beliefs[intervention_key]["contexts"][context_key]["count"] += 1
 
-        # Update model
-        model.intervention_prior_beliefs = beliefs
-        model.total_interactions += 1
-        model.last_model_update = datetime.utcnow()
-        db.commit()
-
     @staticmethod
     def _get_context_key(context: Dict) -> str:
         """Generate a key for context-specific learning"""
@@ -122,13 +172,16 @@ class MLTrainingService:
         db: Session,
         user_id: UUID,
         intervention_id: UUID,
-        context: Dict
+        context: Dict,
+        model: Optional[UserMLModel] = None
     ) -> float:
         """
         Thompson Sampling: Sample from posterior distribution to estimate effectiveness.
-        Returns a value between 0 and 1.
+        Returns a value between 0 and 1. Pass model when scoring many interventions
+        to skip the per-call lookup.
         """
-        model = MLTrainingService.get_or_create_user_model(db, user_id)
+        if model is None:
+            model = MLTrainingService.get_or_create_user_model(db, user_id)
         beliefs = model.intervention_prior_beliefs or {}
         intervention_key = str(intervention_id)
 
@@ -432,18 +485,20 @@ class MLTrainingService:
         user_id: UUID,
         intervention_id: UUID,
         emotion: str,
-        context: Dict
+        context: Dict,
+        model: Optional[UserMLModel] = None
     ) -> Tuple[float, str]:
         """
         Get personalized effectiveness score for an intervention.
         Combines Thompson Sampling with learned patterns.
         Returns (score, explanation).
         """
-        model = MLTrainingService.get_or_create_user_model(db, user_id)
+        if model is None:
+            model = MLTrainingService.get_or_create_user_model(db, user_id)
 
         # Base score from Thompson Sampling
         sampled_score = MLTrainingService.sample_intervention_effectiveness(
-            db, user_id, intervention_id, context
+            db, user_id, intervention_id, context, model
         )
 
         explanation = "Based on your personal usage patterns"
@@ -151,7 +151,7 @@ class MoodPredictionService:
             # Morning (8am), Afternoon (2pm), Evening (8pm)
             times = [("morning", 8), ("afternoon", 14), ("evening", 20)]
             day_forecast = {
-                "date": target_date.strftime("%Y-%m-%d"),
+                "date": target_date.date(),
                 "day": day_name,
                 "periods": {}
             }
@@ -2,7 +2,7 @@
 Recommendation Engine - ML-powered personalized recommendations
 Uses Thompson Sampling and learned patterns for optimization
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy.orm import Session
@@ -35,13 +35,16 @@ class RecommendationService:
         current_emotion: str,
         energy_level: int,
         time_available_minutes: int,
-        context: str = None
+        context: str = None,
+        user: Optional[User] = None
     ) -> List[Dict]:
         """
         Get top 3 personalized intervention recommendations.
         Uses Thompson Sampling for exploration/exploitation balance.
+        Pass the already-authenticated user to skip re-loading it.
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            user = db.query(User).filter(User.id == user_id).first()
         if not user:
             return []
 
@@ -88,11 +91,12 @@ class RecommendationService:
         all_interventions = base_query.all()
 
         # Build context for ML scoring
+        hour = datetime.utcnow().hour
         ml_context = {
             "emotion": current_emotion,
             "energy_level": energy_level,
-            "time_of_day": datetime.utcnow().strftime("%p").lower(),
-            "hour": datetime.utcnow().hour
+            "time_of_day": "am" if hour < 12 else "pm",
+            "hour": hour
         }
 
         # Score and rank interventions using ML
@@ -100,7 +104,7 @@ class RecommendationService:
         for intervention in all_interventions:
             # Get ML-based personalized score
             ml_score, ml_explanation = MLTrainingService.get_personalized_score(
-                db, user_id, intervention.id, current_emotion, ml_context
+                db, user_id, intervention.id, current_emotion, ml_context, ml_model
             )
 
             # Combine ML score with rule-based score
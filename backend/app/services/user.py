@@ -1,11 +1,19 @@
 """
 User service - user management operations
 """
-from typing import Optional
+from typing import AsyncIterator, Optional, Union
 from uuid import UUID
+import orjson
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.core.database import AsyncSessionLocal
 from app.models.user import User, UserPreferences
+from app.models.checkin import MoodCheckin
+from app.models.intervention import InterventionSession
+from app.models.achievement import UserAchievement
+from app.models.summary import WeeklySummary
 from app.models.ml_model import UserMLModel
+from app.schemas.auth import RegisterRequest
 from app.schemas.user import UserCreate, UserUpdate, UserPreferencesCreate, UserPreferencesUpdate
 from app.services.auth import AuthService
 
@@ -14,10 +22,20 @@ class UserService:
     """Handle user CRUD operations"""
 
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
-        """Create a new user"""
+    def create_user(
+        db: Session,
+        user_data: Union[UserCreate, RegisterRequest],
+        password_hash: Optional[str] = None
+    ) -> User:
+        """
+        Create a new user.
+        Accepts an already-validated RegisterRequest directly; fields it lacks
+        fall back to the UserCreate defaults. password_hash lets async callers
+        hash off the event loop.
+        """
         # Hash password
-        password_hash = AuthService.get_password_hash(user_data.password)
+        if password_hash is None:
+            password_hash = AuthService.get_password_hash(user_data.password)
 
         # Create user
         user = User(
@@ -28,9 +46,9 @@ class UserService:
             has_autism_spectrum=user_data.has_autism_spectrum,
             has_anxiety=user_data.has_anxiety,
             has_depression=user_data.has_depression,
-            other_conditions=user_data.other_conditions,
-            age_range=user_data.age_range,
-            timezone=user_data.timezone
+            other_conditions=getattr(user_data, "other_conditions", []),
+            age_range=getattr(user_data, "age_range", None),
+            timezone=getattr(user_data, "timezone", "UTC")
         )
         db.add(user)
         db.flush()
@@ -81,22 +99,27 @@ class UserService:
         db.refresh(user)
         return user
 
+    @staticmethod
+    def get_preferences(db: Session, user_id: UUID) -> Optional[UserPreferences]:
+        """Get user preferences"""
+        return db.query(UserPreferences).filter(UserPreferences.user_id == user_id).first()
+
     @staticmethod
     def update_preferences(
         db: Session, user_id: UUID, prefs_data: UserPreferencesUpdate
     ) -> Optional[UserPreferences]:
         """Update user preferences"""
-        user = UserService.get_user_by_id(db, user_id)
-        if not user or not user.preferences:
+        preferences = UserService.get_preferences(db, user_id)
+        if not preferences:
             return None
 
         update_data = prefs_data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
-            setattr(user.preferences, key, value)
+            setattr(preferences, key, value)
 
         db.commit()
-        db.refresh(user.preferences)
-        return user.preferences
+        db.refresh(preferences)
+        return preferences
 
     @staticmethod
     def delete_user(db: Session, user_id: UUID) -> bool:
@@ -110,76 +133,118 @@ class UserService:
         return True
 
     @staticmethod
-    def export_user_data(db: Session, user_id: UUID) -> dict:
-        """Export all user data for GDPR/CCPA compliance"""
-        user = UserService.get_user_by_id(db, user_id)
-        if not user:
-            return {}
-
-        # Compile all user data
-        data = {
-            "user_profile": {
-                "email": user.email,
-                "display_name": user.display_name,
-                "created_at": str(user.created_at),
-                "has_adhd": user.has_adhd,
-                "has_autism_spectrum": user.has_autism_spectrum,
-                "has_anxiety": user.has_anxiety,
-                "has_depression": user.has_depression,
-                "other_conditions": user.other_conditions,
-                "timezone": user.timezone,
-            },
-            "preferences": {},
-            "checkins": [],
-            "intervention_sessions": [],
-            "achievements": [],
-            "weekly_summaries": [],
+    async def stream_user_data_export(user: User) -> AsyncIterator[bytes]:
+        """
+        Export all user data for GDPR/CCPA compliance.
+        Yields the export JSON document in chunks; each section is read from a
+        server-side cursor so memory stays flat regardless of history size.
+        The generator opens its own session: the response body is sent after
+        the route returns, when request-scoped dependencies are already closed.
+        """
+        yield b'{"user_profile":' + orjson.dumps({
+            "email": user.email,
+            "display_name": user.display_name,
+            "created_at": str(user.created_at),
+            "has_adhd": user.has_adhd,
+            "has_autism_spectrum": user.has_autism_spectrum,
+            "has_anxiety": user.has_anxiety,
+            "has_depression": user.has_depression,
+            "other_conditions": user.other_conditions,
+            "timezone": user.timezone,
+        })
+
+        async with AsyncSessionLocal() as db:
+            preferences = (await db.execute(
+                select(
+                    UserPreferences.theme,
+                    UserPreferences.font_size,
+                    UserPreferences.animation_speed,
+                    UserPreferences.sound_enabled,
+                    UserPreferences.morning_checkin_time,
+                    UserPreferences.evening_reflection_time
+                ).where(UserPreferences.user_id == user.id)
+            )).mappings().first()
+            yield b',"preferences":' + orjson.dumps(dict(preferences) if preferences else {})
+
+            for section, model, columns, to_dict in _EXPORT_SECTIONS:
+                yield b',"' + section + b'":['
+                separator = b""
+                result = await db.stream(
+                    select(*columns)
+                    .where(model.user_id == user.id)
+                    .execution_options(yield_per=_EXPORT_BATCH_SIZE)
+                )
+                async for rows in result.partitions():
+                    chunk = b",".join(orjson.dumps(to_dict(row)) for row in rows)
+                    yield separator + chunk
+                    separator = b","
+                yield b"]"
+
+        yield b"}"
+
+
+# Rows fetched per server-side cursor round trip during exports
+_EXPORT_BATCH_SIZE = 500
+
+# (key, model, exported columns, row -> dict) for each history section of the export
+_EXPORT_SECTIONS = (
+    (
+        b"checkins",
+        MoodCheckin,
+        (
+            MoodCheckin.created_at,
+            MoodCheckin.mood_score,
+            MoodCheckin.energy_level,
+            MoodCheckin.emotion_tags,
+            MoodCheckin.journal_text
+        ),
+        lambda row: {
+            "created_at": str(row.created_at),
+            "mood_score": row.mood_score,
+            "energy_level": row.energy_level,
+            "emotion_tags": row.emotion_tags,
+            "journal_text": row.journal_text,
         }
-
-        # Add preferences
-        if user.preferences:
-            data["preferences"] = {
-                "theme": user.preferences.theme,
-                "font_size": user.preferences.font_size,
-                "animation_speed": user.preferences.animation_speed,
-                "sound_enabled": user.preferences.sound_enabled,
-                "morning_checkin_time": user.preferences.morning_checkin_time,
-                "evening_reflection_time": user.preferences.evening_reflection_time,
-            }
-
-        # Add checkins
-        for checkin in user.checkins:
-            data["checkins"].append({
-                "created_at": str(checkin.created_at),
-                "mood_score": checkin.mood_score,
-                "energy_level": checkin.energy_level,
-                "emotion_tags": checkin.emotion_tags,
-                "journal_text": checkin.journal_text,
-            })
-
-        # Add intervention sessions
-        for session in user.intervention_sessions:
-            data["intervention_sessions"].append({
-                "created_at": str(session.created_at),
-                "intervention_id": str(session.intervention_id),
-                "was_completed": session.was_completed,
-                "effectiveness_rating": session.effectiveness_rating,
-            })
-
-        # Add achievements
-        for achievement in user.achievements:
-            data["achievements"].append({
-                "type": achievement.achievement_type,
-                "achieved_at": str(achievement.achieved_at),
-            })
-
-        # Add weekly summaries
-        for summary in user.weekly_summaries:
-            data["weekly_summaries"].append({
-                "week_start": str(summary.week_start_date),
-                "total_checkins": summary.total_checkins,
-                "average_mood": summary.average_mood_score,
-                "streak_length": summary.streak_length,
-            })
-
-        return data
+    ),
+    (
+        b"intervention_sessions",
+        InterventionSession,
+        (
+            InterventionSession.created_at,
+            InterventionSession.intervention_id,
+            InterventionSession.was_completed,
+            InterventionSession.effectiveness_rating
+        ),
+        lambda row: {
+            "created_at": str(row.created_at),
+            "intervention_id": str(row.intervention_id),
+            "was_completed": row.was_completed,
+            "effectiveness_rating": row.effectiveness_rating,
+        }
+    ),
+    (
+        b"achievements",
+        UserAchievement,
+        (UserAchievement.achievement_type, UserAchievement.achieved_at),
+        lambda row: {
+            "type": row.achievement_type,
+            "achieved_at": str(row.achieved_at),
+        }
+    ),
+    (
+        b"weekly_summaries",
+        WeeklySummary,
+        (
+            WeeklySummary.week_start_date,
+            WeeklySummary.total_checkins,
+            WeeklySummary.average_mood_score,
+            WeeklySummary.streak_length
+        ),
+        lambda row: {
+            "week_start": str(row.week_start_date),
+            "total_checkins": row.total_checkins,
+            "average_mood": row.average_mood_score,
+            "streak_length": row.streak_length,
+        }
+    ),
+)
@@ -0,0 +1,14 @@
+"""
+Short-TTL Redis cache for the authenticated user row
+"""
+from app.core.cache import RowCache
+from app.models.user import User
+
+USER_CACHE_TTL_SECONDS = 60
+
+# Secrets never leave Postgres
+_cache = RowCache(User, "u", USER_CACHE_TTL_SECONDS, exclude={"password_hash", "mfa_secret"})
+
+get_cached_user = _cache.get
+cache_user = _cache.put
+invalidate_cached_user = _cache.invalidate
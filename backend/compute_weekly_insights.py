@@ -0,0 +1,14 @@
+"""
+Nightly job: precompute /ml/insights/weekly for every active user
+Schedule with cron, e.g. 0 3 * * * cd backend && python compute_weekly_insights.py
+"""
+
+from app.core.database import SessionLocal
+from app.services.insights import InsightsService
+
+db = SessionLocal()
+try:
+    count = InsightsService.compute_all_weekly_insights(db)
+    print(f"Weekly insights computed for {count} users")
+finally:
+    db.close()
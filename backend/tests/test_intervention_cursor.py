@@ -0,0 +1,54 @@
+"""
+Tests for the session-history keyset cursor
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.interventions import _decode_cursor, _encode_cursor
+
+
+def _session(created_at: datetime, session_id: UUID = None):
+    return SimpleNamespace(created_at=created_at, id=session_id or uuid4())
+
+
+class TestSessionCursor:
+    """Round trips of (created_at, id) through the opaque cursor"""
+
+    @pytest.mark.parametrize("created_at", [
+        datetime(2024, 3, 1, 12, 30, 15),
+        datetime(2024, 3, 1, 12, 30, 15, 123456),
+        datetime(2024, 3, 1, 12, 30, 15, 1, tzinfo=timezone.utc),
+    ])
+    def test_round_trip(self, created_at):
+        session = _session(created_at)
+        assert _decode_cursor(_encode_cursor(session)) == (created_at, session.id)
+
+    def test_rows_tied_on_created_at_keep_distinct_positions(self):
+        """Ties on created_at are broken by id, in the query's (created_at, id) DESC order"""
+        created_at = datetime(2024, 3, 1, 12, 0, 0, 500)
+        low = _session(created_at, UUID("00000000-0000-0000-0000-000000000001"))
+        high = _session(created_at, UUID("ffffffff-ffff-ffff-ffff-ffffffffffff"))
+
+        low_key = _decode_cursor(_encode_cursor(low))
+        high_key = _decode_cursor(_encode_cursor(high))
+
+        assert _encode_cursor(low) != _encode_cursor(high)
+        assert low_key == (created_at, low.id)
+        assert high_key == (created_at, high.id)
+        # The row after `high` on the next page is `low`
+        assert low_key < high_key
+
+    def test_cursor_is_url_safe(self):
+        cursor = _encode_cursor(_session(datetime(2024, 3, 1, 23, 59, 59, 999999)))
+        assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", "MjAyNA=="])
+    def test_invalid_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_cursor(cursor)
+        assert exc_info.value.status_code == 400
@@ -5,12 +5,22 @@ Tests NLP, predictions, collaborative filtering, and A/B testing
 
 import pytest
 import asyncio
+import warnings
 from datetime import datetime, timedelta
 import numpy as np
+from scipy import stats
 
-from app.ml.nlp_service import get_nlp_service
-from app.ml.prediction_service import get_prediction_service
-from app.ml.collaborative_filtering import get_collaborative_filtering_service
+from app.ml import nlp_service as nlp_module
+from app.ml.nlp_service import NLPService, get_nlp_service
+from app.ml.prediction_service import _pearson_columns, get_prediction_service
+from app.ml.collaborative_filtering import (
+    CollaborativeFilteringService,
+    get_collaborative_filtering_service,
+    _mood_stats_loop,
+    _mood_stats_numpy,
+    _welch_t_test,
+    _welford_update
+)
 
 
 # Test fixtures
@@ -165,6 +175,45 @@ class TestNLPService:
         assert 'analyzed_at' in result
 
 
+def _crisis_scanner(monkeypatch, use_automaton: bool) -> NLPService:
+    """An NLPService with only the crisis keyword tables built (no models, no NLTK)"""
+    if use_automaton:
+        monkeypatch.setattr(nlp_module, "ahocorasick", pytest.importorskip("ahocorasick"), raising=False)
+    monkeypatch.setattr(nlp_module, "HAS_AHOCORASICK", use_automaton)
+    service = NLPService.__new__(NLPService)
+    service._setup_crisis_keywords()
+    return service
+
+
+class TestCrisisKeywordScan:
+    """The Aho-Corasick scan and the regex fallback find the same keywords"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("I want to download the new app", []),
+        ("Feeling down today.", ["down"]),
+        ("I can't go on, I can't take it", ["can't go on", "can't take it"]),
+        ("I can’t go on", []),
+        ("Thoughts of self-harm again", ["self-harm"]),
+        ("sad, sad, so sad", ["sad", "sad", "sad"]),
+        ("Feeling Down; so TIRED", ["TIRED", "Down"]),
+        ("sadness and lonelyhearts", []),
+        # 'İ' lowercases to two code points, so matches come from the lowercased text
+        ("İ feel HOPELESS and alone", ["hopeless", "alone"]),
+        ("Straße, ẞ: worried", ["worried"]),
+    ])
+    def test_automaton_and_regex_agree(self, monkeypatch, text, expected):
+        automaton_ids, automaton_matches = _crisis_scanner(monkeypatch, True)._scan_crisis_keywords(
+            text, text.lower()
+        )
+        regex_ids, regex_matches = _crisis_scanner(monkeypatch, False)._scan_crisis_keywords(
+            text, text.lower()
+        )
+
+        assert automaton_matches == expected
+        assert regex_matches == expected
+        np.testing.assert_array_equal(automaton_ids, regex_ids)
+
+
 # ============================================================================
 # Prediction Service Tests
 # ============================================================================
@@ -265,6 +314,47 @@ class TestPredictionService:
 # Collaborative Filtering Tests
 # ============================================================================
 
+def _pearson_cases():
+    rng = np.random.default_rng(11)
+    y = rng.normal(5, 2, 40)
+    return [
+        # Independent and partly correlated columns
+        (y, np.column_stack([rng.normal(size=40), y + rng.normal(0, 1, 40), -0.5 * y + rng.normal(0, 3, 40)])),
+        # |r| = 1: exact positive and negative linear relations
+        (y, np.column_stack([2 * y + 1, -3 * y + 7, rng.normal(size=40)])),
+        # Constant columns next to a varying one
+        (y, np.column_stack([np.full(40, 3.0), rng.normal(size=40), np.zeros(40)])),
+        # Constant y: every correlation is undefined
+        (np.full(12, 4.0), rng.normal(size=(12, 3))),
+        # Smallest sample with a defined p-value
+        (np.array([1.0, 2.0, 4.0]), np.array([[2.0, 1.0], [3.0, 5.0], [7.0, 2.0]])),
+    ]
+
+
+class TestPearsonColumns:
+    """Column-wise Pearson r and p-values match scipy.stats.pearsonr per column"""
+
+    @pytest.mark.parametrize("y, X", _pearson_cases())
+    def test_matches_scipy(self, y, X):
+        r, p = _pearson_columns(y, X)
+
+        with warnings.catch_warnings():
+            # scipy warns on constant input and returns nan, as _pearson_columns does
+            warnings.simplefilter("ignore")
+            expected = [stats.pearsonr(y, X[:, j]) for j in range(X.shape[1])]
+
+        np.testing.assert_allclose(r, [e[0] for e in expected], rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(p, [e[1] for e in expected], rtol=1e-7, atol=1e-15)
+
+    def test_perfect_correlation_is_clipped(self):
+        y = np.linspace(1, 10, 25)
+        r, p = _pearson_columns(y, np.column_stack([3 * y - 2, 5 - y]))
+
+        assert np.all(np.abs(r) <= 1.0)
+        np.testing.assert_allclose(r, [1.0, -1.0])
+        np.testing.assert_allclose(p, [0.0, 0.0], atol=1e-15)
+
+
 class TestCollaborativeFiltering:
     """Test collaborative filtering and recommendations"""
 
@@ -445,6 +535,209 @@ class TestCollaborativeFiltering:
         assert 'results' in result
 
 
+class TestMoodStatistics:
+    """The fused-loop profile statistics match the numpy reference"""
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 6, 7, 8, 60])
+    def test_loop_matches_numpy_on_random_scores(self, n):
+        """Covers ddof=1 spreads, the n < 7 autocorrelation rule and n <= 2 edge cases"""
+        x = np.random.default_rng(n).uniform(1, 10, size=n)
+        np.testing.assert_allclose(
+            np.array(_mood_stats_loop(x), dtype=float),
+            np.array(_mood_stats_numpy(x), dtype=float),
+            rtol=1e-9, atol=1e-12
+        )
+
+    @pytest.mark.parametrize("x", [
+        np.full(10, 5.0),
+        np.array([7.0, 4.0]),
+        np.array([3.0]),
+        np.array([1.0, 10.0, 1.0, 10.0, 1.0, 10.0, 1.0]),
+    ])
+    def test_loop_matches_numpy_on_edge_cases(self, x):
+        """Constant series (zero variance), thresholds on 4 and 7, alternating scores"""
+        np.testing.assert_allclose(
+            np.array(_mood_stats_loop(x), dtype=float),
+            np.array(_mood_stats_numpy(x), dtype=float),
+            rtol=1e-9, atol=1e-12
+        )
+
+
+def _running_stats(values) -> list:
+    """[n, mean, M2] accumulated the way A/B results are recorded"""
+    running = [0, 0.0, 0.0]
+    for value in values:
+        _welford_update(running, value)
+    return running
+
+
+class TestWelchTTest:
+    """Welch's t-test from running stats matches scipy on the raw samples"""
+
+    @pytest.mark.parametrize("a, b", [
+        (np.random.default_rng(0).normal(3.5, 1.0, 40), np.random.default_rng(1).normal(4.0, 0.6, 25)),
+        (np.random.default_rng(2).normal(4.0, 0.8, 5), np.random.default_rng(3).normal(4.0, 0.8, 200)),
+        (np.array([4.0, 5.0]), np.array([1.0, 2.0, 3.0])),
+        # Zero variance in one group, in both with different means, in both with equal means
+        (np.full(6, 4.0), np.random.default_rng(4).normal(3.0, 1.0, 12)),
+        (np.full(6, 4.0), np.full(9, 2.0)),
+        (np.full(6, 3.0), np.full(9, 3.0)),
+    ])
+    def test_matches_scipy(self, a, b):
+        t_stat, p_value = _welch_t_test(_running_stats(a), _running_stats(b))
+        expected = stats.ttest_ind(a, b, equal_var=False)
+
+        np.testing.assert_allclose(t_stat, expected.statistic, rtol=1e-9)
+        np.testing.assert_allclose(p_value, expected.pvalue, rtol=1e-9, atol=1e-15)
+
+
+CF_INTERVENTIONS = [{'id': f'intervention_{k}'} for k in range(6)]
+
+
+def _cf_mood_series(rng) -> list:
+    """30 days of scores around a per-user level, so profiles differ"""
+    level = rng.uniform(2, 8)
+    base_date = datetime(2024, 1, 1)
+    return [
+        {
+            'date': (base_date + timedelta(days=i)).isoformat(),
+            'mood_score': float(np.clip(level + rng.normal(0, 1.5), 1, 10))
+        }
+        for i in range(30)
+    ]
+
+
+def _cf_ratings(case: str) -> dict:
+    """{user index: {intervention id: effectiveness}}; user 0 is the one recommended for"""
+    rng = np.random.default_rng(7)
+    if case == 'random':
+        # intervention_5 is never recorded
+        return {
+            u: {f'intervention_{k}': float(rng.uniform()) for k in range(5) if rng.uniform() < 0.6}
+            for u in range(1, 25)
+        }
+    if case == 'ties':
+        # intervention_1 and intervention_3 get identical ratings from the same users
+        ratings = {}
+        for u in range(1, 12):
+            score = float(rng.uniform(0.5, 1.0))
+            ratings[u] = {'intervention_1': score, 'intervention_3': score, 'intervention_0': score / 2}
+        return ratings
+    if case == 'sparse_history':
+        # Most similar profiles never recorded anything
+        return {u: {'intervention_2': float(rng.uniform())} for u in range(1, 25, 6)}
+    if case == 'own_history_only':
+        # The user's own ratings never count; no similar profile has history
+        return {0: {'intervention_0': 1.0, 'intervention_1': 0.2}}
+    raise ValueError(case)
+
+
+async def _cf_population(case: str, n_users: int = 25) -> CollaborativeFilteringService:
+    cf = CollaborativeFilteringService()
+    rng = np.random.default_rng(n_users)
+    for u in range(n_users):
+        await cf.create_user_profile(f"cf_user_{u}", _cf_mood_series(rng))
+    for u, scores in _cf_ratings(case).items():
+        for intervention_id, score in scores.items():
+            await cf.record_intervention_effectiveness(f"cf_user_{u}", intervention_id, score)
+    return cf
+
+
+async def _reference_recommendations(cf, user_id, interventions, n) -> dict:
+    """The dict-based weighted averages recommend_interventions replaced"""
+    similar_users = await cf.find_similar_users(user_id, top_k=20)
+    if not similar_users.get('success'):
+        return cf._get_general_recommendations(interventions, n)
+
+    intervention_scores = {}
+    for similar_user in similar_users['similar_users']:
+        similarity = similar_user['similarity']
+        for intervention_id, effectiveness in \
+                cf.intervention_effectiveness.get(similar_user['profile_id'], {}).items():
+            score_data = intervention_scores.setdefault(
+                intervention_id, {'weighted_effectiveness': 0, 'total_weight': 0, 'n_users': 0}
+            )
+            score_data['weighted_effectiveness'] += effectiveness * similarity
+            score_data['total_weight'] += similarity
+            score_data['n_users'] += 1
+
+    recommendations = []
+    for intervention in interventions:
+        if intervention['id'] in intervention_scores:
+            score_data = intervention_scores[intervention['id']]
+            recommendations.append({
+                'intervention': intervention,
+                'score': (
+                    score_data['weighted_effectiveness'] / score_data['total_weight']
+                    if score_data['total_weight'] > 0 else 0
+                ),
+                'evidence_from_n_users': score_data['n_users'],
+                'confidence': min(score_data['n_users'] / 5, 1.0)
+            })
+    recommendations.sort(key=lambda x: x['score'], reverse=True)
+
+    if len(recommendations) < n:
+        recommendations.extend(
+            cf._get_general_recommendations(interventions, n - len(recommendations))['recommendations']
+        )
+    return {
+        'success': True,
+        'recommendations': recommendations[:n],
+        'based_on_similar_users': len(similar_users['similar_users'])
+    }
+
+
+class TestRecommendInterventions:
+    """The sparse-matrix recommender matches the dict-based weighted averages"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("case", ['random', 'ties', 'sparse_history', 'own_history_only'])
+    @pytest.mark.parametrize("reverse_candidates", [False, True])
+    @pytest.mark.parametrize("n", [2, 8])
+    async def test_matches_reference(self, case, reverse_candidates, n):
+        cf = await _cf_population(case)
+        # Covers candidates never recorded (intervention_5) and ones unknown to the service
+        candidates = CF_INTERVENTIONS + [{'id': 'never_seen'}]
+        if reverse_candidates:
+            candidates = candidates[::-1]
+
+        result = await cf.recommend_interventions("cf_user_0", candidates, n_recommendations=n)
+        expected = await _reference_recommendations(cf, "cf_user_0", candidates, n)
+
+        assert result['success']
+        assert result['based_on_similar_users'] == expected['based_on_similar_users']
+        # Same interventions in the same order, ties kept in candidate order
+        assert [r['intervention']['id'] for r in result['recommendations']] == \
+            [r['intervention']['id'] for r in expected['recommendations']]
+        for got, want in zip(result['recommendations'], expected['recommendations']):
+            assert got['intervention'] is want['intervention']
+            assert got['score'] == pytest.approx(want['score'], rel=1e-9, abs=1e-12)
+            assert got['evidence_from_n_users'] == want['evidence_from_n_users']
+            assert got['confidence'] == pytest.approx(want['confidence'])
+            assert got.get('note') == want.get('note')
+
+    @pytest.mark.asyncio
+    async def test_ties_keep_candidate_order(self):
+        cf = await _cf_population('ties')
+        candidates = [CF_INTERVENTIONS[3], CF_INTERVENTIONS[1], CF_INTERVENTIONS[0]]
+
+        result = await cf.recommend_interventions("cf_user_0", candidates, n_recommendations=3)
+
+        ids = [r['intervention']['id'] for r in result['recommendations']]
+        assert ids == ['intervention_3', 'intervention_1', 'intervention_0']
+        assert result['recommendations'][0]['score'] == result['recommendations'][1]['score']
+
+    @pytest.mark.asyncio
+    async def test_unknown_profile_gets_general_recommendations(self):
+        cf = await _cf_population('random')
+
+        result = await cf.recommend_interventions("no_profile", CF_INTERVENTIONS, n_recommendations=3)
+        expected = await _reference_recommendations(cf, "no_profile", CF_INTERVENTIONS, 3)
+
+        assert result == expected
+        assert all(r['evidence_from_n_users'] == 0 for r in result['recommendations'])
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
@@ -0,0 +1,155 @@
+"""
+Tests for ORJSONRoute against FastAPI's stock route class
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import numpy as np
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.api.routing import ORJSONRoute
+
+
+class Item(BaseModel):
+    name: str
+    created_at: datetime
+
+
+PAYLOAD = {
+    "id": UUID("12345678-1234-5678-1234-567812345678"),
+    "at": datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "item": Item(name="walk", created_at=datetime(2024, 3, 1, 8, 0)),
+    "items": [Item(name="breathe", created_at=datetime(2024, 3, 2, 9, 15))],
+    "by_day": {1: 0.5, 2: None},
+    "nested": [{"score": 1.25, "tags": ["calm"]}],
+}
+
+
+def _client(route_class) -> TestClient:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/payload")
+    async def payload():
+        return PAYLOAD
+
+    @router.get("/sync")
+    def sync_payload():
+        return PAYLOAD
+
+    @router.get("/typed", response_model=Item)
+    async def typed():
+        return {"name": "walk", "created_at": datetime(2024, 3, 1, 8, 0), "extra": "dropped"}
+
+    @router.post("/created", status_code=201)
+    async def created(response: Response):
+        response.headers["X-Resource"] = "abc"
+        response.set_cookie("seen", "1")
+        return {"ok": True}
+
+    @router.get("/override")
+    async def override(response: Response):
+        response.status_code = 202
+        return {"queued": True}
+
+    @router.delete("/gone", status_code=204)
+    async def gone():
+        return None
+
+    @router.get("/fallback")
+    async def fallback():
+        return {"amount": Decimal("1.5"), "tags": {"calm"}}
+
+    @router.get("/plain", response_class=PlainTextResponse)
+    async def plain():
+        return "hello"
+
+    @router.get("/raw")
+    async def raw():
+        return Response(b"raw", media_type="text/plain")
+
+    @router.get("/query")
+    async def query(limit: int = 10):
+        return {"limit": limit}
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(router, prefix="/api")
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def orjson_client():
+    return _client(ORJSONRoute)
+
+
+@pytest.fixture(scope="module")
+def stock_client():
+    return _client(APIRoute)
+
+
+class TestORJSONRoute:
+    """Responses match the stock route, encoded without jsonable_encoder"""
+
+    @pytest.mark.parametrize("method,path", [
+        ("get", "/api/payload"),
+        ("get", "/api/sync"),
+        ("get", "/api/typed"),
+        ("post", "/api/created"),
+        ("get", "/api/override"),
+        ("delete", "/api/gone"),
+        ("get", "/api/fallback"),
+        ("get", "/api/plain"),
+        ("get", "/api/raw"),
+        ("get", "/api/query?limit=3"),
+    ])
+    def test_matches_stock_route(self, orjson_client, stock_client, method, path):
+        ours = getattr(orjson_client, method)(path)
+        stock = getattr(stock_client, method)(path)
+
+        assert ours.status_code == stock.status_code
+        assert ours.headers.get("content-type") == stock.headers.get("content-type")
+        assert ours.headers.get("x-resource") == stock.headers.get("x-resource")
+        assert ours.cookies == stock.cookies
+        if stock.content:
+            if stock.headers["content-type"] == "application/json":
+                assert ours.json() == stock.json()
+            else:
+                assert ours.content == stock.content
+        else:
+            assert ours.content == b""
+
+    def test_untyped_route_skips_jsonable_encoder(self, orjson_client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("jsonable_encoder called")
+
+        monkeypatch.setattr("app.api.routing.jsonable_encoder", fail)
+        assert orjson_client.get("/api/payload").status_code == 200
+
+    def test_numpy_values(self):
+        router = APIRouter(route_class=ORJSONRoute)
+
+        @router.get("/forecast")
+        async def forecast():
+            return {"values": np.array([1.5, 2.5]), "mean": np.float64(2.0)}
+
+        app = FastAPI(default_response_class=ORJSONResponse)
+        app.include_router(router)
+        response = TestClient(app).get("/forecast")
+
+        assert response.json() == {"values": [1.5, 2.5], "mean": 2.0}
+
+    def test_included_endpoint_is_wrapped_once(self, orjson_client):
+        routes = [r for r in orjson_client.app.routes if getattr(r, "path", None) == "/api/payload"]
+        endpoint = routes[0].endpoint
+
+        assert not hasattr(endpoint.__orjson_route_call__, "__orjson_route_call__")
+
+    def test_query_parameters_resolved_from_endpoint_signature(self, orjson_client):
+        assert orjson_client.get("/api/query").json() == {"limit": 10}
+        assert orjson_client.get("/api/query?limit=x").status_code == 422